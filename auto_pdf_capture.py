@@ -15,29 +15,177 @@
 
 """
 
-import pyautogui
 import os
 from PIL import Image
 import time
-from PyQt6.QtCore import pyqtSignal, pyqtBoundSignal
 import subprocess
 import sys
 from supa_common import *
-from typing import Callable
-
-
-def _screenshot(*, capture_region: tuple, output_dir: str, filename: str, index: int) -> None:
-    """화면을 캡쳐하여 파일로 저장한다.
+from typing import TYPE_CHECKING, Callable, Iterable
+from cap_backend import CaptureBackend, create_capture_backend
+from input_driver import InputDriver, create_input_driver
+from encode_pool import EncodePool, encode_png
+from page_settle import SettleResult, region_checksum, wait_for_settle
+from cap_trace import TRACE_FORMATS, CaptureTrace
+from page_hash import dhash, hamming
+from cap_manifest import CaptureManifest, content_hash
+from pdf_writer import ImageRef, PdfObjectWriter, PdfPageSplicer, is_complete_pdf, recover_partial_pdf
+from pdf_backend import check_pdf_writer_backend, create_pdf_backend
+from page_register import register_pages
+from scroll_stitch import ScrollStitcher
+from page_profile import RGB_ENCODING, PageEncoding, choose_encoding, convert_for_encoding
+from page_filter import FILTER_ACTIONS, PageFilter
+from collections import Counter
+import re
+
+if TYPE_CHECKING:
+    # Qt 는 타입 표기에만 사용한다. (cli.py 처럼 Qt 없이 실행할 수 있도록)
+    from PyQt6.QtCore import pyqtSignal, pyqtBoundSignal
+
+
+def _frame_sort_key(path: str) -> tuple:
+    """프레임 파일을 페이지 인덱스 순으로 정렬하기 위한 키 (zfill(4) 자리수를 넘는 9999페이지 이후도 순서 유지)"""
+    match = re.search(r'_(\d+)\.png$', path)
+    return (int(match.group(1)) if match else -1, path)
+
+
+def _frame_path(output_dir: str, filename: str, index: int) -> str:
+    """페이지 인덱스에 해당하는 프레임 파일 경로"""
+    return os.path.join(output_dir, f"{filename}_{str(index).zfill(4)}.png")
+
+
+def _save_frame(*, image: Image.Image, output_dir: str, filename: str, index: int,
+                encode_pool: EncodePool | None = None) -> tuple[float, float] | None:
+    """캡쳐된 프레임을 파일로 저장한다.
 
     Args:
-        capture_region: 캡쳐할 영역 (x, y, width, height)
+        image: 캡쳐된 이미지
         output_dir: 저장할 디렉토리 경로
         filename: 파일명
         index: 파일 인덱스
+        encode_pool: PNG 인코딩 프로세스 풀. 주어지면 픽셀만 넘기고 바로 반환한다. (None이면 직접 저장)
+
+    Returns:
+        직접 저장한 경우 (인코딩 시간, 파일 기록 시간). encode_pool 을 사용하면 None
     """
-    output_path = os.path.join(output_dir, f"{filename}_{str(index).zfill(4)}.png")
-    # noinspection PyTypeChecker
-    pyautogui.screenshot(region=capture_region).save(output_path)
+    output_path = _frame_path(output_dir, filename, index)
+    if encode_pool is not None:
+        encode_pool.submit(image, output_path)
+        return None
+    return encode_png(image, output_path)
+
+
+def _remove_frames(*, output_dir: str, filename: str, indices: Iterable[int],
+                   encode_pool: EncodePool | None = None) -> None:
+    """저장된 프레임 파일들을 삭제한다. (인코딩 대기중인 프레임이 있으면 먼저 기록을 마친다)"""
+    if encode_pool is not None:
+        encode_pool.flush()
+    for index in indices:
+        path = _frame_path(output_dir, filename, index)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _spread_regions(region: tuple, diff_width: int) -> dict[str, tuple]:
+    """펼침면(두 페이지) 캡쳐 영역을 좌/우 페이지 영역으로 나눈다. diff_width 는 각 절반에 적용한다.
+
+    Returns:
+        {'left': 좌측 페이지 영역, 'right': 우측 페이지 영역}
+    """
+    x, y, width, height = region
+    half = width // 2
+    return {'left': (x, y, half - diff_width, height),
+            'right': (x + half + diff_width, y, width - half - diff_width, height)}
+
+
+def _crop_region(image: Image.Image, grab_region: tuple, page_region: tuple) -> Image.Image:
+    """grab_region 을 캡쳐한 이미지에서 page_region(화면 좌표) 부분을 잘라낸다. (HiDPI 배율 보정)"""
+    scale = image.width / grab_region[2]
+    left = round((page_region[0] - grab_region[0]) * scale)
+    top = round((page_region[1] - grab_region[1]) * scale)
+    return image.crop((left, top, left + round(page_region[2] * scale), top + round(page_region[3] * scale)))
+
+
+def _traced_settle(grab: Callable[[], Image.Image], prev_checksum: int | None, trace: CaptureTrace,
+                   **kwargs) -> SettleResult:
+    """wait_for_settle 을 수행하고 대기시간을 trace 의 settle 단계로 기록한다.
+    (grab 이 trace.timed 로 감싸져 있으면 샘플 캡쳐 시간은 grab 단계로 기록되므로 settle 에서 뺀다)"""
+    grab_before = trace.current.phases.get('grab', 0.0)
+    result = wait_for_settle(grab, prev_checksum, **kwargs)
+    grab_time = trace.current.phases.get('grab', 0.0) - grab_before
+    trace.add('settle', max(0.0, result.elapsed - grab_time))
+    return result
+
+
+def _scroll_capture(*, cap_backend: CaptureBackend, driver: InputDriver, region: tuple, center: tuple[int, int],
+                    start_index: int, page_loop: int, scroll: str, scroll_amount: int, page_height: int,
+                    automation_delay: float, settle_samples: int, settle_interval: float, end_frames: int,
+                    save_page: Callable[[int, Image.Image, tuple, str], None], trace: CaptureTrace,
+                    show_log: Callable[[str], None], is_running: Callable[[], bool] | None) -> tuple[bool, int]:
+    """스크롤 캡쳐를 수행한다. 스크롤 -> 캡쳐 -> 이전 프레임과 겹치지 않는 새 행만 이어붙여 고정 높이 페이지로 저장.
+
+    Returns:
+        (중지 여부, 렌더링 대기 시간초과 횟수)
+    """
+    next_index = start_index
+    timeouts = 0
+
+    def on_page(page_image: Image.Image) -> None:
+        nonlocal next_index
+        if next_index > page_loop:
+            return
+        show_log(f'페이지 {next_index} 저장 ({page_image.width}x{page_image.height})')
+        save_page(next_index, page_image, region, 'scroll')
+        next_index += 1
+
+    grab = trace.timed('grab', cap_backend.grab)
+    trace.begin()
+    image = grab(region)
+    page_height = page_height or round(image.width * 1.414)  # 0이면 A4 비율
+    stitcher = ScrollStitcher(page_height, on_page, snap=page_height // 20)
+    stitcher.add_frame(image)
+    prev_checksum = region_checksum(image)
+
+    n = 0
+    still = 0  # 스크롤되지 않은 프레임이 연속된 횟수
+    while next_index <= page_loop:
+        if is_running and not is_running():
+            show_log("\n캡쳐가 중지되었습니다.")
+            return True, timeouts
+
+        trace.begin()
+        with trace.measure('turn'):
+            if scroll == 'pagedown':
+                driver.press('pagedown')
+            else:
+                driver.scroll(-scroll_amount, center[0], center[1])
+
+        if settle_samples > 0:
+            result = _traced_settle(lambda: grab(region), prev_checksum, trace,
+                                    timeout=automation_delay, stable_samples=settle_samples,
+                                    interval=settle_interval)
+            image = result.image
+            timeouts += result.timed_out
+        else:
+            with trace.measure('settle'):
+                time.sleep(automation_delay)
+            image = grab(region)
+        prev_checksum = region_checksum(image)
+
+        n += 1
+        stitched = stitcher.add_frame(image)
+        show_log(f'스크롤 {n} - {stitched.shift}px 이동')
+        if not stitched.matched:
+            show_log('⚠️ 이전 화면과 겹치는 부분을 찾지 못해 화면 전체를 이어붙였습니다. 스크롤 양을 줄이세요.')
+
+        # 더 이상 스크롤되지 않으면 문서의 끝으로 본다.
+        still = still + 1 if stitched.matched and stitched.shift == 0 else 0
+        if still >= end_frames:
+            show_log(f"\n{end_frames}회 연속 스크롤되지 않아 문서의 끝으로 판단합니다.")
+            break
+
+    stitcher.flush()
+    return False, timeouts
 
 
 def _getFileListAtPath(*, directory: str, ext: str = "") -> list[str]:
@@ -68,35 +216,219 @@ def _open_directory(path):
         subprocess.call(['xdg-open', path])
 
 
-def _create_pdf(*, output_dir: str, file_name: str, show_log_fn: Callable[[str], None]) -> None:
+def _write_page_image(writer: PdfObjectWriter, image_path: str, profile: str, jpeg_quality: int,
+                      passthrough: bool) -> tuple[ImageRef, PageEncoding]:
+    """페이지 이미지 파일을 profile 에 맞는 인코딩으로 기록한다.
+
+    Returns:
+        (기록된 이미지 XObject, 선택된 페이지 인코딩)
+    """
+    if profile == 'rgb':
+        return writer.add_png(image_path, passthrough=passthrough), RGB_ENCODING
+    with Image.open(image_path) as image:
+        page_encoding = choose_encoding(image, profile)
+        if page_encoding == RGB_ENCODING:
+            # 컬러 페이지는 원본 PNG 를 그대로 넣는다.
+            return writer.add_png(image_path, passthrough=passthrough), page_encoding
+        return writer.add_image(convert_for_encoding(image, page_encoding),
+                                page_encoding.encoding, jpeg_quality), page_encoding
+
+
+def recover_interrupted_pdf(pdf_path: str, show_log_fn: Callable[[str], None]) -> bool:
+    """이전 실행이 PDF 작성 도중 강제 종료(OOM 등)되어 쓰다 만 PDF 가 남아 있으면 마지막 체크포인트까지 잘라낸다.
+
+    체크포인트가 없어 살릴 수 없는 PDF 는 지운다.
+
+    Returns:
+        쓸 수 있는 PDF 가 남아 있는지 여부
+    """
+    if not os.path.exists(pdf_path):
+        return False
+    if is_complete_pdf(pdf_path):
+        return True
+    if recover_partial_pdf(pdf_path):
+        show_log_fn(f"⚠️ 작성 도중 중단된 pdf를 마지막 체크포인트까지 복구했습니다: {pdf_path}")
+        return True
+    os.remove(pdf_path)
+    show_log_fn(f"⚠️ 작성 도중 중단되어 쓸 수 없는 pdf를 지웠습니다: {pdf_path}")
+    return False
+
+
+def _pdf_build_options(*, passthrough: bool, profile: str, jpeg_quality: int, align_pages: bool,
+                       blank_pages: str, duplicate_pages: str) -> dict:
+    """매니페스트에 기록하는 pdf 생성 설정 (splice_pdf 가 같은 설정으로 만든 pdf 인지 비교한다)"""
+    return {'passthrough': passthrough, 'profile': profile, 'jpeg_quality': jpeg_quality, 'align_pages': align_pages,
+            'blank_pages': blank_pages, 'duplicate_pages': duplicate_pages}
+
+
+def create_pdf(*, output_dir: str, file_name: str, show_log_fn: Callable[[str], None],
+               checkpoint_every: int = 0, passthrough: bool = True,
+               profile: str = 'rgb', jpeg_quality: int = 85, align_pages: bool = False,
+               blank_pages: str = 'keep', duplicate_pages: str = 'keep', backend: str = 'stream',
+               open_dir: bool = True) -> None:
     """캡쳐된 이미지들을 PDF로 변환한다.
 
+    이미지를 한 장씩 기록 -> 해제하므로 페이지 수와 무관하게 메모리 사용량이 일정하다.
+
     Args:
         output_dir: 이미지 파일이 있는 디렉토리 경로
         file_name: 생성될 PDF 파일명
         show_log_fn: 로그 출력 함수
+        checkpoint_every: N페이지마다 중간 결과를 PDF로 기록해 둔다. (작성 도중 죽어도 그때까지의 PDF는 남는다)
+        passthrough: True면 PNG 의 압축 데이터를 디코딩 없이 그대로 PDF에 넣는다.
+                     (알파/인터레이스 PNG 만 디코딩 후 다시 압축)
+        profile: 페이지 인코딩 프로파일 (page_profile.PROFILES). 'rgb' 외에는 페이지마다 색상을 검사하여
+                 컬러 페이지는 RGB 를 유지하고 글자 페이지는 흑백/팔레트/1비트/JPEG 로 줄인다.
+        jpeg_quality: profile 이 'jpeg' 일 때 JPEG 품질
+        align_pages: True면 pdf 취합 전에 페이지들의 좌우 위치를 자동으로 맞춘다. (diff_width 대신 사용)
+                  정렬된 이미지는 output_dir/_aligned 에 저장되고 원본은 그대로 남는다.
+        blank_pages: 빈 페이지 처리 (page_filter.FILTER_ACTIONS). 'drop' 은 빼고, 'share' 는 이미지 하나를 공유한다.
+        duplicate_pages: 중복 페이지(같은 파일, 또는 앞 페이지와 같은 화면) 처리. blank_pages 와 같은 값
+        backend: PDF 를 작성할 pdf_backend 이름 ('stream', 'pikepdf')
+        open_dir: True면 PDF 생성 후 폴더를 연다.
     """
-    # 이미지 파일 리스트를 가져온다.
-    imagepaths = _getFileListAtPath(directory=output_dir, ext='png')
-
-    images = [Image.open(image).convert('RGB') for image in imagepaths]
+    check_pdf_writer_backend(backend)
+
+    # 이미지 파일 리스트를 가져온다. (페이지 인덱스 순)
+    imagepaths = sorted(_getFileListAtPath(directory=output_dir, ext='png'), key=_frame_sort_key)
+    if not imagepaths:
+        show_log_fn("pdf로 취합할 이미지가 없습니다.")
+        return
+
+    if align_pages:
+        show_log_fn("페이지 좌우 정렬중...")
+        start = time.perf_counter()
+        result = register_pages(imagepaths)
+        imagepaths = result.output_paths
+        offsets = sorted(result.offsets)
+        show_log_fn(f"페이지 좌우 정렬완료. ({time.perf_counter() - start:.1f}초, "
+                    f"이동량 {offsets[0]}~{offsets[-1]}px, 공통 폭 {result.box_width}px)")
+
+    page_filter = PageFilter(blank_pages, duplicate_pages)
     show_log_fn("pdf 취합중...")
-    
-    pdf_path = os.path.join(output_dir, f'{file_name}.pdf')
-    images[0].save(pdf_path, save_all=True, append_images=images[1:])
 
-    show_log_fn("pdf 취합완료.")
+    pdf_path = os.path.join(output_dir, f'{file_name}.pdf')
+    encoding_counts = Counter()
+    filter_counts = Counter()
+    image_refs = {}  # 페이지 파일 경로 -> 기록된 이미지 XObject (공유 페이지에서 다시 참조)
+    with create_pdf_backend(backend).create_writer(pdf_path, checkpoint_every=checkpoint_every) as writer:
+        for n, image_path in enumerate(imagepaths, 1):
+            decision = page_filter.check(image_path) if page_filter.enabled else None
+            if decision and decision.action != 'keep':
+                filter_counts[decision.reason, decision.action] += 1
+                if decision.action == 'share':
+                    writer.add_page(image_refs[decision.source])
+                continue
+
+            image_ref, page_encoding = _write_page_image(writer, image_path, profile, jpeg_quality, passthrough)
+            writer.add_page(image_ref)
+            if page_filter.enabled:
+                image_refs[image_path] = image_ref
+            encoding_counts[page_encoding.label] += 1
+            if n % 100 == 0:
+                show_log_fn(f"pdf 취합중... ({n}/{len(imagepaths)})")
+
+    if profile != 'rgb':
+        summary = ', '.join(f'{label} {count}' for label, count in encoding_counts.most_common())
+        show_log_fn(f"페이지 인코딩: {summary}")
+    if filter_counts:
+        labels = {'blank': '빈 페이지', 'identical': '같은 페이지', 'similar': '앞 페이지와 같은 화면'}
+        actions = {'drop': '제외', 'share': '이미지 공유'}
+        summary = ', '.join(f'{labels[reason]} {count}장 {actions[action]}'
+                            for (reason, action), count in filter_counts.most_common())
+        show_log_fn(f"페이지 필터: {summary}")
+        dropped = sum(count for (_, action), count in filter_counts.items() if action == 'drop')
+        if dropped:
+            show_log_fn(f"⚠️ {dropped}페이지가 제외되어 PDF 페이지 번호가 캡쳐 페이지 번호와 다릅니다. (개요 적용시 확인)")
+    show_log_fn(f"pdf 취합완료. ({os.path.getsize(pdf_path) / (1024 * 1024):.1f}MB)")
+    manifest = CaptureManifest(output_dir)
+    if manifest.exists:
+        manifest.record_pdf_build(backend=backend, **_pdf_build_options(
+            passthrough=passthrough, profile=profile, jpeg_quality=jpeg_quality, align_pages=align_pages,
+            blank_pages=blank_pages, duplicate_pages=duplicate_pages))
 
     # PDF 파일 생성 후 폴더 열기
-    _open_directory(output_dir)
+    if open_dir:
+        _open_directory(output_dir)
+
+
+def splice_pdf(*, output_dir: str, file_name: str, pages: Iterable[int], show_log_fn: Callable[[str], None],
+               passthrough: bool = True, profile: str = 'rgb', jpeg_quality: int = 85, align_pages: bool = False,
+               blank_pages: str = 'keep', duplicate_pages: str = 'keep') -> bool:
+    """이미 생성된 PDF 에서 다시 캡쳐한 페이지만 교체한다. (증분 업데이트. 나머지 페이지와 개요는 그대로)
+
+    PDF 의 페이지가 매니페스트의 캡쳐 페이지와 1:1 로 대응하고, 매니페스트에 기록된 pdf 생성 설정이
+    지금 설정과 같을 때만 교체한다. 좌우 정렬, 빈/중복 페이지 처리('drop', 'share')를 하면 페이지가
+    대응하지 않으므로 False 를 반환한다. (-> create_pdf 로 다시 생성)
+
+    Args:
+        output_dir: 캡쳐 디렉토리 경로
+        file_name: PDF 파일명
+        pages: 교체할 캡쳐 페이지 인덱스 (1부터)
+        show_log_fn: 로그 출력 함수
+        passthrough, profile, jpeg_quality, align_pages, blank_pages, duplicate_pages: create_pdf 와 같은 설정
+
+    Returns:
+        교체 여부
+    """
+    pdf_path = os.path.join(output_dir, f'{file_name}.pdf')
+    manifest = CaptureManifest(output_dir)
+    if not manifest.exists or not recover_interrupted_pdf(pdf_path, show_log_fn):
+        return False
+    indices = sorted(manifest.pages)
+    if indices != list(range(1, len(indices) + 1)):
+        return False
+    options = _pdf_build_options(passthrough=passthrough, profile=profile, jpeg_quality=jpeg_quality,
+                                 align_pages=align_pages, blank_pages=blank_pages, duplicate_pages=duplicate_pages)
+    if align_pages or blank_pages != 'keep' or duplicate_pages != 'keep':
+        # 페이지 정렬/페이지 빼기/이미지 공유는 전체 페이지를 다시 계산해야 한다.
+        return False
+    build = manifest.pdf_build
+    if build is None:
+        show_log_fn("pdf 생성 설정 기록이 없어 페이지를 교체하지 않고 다시 생성합니다.")
+        return False
+    if any(build.get(name) != value for name, value in options.items()):
+        show_log_fn("pdf 를 만들 때의 설정이 지금 설정과 달라 페이지를 교체하지 않고 다시 생성합니다.")
+        return False
+
+    try:
+        with PdfPageSplicer(pdf_path) as splicer:
+            if splicer.page_count != len(indices):
+                show_log_fn(f"pdf 페이지 수({splicer.page_count})가 캡쳐 페이지 수({len(indices)})와 달라 "
+                            f"페이지를 교체할 수 없습니다.")
+                return False
+            pages = sorted(set(pages))
+            for index in pages:
+                image_path = os.path.join(output_dir, manifest.pages[index]['file'])
+                image_ref, _ = _write_page_image(splicer, image_path, profile, jpeg_quality, passthrough)
+                splicer.replace_page(index - 1, image_ref)
+    except ValueError as e:
+        show_log_fn(f"pdf 페이지를 교체할 수 없습니다: {e}")
+        return False
+
+    show_log_fn(f"pdf 페이지 교체완료. ({', '.join(map(str, pages))}페이지, "
+                f"{os.path.getsize(pdf_path) / (1024 * 1024):.1f}MB)")
+    return True
 
 
 def auto_pdf_capture(file_name: str, page_loop: int,
                      x1: int, y1: int, x2: int, y2: int,
                      margin: dict, diff_width: int = 0,
                      res: int = 1, automation_delay: float = 0.2,
-                     left_first: bool = True,
-                     log_message_signal: pyqtSignal | pyqtBoundSignal | None = None,
+                     left_first: bool = True, spread: bool = False,
+                     scroll: str = '', scroll_amount: int = 10, scroll_page_height: int = 0,
+                     backend: str = 'pyautogui', replay_dir: str = '',
+                     input_driver: str = 'pyautogui', turn_key: str = 'right',
+                     turn_click: tuple[int, int] | None = None,
+                     encode_workers: int = 0,
+                     settle_samples: int = 0, settle_interval: float = 0.02,
+                     stuck_frames: int = 0, stuck_distance: int = 2, on_stuck: str = 'stop',
+                     resume: bool = False, recapture: tuple[int, int] | None = None,
+                     pdf_checkpoint_every: int = 50,
+                     pdf_profile: str = 'rgb', jpeg_quality: int = 85, align_pages: bool = False,
+                     blank_pages: str = 'keep', duplicate_pages: str = 'keep', pdf_backend: str = 'stream',
+                     trace_format: str = 'json', countdown: int = 5, open_dir: bool = True,
+                     log_message_signal: 'pyqtSignal | pyqtBoundSignal | None' = None,
                      is_running: Callable[[], bool] | None = None) -> bool:
     """
     자동으로 화면을 캡쳐한뒤 pdf를 생성한다.
@@ -119,6 +451,49 @@ def auto_pdf_capture(file_name: str, page_loop: int,
         automation_delay: 자동화 딜레이 시간(초) 설정. 페이지 로딩할 시간을 일정시간(초) 부여 해준다.
                           (가끔 로딩이 완료 되지 않은 상태에서 캡쳐가 되면 글자가 뭉개지기 때문.)
         left_first: 좌측부터 캡쳐할지 여부. True면 좌측부터, False면 우측부터 캡쳐한다.
+        spread: True면 두 페이지가 펼쳐진 화면(x1~x2 가 펼침면 전체)을 한번에 캡쳐한 뒤 메모리에서 좌/우 페이지로
+                나눈다. 페이지 넘김 한번에 두 페이지씩 저장하므로 캡쳐/대기 횟수가 절반이 된다.
+                표지(1페이지)는 영역 전체를 캡쳐하고, diff_width 는 좌/우 절반에 각각 적용한다.
+                left_first 가 False 면 우측 페이지를 먼저 저장한다. (오른쪽에서 왼쪽으로 읽는 책)
+        scroll: 세로 스크롤 뷰어용 스크롤 캡쳐 모드. 'pagedown' 이면 PageDown 키, 'wheel' 이면 마우스 휠로 스크롤한다.
+                ('' 이면 사용 안함) 스크롤마다 캡쳐하여 이전 화면과 겹치지 않는 새 행만 이어붙이고,
+                scroll_page_height 높이마다 페이지로 잘라 저장한다. page_loop 는 최대 페이지 수가 되고,
+                연속으로 스크롤되지 않으면(stuck_frames, 기본 2회) 문서의 끝으로 보고 종료한다.
+                spread/diff_width/resume 은 적용되지 않는다.
+        scroll_amount: scroll 이 'wheel' 일 때 한번에 굴릴 휠 칸 수
+        scroll_page_height: 스크롤 캡쳐에서 자를 페이지 높이(캡쳐 픽셀). 0이면 캡쳐 폭의 A4 비율(1.414배)
+        backend: 캡쳐 백엔드 이름 ('pyautogui', 'mss', 'replay'). cap_backend.py 참고
+        replay_dir: backend 가 'replay' 일 때 프레임을 읽어올 폴더
+        input_driver: 페이지 넘김 입력 드라이버 이름 ('pyautogui', 'xtest', 'uinput', 'recording'). input_driver.py 참고
+        turn_key: 페이지를 넘길 때 누를 키 (pyautogui 키 이름)
+        turn_click: 지정하면 키 대신 이 화면 좌표 (x, y) 를 클릭하여 페이지를 넘긴다. (다음 페이지 버튼 등)
+        encode_workers: PNG 인코딩 프로세스 수. 0보다 크면 캡쳐 직후 바로 다음 페이지로 넘기고
+                        인코딩/저장은 별도 프로세스에서 처리한다. (0이면 캡쳐 쓰레드에서 직접 저장)
+        settle_samples: 0보다 크면 고정 딜레이 대신 렌더링 완료를 감지한다. 페이지 넘김 후 캡쳐 영역이
+                        이전 프레임과 달라지고 이 횟수만큼 연속으로 같은 상태를 유지하면 바로 캡쳐한다.
+                        이때 automation_delay 는 최대 대기시간으로만 사용된다.
+        settle_interval: 렌더링 완료 감지 샘플링 간격(초)
+        stuck_frames: 0보다 크면 이 횟수만큼 연속으로 거의 같은 프레임(perceptual hash)이 캡쳐될 때
+                      책의 끝이거나 페이지가 넘어가지 않는 것으로 판단한다. 중복 프레임은 삭제된다.
+        stuck_distance: 같은 프레임으로 판단할 perceptual hash 최대 해밍거리 (256비트 기준)
+        on_stuck: 'stop' 이면 캡쳐를 종료하고 바로 pdf를 생성한다. (page_loop 를 넉넉히 잡아도 된다)
+                  'pause' 이면 포커스 손실로 보고 로그를 남긴 뒤, 카운트다운 후 중복 구간부터 다시 캡쳐한다.
+        resume: True면 캡쳐 디렉토리의 매니페스트(manifest.jsonl)를 확인하여 온전히 저장된 마지막 페이지
+                다음부터 이어서 캡쳐한다. 이미 완료된 세션이면 캡쳐를 건너뛰고 바로 pdf를 생성한다.
+        recapture: (첫 페이지, 마지막 페이지). 기존 캡쳐 세션에서 이 범위만 다시 캡쳐하고, 이전 캡쳐와 픽셀 해시가
+                   달라진 페이지만 기존 pdf 에서 교체한다. (캡쳐 대상을 첫 페이지 바로 앞 페이지에 맞춰 두고 시작)
+        pdf_checkpoint_every: pdf 취합 중 N페이지마다 중간 결과를 기록한다. (0이면 마지막에 한번만 기록)
+        pdf_profile: pdf 페이지 인코딩 프로파일 ('rgb', 'gray', 'palette', 'bilevel', 'jpeg', 'auto')
+        jpeg_quality: pdf_profile 이 'jpeg' 일 때 JPEG 품질
+        align_pages: True면 pdf 취합 전에 페이지 좌우 위치를 자동으로 맞춘다. (diff_width 는 0으로 두고 사용)
+        blank_pages: pdf 취합시 빈 페이지 처리 ('keep', 'drop', 'share'). 'share' 는 이미지 데이터를 한 번만 기록한다.
+        duplicate_pages: pdf 취합시 중복 페이지(같은 파일, 또는 앞 페이지와 같은 화면) 처리 ('keep', 'drop', 'share')
+        pdf_backend: pdf 를 작성할 pdf_backend 이름 ('stream', 'pikepdf')
+        trace_format: 캡쳐 단계별 소요시간(페이지 넘김/렌더링 대기/캡쳐/인코딩/기록) 기록 형식 ('json', 'csv').
+                      캡쳐 디렉토리에 '{file_name}_trace.json' 등으로 저장한다. ('' 이면 저장하지 않음)
+                      다시 캡쳐한 기록은 '{file_name}_recapture_57-60_trace.json' 처럼 페이지 범위를 넣어 따로 저장한다.
+        countdown: 캡쳐 시작 전(및 일시 정지 후 재시작 전) 캡쳐 대상으로 포커스를 옮길 대기시간(초)
+        open_dir: True면 pdf 생성 후 캡쳐 디렉토리를 연다.
         log_message_signal: 로그 메시지를 전달할 신호
         is_running: 캡쳐 중지 여부를 확인할 함수
     Returns:
@@ -129,6 +504,13 @@ def auto_pdf_capture(file_name: str, page_loop: int,
             log_message_signal.emit(log_message) # type: ignore
         print(log_message)
 
+    if trace_format and trace_format not in TRACE_FORMATS:
+        raise ValueError(f"지원하지 않는 trace 형식입니다: {trace_format} (가능한 값: {', '.join(TRACE_FORMATS)})")
+    for value in (blank_pages, duplicate_pages):
+        if value not in FILTER_ACTIONS:
+            raise ValueError(f"지원하지 않는 페이지 필터입니다: {value} (가능한 값: {', '.join(FILTER_ACTIONS)})")
+    check_pdf_writer_backend(pdf_backend)
+
     # 마진 적용
     x1 -= margin["left"]
     y1 -= margin["top"]
@@ -143,9 +525,97 @@ def auto_pdf_capture(file_name: str, page_loop: int,
     capture_region_left_page = (x * res, y * res, (width - diff_width) * res, height * res)
     capture_region_right_page = ((x + diff_width) * res, y * res, (width - diff_width) * res, height * res)
     dir_name = f'./__{file_name}'
+    if spread:
+        # 펼침면 모드에서는 영역 전체가 펼침면이고 좌/우 페이지는 그 절반이다.
+        spread_pages = _spread_regions(capture_region_first_page, diff_width * res)
+        capture_region_left_page = spread_pages['left']
+        capture_region_right_page = spread_pages['right']
+    regions = {
+        'first': list(capture_region_first_page),
+        'left': list(capture_region_left_page),
+        'right': list(capture_region_right_page),
+    }
+    if spread:
+        regions['spread'] = list(capture_region_first_page)
     # --------------------------------------------------------------------------------
 
-    show_log(f'전체화면 {pyautogui.size()}')
+    # 이전 세션 이어서 캡쳐
+    manifest = CaptureManifest(dir_name)
+    if scroll and resume:
+        show_log('스크롤 캡쳐는 이어서 캡쳐를 지원하지 않습니다. 처음부터 캡쳐합니다.')
+        resume = False
+    start_index = 1
+    previous_hashes: dict[int, str] = {}
+    was_completed = manifest.completed
+    if recapture:
+        first, last = recapture
+        if scroll:
+            raise ValueError('스크롤 캡쳐는 페이지 범위 다시 캡쳐를 지원하지 않습니다.')
+        if not manifest.exists:
+            raise ValueError(f'다시 캡쳐할 캡쳐 세션이 없습니다: {dir_name}')
+        if not 1 <= first <= last:
+            raise ValueError(f'다시 캡쳐할 페이지 범위가 잘못되었습니다: {first}~{last}')
+        # 펼침면 모드는 펼침면(짝수 페이지부터) 단위로 캡쳐한다.
+        if spread and first > 1 and first % 2 == 1:
+            first -= 1
+        previous_hashes = {index: manifest.pages[index]['hash']
+                           for index in range(first, last + 1) if index in manifest.pages}
+        start_index = first
+        page_loop = last
+        stuck_frames = 0  # 중간 페이지만 캡쳐하므로 마지막 페이지 감지(중복 페이지 삭제)는 하지 않는다.
+        resume = False
+        if manifest.session.get('regions') != regions:
+            show_log('⚠️ 캡쳐 영역이 이전 세션과 다릅니다.')
+        show_log(f'{first}~{last}페이지를 다시 캡쳐합니다.')
+        if first > 1:
+            show_log(f'캡쳐 대상을 {first - 1}페이지에 맞춰 두세요.')
+    if resume or recapture:
+        recover_interrupted_pdf(os.path.join(dir_name, f'{file_name}.pdf'), show_log)
+    if resume and manifest.exists:
+        valid_count = manifest.valid_page_count()
+        if (manifest.completed and valid_count == len(manifest.pages)) or valid_count >= page_loop:
+            show_log(f'이미 완료된 캡쳐 세션입니다. ({valid_count}페이지) 캡쳐를 건너뛰고 pdf를 생성합니다.')
+            create_pdf(output_dir=dir_name, file_name=file_name, show_log_fn=show_log,
+                       checkpoint_every=pdf_checkpoint_every,
+                       profile=pdf_profile, jpeg_quality=jpeg_quality, align_pages=align_pages,
+                       blank_pages=blank_pages, duplicate_pages=duplicate_pages, backend=pdf_backend,
+                       open_dir=open_dir)
+            return True
+
+        # 펼침면 모드에서 펼침면의 절반만 저장되어 있으면 그 펼침면부터 다시 캡쳐한다. (펼침면은 짝수 페이지부터)
+        if spread and valid_count > 1 and valid_count % 2 == 0:
+            valid_count -= 1
+        # 온전하지 않은 페이지부터 다시 캡쳐한다.
+        stale = [index for index in manifest.pages if index > valid_count]
+        if stale:
+            _remove_frames(output_dir=dir_name, filename=file_name, indices=stale)
+            manifest.remove_pages(stale)
+        start_index = valid_count + 1
+        if manifest.session.get('regions') != regions:
+            show_log('⚠️ 캡쳐 영역이 이전 세션과 다릅니다.')
+        show_log(f'이전 세션에서 {valid_count}페이지까지 저장되어 있습니다. {start_index}페이지부터 이어서 캡쳐합니다.')
+        if valid_count > 0:
+            show_log(f'캡쳐 대상을 마지막으로 캡쳐된 {valid_count}페이지에 맞춰 두세요.')
+
+    backend_kwargs = {'frame_dir': replay_dir} if backend == 'replay' else {}
+    cap_backend = create_capture_backend(backend, **backend_kwargs)
+    try:
+        driver_kwargs = {'screen_size': cap_backend.screen_size()} if input_driver == 'uinput' else {}
+        driver = create_input_driver(input_driver, **driver_kwargs)
+    except Exception:
+        cap_backend.close()
+        raise
+
+    def turn_page() -> None:
+        """다음 페이지로 넘긴다."""
+        if turn_click is not None:
+            driver.click(*turn_click)
+        else:
+            driver.press(turn_key)
+
+    show_log(f'캡쳐 백엔드 {cap_backend.name}')
+    show_log(f'입력 드라이버 {driver.name}')
+    show_log(f'전체화면 {cap_backend.screen_size()}')
     show_log(f'x = {x}')
     show_log(f'y = {y}')
     show_log(f'width = {width}')
@@ -154,10 +624,10 @@ def auto_pdf_capture(file_name: str, page_loop: int,
     show_log(f'capture_region_left_page = {capture_region_left_page}')
     show_log(f'capture_region_right_page = {capture_region_right_page}')
 
-    show_log("\n캡쳐 대상으로 포커스를 이동하세요...\n5초뒤 시작합니다.\n")
+    show_log(f"\n캡쳐 대상으로 포커스를 이동하세요...\n{countdown}초뒤 시작합니다.\n")
 
     # 카운트 다운
-    tmp_seconds = 5
+    tmp_seconds = countdown
     for i in range(tmp_seconds, 0, -1):
         show_log(str(i))
         time.sleep(1)
@@ -165,63 +635,241 @@ def auto_pdf_capture(file_name: str, page_loop: int,
     # 생성 디렉터리 체크
     if not os.path.exists(dir_name):
         os.makedirs(dir_name)
+    if start_index == 1 and not recapture:
+        manifest.start_session(file_name=file_name, page_loop=page_loop, regions=regions,
+                               diff_width=diff_width, left_first=left_first, spread=spread, scroll=scroll)
 
     # --------------------------------------------------------------------
     # 캡쳐 자동화
     # --------------------------------------------------------------------
     start_time = time.time()
-
-    # 첫 페이지 캡쳐
-    capture_region = capture_region_first_page
-    show_log(f'\n캡쳐 1 - 표지 {capture_region}')
-            
-    _screenshot(
-        capture_region=capture_region,
-        output_dir=dir_name,
-        filename=file_name,
-        index=1
-    )
-    pyautogui.press("right")
-    time.sleep(automation_delay)
-
-    # 페이지 수 까지 반복 캡쳐 수행
-    for i in range(2, page_loop + 1):
-
-        # 중지 요청이 있는지 확인
-        if is_running and not is_running():
-            show_log("\n캡쳐가 중지되었습니다.")
-            _create_pdf(output_dir=dir_name, file_name=file_name, show_log_fn=show_log)
-            return False
-
+    stopped = False
+
+    # PNG 인코딩을 별도 프로세스로 넘기면 캡쳐 직후 바로 다음 페이지로 넘어갈 수 있다.
+    encode_pool = EncodePool(workers=encode_workers) if encode_workers > 0 else None
+    if encode_pool is not None:
+        show_log(f'PNG 인코딩 프로세스 {encode_pool.workers}개 사용')
+
+    def side_of(index: int) -> str:
+        """페이지 인덱스에 해당하는 페이지 방향 ('cover', 'left', 'right')"""
+        if index == 1:
+            return 'cover'
+        return 'left' if (left_first and index % 2 == 0) or (not left_first and index % 2 != 0) else 'right'
+
+    def region_of(index: int) -> tuple:
+        """페이지 인덱스에 해당하는 캡쳐 영역"""
+        if index == 1:
+            return capture_region_first_page
         # 좌측부터 시작하는 경우와 우측부터 시작하는 경우에 따라 캡쳐 순서를 다르게 처리
         if left_first:
-            capture_region = capture_region_left_page if i % 2 == 0 else capture_region_right_page
-        else:
-            capture_region = capture_region_right_page if i % 2 == 0 else capture_region_left_page
-            
-        if diff_width > 0:
-            which = '좌측 ' if (left_first and i % 2 == 0) or (not left_first and i % 2 != 0) else '우측 '
-        else:
-            which = ''
-        
-        show_log(f'캡쳐 {i} - {which}{capture_region}')
-        _screenshot(
-            capture_region=capture_region,
+            return capture_region_left_page if index % 2 == 0 else capture_region_right_page
+        return capture_region_right_page if index % 2 == 0 else capture_region_left_page
+
+    encoding_pages: dict[str, tuple[int, tuple, str]] = {}  # 인코딩 대기중인 파일 경로 -> (인덱스, 영역, 방향)
+
+    def record_encoded_pages() -> None:
+        """인코더 프로세스가 기록을 마친 페이지만 매니페스트에 기록한다. (해시도 인코더가 계산한다)"""
+        if encode_pool is None:
+            return
+        for path, frame_hash in encode_pool.pop_done():
+            index, page_region, side = encoding_pages.pop(path)
+            manifest.add_page(index=index, file=os.path.basename(path), region=page_region, side=side,
+                              frame_hash=frame_hash)
+
+    def save_page(index: int, page_image: Image.Image, page_region: tuple, side: str) -> None:
+        """페이지 이미지를 저장하고 매니페스트에 기록한다."""
+        start = time.perf_counter()
+        timings = _save_frame(
+            image=page_image,
             output_dir=dir_name,
             filename=file_name,
-            index=i
+            index=index,
+            encode_pool=encode_pool
         )
-        pyautogui.press("right")
-        pyautogui.sleep(automation_delay)  # 페이지 로딩할 시간을 일정시간(초) 부여 해준다. (가끔 로딩이 완료 되지 않은 상태에서 캡쳐가 되면 글자가 뭉개지기 때문.)
-
-    show_log("캡쳐 완료.")
-        
-    _create_pdf(output_dir=dir_name, file_name=file_name, show_log_fn=show_log)
+        path = _frame_path(dir_name, file_name, index)
+        trace.add_page(index, path)
+        if timings is None:
+            trace.add('submit', time.perf_counter() - start)
+            encoding_pages[path] = (index, page_region, side)
+            record_encoded_pages()
+        else:
+            trace.add('encode', timings[0])
+            trace.add('save', timings[1])
+            manifest.add_page(index=index, file=os.path.basename(path), region=page_region, side=side,
+                              frame_hash=content_hash(page_image))
+
+    trace = CaptureTrace()
+    grab = trace.timed('grab', cap_backend.grab)
+    settle_timeouts = 0
+    prev_region = None
+    prev_checksum = None
+
+    prev_hash = None
+    dup_run = 0  # 직전 프레임과 거의 같은 프레임이 연속으로 캡쳐된 횟수
+    grab_starts: list[int] = []  # 캡쳐(화면 캡쳐 1회)마다 저장한 첫 페이지 인덱스
+
+    try:
+        if scroll:
+            stopped, settle_timeouts = _scroll_capture(
+                cap_backend=cap_backend, driver=driver, region=capture_region_first_page,
+                center=(x + width // 2, y + height // 2), start_index=start_index, page_loop=page_loop,
+                scroll=scroll, scroll_amount=scroll_amount, page_height=scroll_page_height,
+                automation_delay=automation_delay, settle_samples=settle_samples, settle_interval=settle_interval,
+                end_frames=stuck_frames or 2, save_page=save_page, trace=trace,
+                show_log=show_log, is_running=is_running)
+        else:
+            # 페이지 수 까지 반복 캡쳐 수행
+            i = start_index
+            while i <= page_loop:
+                is_spread = spread and i > 1
+                capture_region = capture_region_first_page if is_spread else region_of(i)
+                settle_note = ''
+
+                if i == 1:
+                    # 첫 페이지 캡쳐
+                    which = '표지 '
+                    trace.begin()
+                    image = grab(capture_region)
+                else:
+                    # 중지 요청이 있는지 확인
+                    if is_running and not is_running():
+                        show_log("\n캡쳐가 중지되었습니다.")
+                        stopped = True
+                        break
+                    trace.begin()
+
+                    if is_spread:
+                        which = '펼침면 '
+                    elif diff_width > 0:
+                        which = '좌측 ' if side_of(i) == 'left' else '우측 '
+                    else:
+                        which = ''
+
+                    if settle_samples > 0:
+                        # 페이지 넘김 전의 같은 영역 체크섬을 기준으로 변화를 감지한다.
+                        if capture_region != prev_region:
+                            prev_checksum = region_checksum(grab(capture_region))
+                        with trace.measure('turn'):
+                            turn_page()
+                        result = _traced_settle(lambda: grab(capture_region), prev_checksum, trace,
+                                                timeout=automation_delay, stable_samples=settle_samples,
+                                                interval=settle_interval)
+                        image = result.image
+                        if result.timed_out:
+                            settle_timeouts += 1
+                        settle_note = f' (대기 {result.elapsed:.3f}초{", 시간초과" if result.timed_out else ""})'
+                    else:
+                        with trace.measure('turn'):
+                            turn_page()
+                        with trace.measure('settle'):
+                            time.sleep(automation_delay)  # 페이지 로딩할 시간을 일정시간(초) 부여 해준다. (가끔 로딩이 완료 되지 않은 상태에서 캡쳐가 되면 글자가 뭉개지기 때문.)
+                        image = grab(capture_region)
+
+                show_log(f'캡쳐 {i} - {which}{capture_region}{settle_note}')
+
+                # 캡쳐 한번으로 저장할 페이지들 (인덱스, 이미지, 영역, 방향)
+                if is_spread:
+                    sides = ('left', 'right') if left_first else ('right', 'left')
+                    page_regions = {'left': capture_region_left_page, 'right': capture_region_right_page}
+                    pages = [(i + n, _crop_region(image, capture_region, page_regions[side]), page_regions[side], side)
+                             for n, side in enumerate(sides) if i + n <= page_loop]
+                else:
+                    pages = [(i, image, capture_region, side_of(i))]
+
+                for index, page_image, page_region, side in pages:
+                    save_page(index, page_image, page_region, side)
+                last_index = pages[-1][0]
+                grab_starts.append(i)
+
+                if settle_samples > 0:
+                    prev_region = capture_region
+                    prev_checksum = region_checksum(image)
+
+                # 마지막 페이지 / 페이지 넘김 실패 감지 (펼침면 모드는 펼침면 단위로 비교)
+                if stuck_frames > 0:
+                    frame_hash = dhash(image)
+                    if prev_hash is not None and hamming(prev_hash, frame_hash) <= stuck_distance:
+                        dup_run += 1
+                    else:
+                        dup_run = 0
+                    prev_hash = frame_hash
+
+                    if dup_run >= stuck_frames:
+                        first_dup = grab_starts[-dup_run]
+                        _remove_frames(output_dir=dir_name, filename=file_name,
+                                       indices=range(first_dup, last_index + 1), encode_pool=encode_pool)
+                        record_encoded_pages()  # 삭제 기록보다 먼저 남긴다.
+                        manifest.remove_pages(range(first_dup, last_index + 1))
+                        dup_run = 0
+                        if on_stuck == 'pause':
+                            show_log(f"\n같은 페이지가 {stuck_frames}회 연속 캡쳐되었습니다. 캡쳐 대상의 포커스를 확인하세요."
+                                     f"\n캡쳐 대상으로 포커스를 이동하세요...\n{tmp_seconds}초뒤 {first_dup}페이지부터 다시 시작합니다.\n")
+                            for sec in range(tmp_seconds, 0, -1):
+                                show_log(str(sec))
+                                time.sleep(1)
+                            i = first_dup
+                            prev_region = None
+                            continue
+                        show_log(f"\n같은 페이지가 {stuck_frames}회 연속 캡쳐되어 마지막 페이지로 판단합니다. "
+                                 f"(중복 {first_dup}~{last_index} 삭제, 총 {first_dup - 1}페이지)")
+                        break
+
+                i = last_index + 1
+    finally:
+        cap_backend.close()
+        driver.close()
+        # pdf 취합 전에 인코딩 대기중인 프레임을 모두 디스크에 기록한다. (인코딩 오류는 여기서 전달된다)
+        if encode_pool is not None:
+            show_log("PNG 저장 대기중...")
+            try:
+                encode_pool.close()
+            finally:
+                record_encoded_pages()
+
+    if encode_pool is not None:
+        for path, (encode_time, write_time) in encode_pool.timings.items():
+            trace.add_file_timing(path, 'encode', encode_time)
+            trace.add_file_timing(path, 'save', write_time)
+
+    if not stopped:
+        if not recapture or was_completed:
+            manifest.mark_complete()
+        show_log("캡쳐 완료.")
+    trace.log_summary(show_log)
+    if settle_samples > 0:
+        show_log(f'렌더링 대기 시간초과 {settle_timeouts}건')
+    if trace_format:
+        # 다시 캡쳐한 기록이 전체 캡쳐 기록을 덮어쓰지 않도록 파일명에 페이지 범위를 넣는다.
+        trace_name = f'{file_name}_recapture_{start_index}-{page_loop}' if recapture else file_name
+        trace_path = os.path.join(dir_name, f'{trace_name}_trace.{trace_format}')
+        trace.write(trace_path, trace_format)
+        show_log(f'단계별 소요시간 기록: {trace_path}')
+    show_log(driver.overhead_summary())
+
+    pdf_done = False
+    if recapture:
+        changed = [index for index in range(start_index, page_loop + 1)
+                   if index in manifest.pages and manifest.pages[index]['hash'] != previous_hashes.get(index)]
+        show_log(f'바뀐 페이지: {", ".join(map(str, changed))}' if changed else '다시 캡쳐한 페이지 중 바뀐 페이지가 없습니다.')
+        if not changed:
+            pdf_done = os.path.exists(os.path.join(dir_name, f'{file_name}.pdf'))
+        else:
+            pdf_done = splice_pdf(output_dir=dir_name, file_name=file_name, pages=changed, show_log_fn=show_log,
+                                  profile=pdf_profile, jpeg_quality=jpeg_quality, align_pages=align_pages,
+                                  blank_pages=blank_pages, duplicate_pages=duplicate_pages)
+        if pdf_done and open_dir:
+            _open_directory(dir_name)
+
+    if not pdf_done:
+        create_pdf(output_dir=dir_name, file_name=file_name, show_log_fn=show_log,
+                   checkpoint_every=pdf_checkpoint_every, profile=pdf_profile, jpeg_quality=jpeg_quality,
+                   align_pages=align_pages, blank_pages=blank_pages, duplicate_pages=duplicate_pages,
+                   backend=pdf_backend, open_dir=open_dir)
 
     show_log('-----------------------------------------------------------')
     show_log(f'총 소요시간: {time.time() - start_time:.2f}초')
     # --------------------------------------------------------------------
 
-    return True
+    return not stopped
 
 # end of file
\ No newline at end of file
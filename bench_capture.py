@@ -0,0 +1,57 @@
+"""
+캡쳐 백엔드 마이크로 벤치마크
+
+각 캡쳐 백엔드로 같은 영역을 반복 캡쳐하여 초당 캡쳐 횟수(grabs/s)를 출력한다.
+화면이 없는 환경에서는 replay 백엔드만 측정된다. (나머지는 건너뜀으로 표시)
+
+사용법 :
+    $ python bench_capture.py --region 100 100 800 1000 --count 50
+    $ python bench_capture.py --backends replay --replay-dir ./__책이름
+"""
+
+import argparse
+import time
+from cap_backend import CAPTURE_BACKENDS, create_capture_backend
+
+
+def bench_backend(name: str, region: tuple, count: int, replay_dir: str = '') -> tuple[float, float]:
+    """하나의 백엔드를 측정한다.
+
+    Returns:
+        (초당 캡쳐 횟수, 1회 평균 소요시간(ms))
+    """
+    kwargs = {'frame_dir': replay_dir} if name == 'replay' else {}
+    with create_capture_backend(name, **kwargs) as backend:
+        backend.grab(region)  # 워밍업 (연결/공유메모리 생성 비용 제외)
+        start = time.perf_counter()
+        for _ in range(count):
+            backend.grab(region)
+        elapsed = time.perf_counter() - start
+    return count / elapsed, elapsed / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='캡쳐 백엔드별 초당 캡쳐 횟수 측정')
+    parser.add_argument('--region', type=int, nargs=4, default=[0, 0, 800, 1000],
+                        metavar=('X', 'Y', 'WIDTH', 'HEIGHT'), help='캡쳐 영역')
+    parser.add_argument('--count', type=int, default=30, help='백엔드별 반복 횟수')
+    parser.add_argument('--backends', nargs='+', default=list(CAPTURE_BACKENDS), help='측정할 백엔드')
+    parser.add_argument('--replay-dir', default='', help='replay 백엔드가 읽을 프레임 폴더')
+    args = parser.parse_args()
+
+    region = tuple(args.region)
+    print(f'region = {region}, count = {args.count}')
+    print(f'{"backend":<12}{"grabs/s":>10}{"ms/grab":>10}')
+    for name in args.backends:
+        try:
+            rate, ms = bench_backend(name, region, args.count, args.replay_dir)
+        except Exception as e:
+            print(f'{name:<12}{"skip":>10}  ({e})')
+            continue
+        print(f'{name:<12}{rate:>10.1f}{ms:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
+
+# end of file
@@ -0,0 +1,92 @@
+"""
+OCR 업로드 전처리 벤치마크
+
+목차 이미지 폴더의 이미지마다 업로드 전처리(ocr_preprocess) 전/후의
+    - 크기(KB), 형식, 축소 비율, 전처리 시간
+을 출력한다. OCR 비밀키/API URL 이 있으면 원본과 전처리 이미지를 번갈아 --runs 번씩 요청하여
+    - 평균 응답 시간(업로드 포함), 인식 결과가 같은지
+도 비교한다. (응답 캐시는 사용하지 않는다. 요청 수만큼 API 사용량이 발생한다)
+
+사용법 :
+    $ python bench_ocr_preprocess.py toc                          # 크기만 비교
+    $ CLOVA_OCR_SECRET_KEY=... CLOVA_OCR_API_URL=... python bench_ocr_preprocess.py toc --runs 3
+    $ python bench_ocr_preprocess.py toc --text-height 24 --jpeg-quality 70
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+
+def main():
+    from cli import OCR_API_URL_ENV, OCR_SECRET_ENV
+    from outline_ocr import get_image_files, parse_ocr_result
+    from ocr_preprocess import OcrPreprocessor
+
+    parser = argparse.ArgumentParser(description='OCR 업로드 전처리 전/후 크기, 응답 시간 비교')
+    parser.add_argument('images', help='목차 이미지 폴더')
+    parser.add_argument('--text-height', type=int, default=32, help='축소 후 글자 줄 높이(px)')
+    parser.add_argument('--jpeg-quality', type=int, default=80, help='JPEG 품질')
+    parser.add_argument('--runs', type=int, default=1, help='이미지마다 원본/전처리 요청 반복 횟수')
+    parser.add_argument('--secret-key', default=os.environ.get(OCR_SECRET_ENV, ''), help='OCR 비밀키')
+    parser.add_argument('--api-url', default=os.environ.get(OCR_API_URL_ENV, ''), help='OCR API URL')
+    args = parser.parse_args()
+
+    image_files = get_image_files(args.images)
+    if not image_files:
+        print(f'❌ 이미지가 없습니다: {args.images}')
+        return 1
+    preprocessor = OcrPreprocessor(args.text_height, args.jpeg_quality)
+
+    client = None
+    if args.secret_key and args.api_url:
+        from ocr_client import OcrClient
+        client = OcrClient(args.secret_key, args.api_url, concurrency=1, max_retries=2)
+
+    print(f'{"image":<24}{"orig KB":>10}{"prep KB":>10}{"fmt":>5}{"scale":>7}{"prep ms":>9}', end='')
+    print(f'{"orig s":>9}{"prep s":>9}  same' if client else '')
+    total_original = total_prepared = 0
+    latencies = {'orig': [], 'prep': []}
+    for image_file in image_files:
+        with open(image_file, 'rb') as f:
+            data = f.read()
+        start = time.perf_counter()
+        prepared = preprocessor.prepare(data)
+        prep_ms = (time.perf_counter() - start) * 1000
+        total_original += len(data)
+        total_prepared += len(prepared.data)
+        print(f'{os.path.basename(image_file)[:23]:<24}{len(data) / 1024:>10.0f}{len(prepared.data) / 1024:>10.0f}'
+              f'{prepared.format:>5}{prepared.scale:>7.2f}{prep_ms:>9.0f}', end='')
+        if not client:
+            print()
+            continue
+
+        # 원본과 전처리 이미지를 번갈아 요청한다. (시간대별 API 지연 차이가 한쪽에 몰리지 않도록)
+        times = {'orig': [], 'prep': []}
+        lines = {}
+        for _ in range(args.runs):
+            for name, (payload, image_format) in (('orig', (data, 'png')), ('prep', (prepared.data, prepared.format))):
+                start = time.perf_counter()
+                lines[name] = parse_ocr_result(client.ocr_bytes(payload, image_format))
+                times[name].append(time.perf_counter() - start)
+        for name in times:
+            latencies[name].extend(times[name])
+        same = '예' if lines['orig'] == lines['prep'] else '아니오'
+        print(f'{statistics.mean(times["orig"]):>9.2f}{statistics.mean(times["prep"]):>9.2f}  {same}')
+
+    print()
+    print(f'업로드 크기: {total_original / (1024 * 1024):.2f}MB -> {total_prepared / (1024 * 1024):.2f}MB '
+          f'({(1 - total_prepared / total_original) * 100:.0f}% 감소)')
+    if client:
+        orig, prep = statistics.mean(latencies['orig']), statistics.mean(latencies['prep'])
+        print(f'평균 응답 시간: 원본 {orig:.2f}초 -> 전처리 {prep:.2f}초 ({prep - orig:+.2f}초)')
+        client.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# end of file
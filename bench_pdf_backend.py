@@ -0,0 +1,166 @@
+"""
+PDF 백엔드 벤치마크
+
+합성 페이지로 100/1000/5000 페이지짜리 문서를 만들어 백엔드(pdf_backend)별로
+    - build   : 이미지로 PDF 생성
+    - outline : 생성된 PDF 에 개요 적용 (10페이지마다 항목 하나, 2단계 깊이)
+을 측정하고 소요시간, 최대 메모리(peak RSS), 결과 파일 크기를 출력한다.
+측정마다 새 프로세스에서 실행하므로 peak RSS 가 서로 섞이지 않는다. (파이썬/모듈 로드 메모리 포함)
+합성 페이지는 서로 다른 PNG 몇 장을 돌려가며 사용한다. (페이지 수만큼 이미지 파일을 만들지 않도록)
+peak RSS 는 resource 모듈이 없는 Windows 에서는 '-' 로 표시된다.
+
+사용법 :
+    $ python bench_pdf_backend.py
+    $ python bench_pdf_backend.py --pages 100 1000 --backends stream pikepdf --ops build
+    $ python bench_pdf_backend.py --page-size 1240 1754 --variants 20 --keep
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+OPS = ('build', 'outline')
+
+
+def make_pages(directory: str, count: int, size: tuple[int, int]) -> list[str]:
+    """글자 줄처럼 보이는 합성 페이지 PNG 를 count 장 만든다."""
+    from PIL import Image, ImageDraw
+
+    os.makedirs(directory, exist_ok=True)
+    width, height = size
+    paths = []
+    for n in range(count):
+        rng = random.Random(n)
+        image = Image.new('L', size, 255)
+        draw = ImageDraw.Draw(image)
+        line_height = max(8, height // 50)
+        for y in range(height // 10, height - height // 10, line_height * 2):
+            x = width // 10
+            while x < width - width // 10:
+                word = rng.randint(line_height, line_height * 5)
+                draw.rectangle((x, y, min(x + word, width - width // 10), y + line_height), fill=rng.randint(0, 60))
+                x += word + line_height
+        path = os.path.join(directory, f'page_{n:03d}.png')
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def outline_items(pages: int) -> list[tuple[int, str, int]]:
+    """10페이지마다 항목 하나. 50페이지마다 장(깊이 0), 나머지는 절(깊이 1)"""
+    return [(0 if page % 50 == 0 else 1, f'{page // 50 + 1}장 {page}페이지', page) for page in range(0, pages, 10)]
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024  # macOS 는 바이트, 리눅스는 KB
+
+
+def run_child(op: str, backend_name: str, pages: int, workdir: str) -> None:
+    """자식 프로세스에서 한 가지 측정을 실행하고 결과를 JSON 한 줄로 출력한다."""
+    from pdf_backend import create_pdf_backend
+
+    result = {}
+    output = os.path.join(workdir, f'{op}_{backend_name}_{pages}.pdf')
+    try:
+        backend = create_pdf_backend(backend_name)
+        if op == 'build':
+            variants = sorted(os.path.join(workdir, 'pages', name) for name in os.listdir(os.path.join(workdir, 'pages')))
+            start = time.perf_counter()
+            with backend.create_writer(output) as writer:
+                for n in range(pages):
+                    writer.add_page(writer.add_png(variants[n % len(variants)]))
+        else:
+            shutil.copyfile(os.path.join(workdir, f'base_{pages}.pdf'), output)
+            items = outline_items(pages)
+            start = time.perf_counter()
+            backend.set_outline(output, items)
+        result['seconds'] = time.perf_counter() - start
+        result['size_mb'] = os.path.getsize(output) / (1024 * 1024)
+    except NotImplementedError:
+        result['skip'] = '지원 안 함'
+    except ImportError as e:
+        result['skip'] = f'사용 불가 ({e})'
+    result['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(result))
+
+
+def run_once(op: str, backend_name: str, pages: int, workdir: str) -> dict:
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', op, backend_name, str(pages), workdir],
+                          cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {'skip': f'오류 ({lines[-1] if lines else proc.returncode})'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    from pdf_backend import PDF_BACKENDS
+
+    parser = argparse.ArgumentParser(description='PDF 백엔드별 생성/개요 적용 시간, 메모리, 파일 크기 측정')
+    parser.add_argument('--pages', type=int, nargs='+', default=[100, 1000, 5000], help='문서 페이지 수')
+    parser.add_argument('--backends', nargs='+', default=list(PDF_BACKENDS), help='측정할 백엔드')
+    parser.add_argument('--ops', nargs='+', default=list(OPS), choices=OPS, help='측정할 작업')
+    parser.add_argument('--page-size', type=int, nargs=2, default=[1000, 1400], metavar=('WIDTH', 'HEIGHT'),
+                        help='합성 페이지 크기(px)')
+    parser.add_argument('--variants', type=int, default=10, help='돌려가며 사용할 서로 다른 합성 페이지 수')
+    parser.add_argument('--workdir', default='', help='작업 폴더 (없으면 임시 폴더)')
+    parser.add_argument('--keep', action='store_true', help='측정 후 작업 폴더(생성된 PDF)를 지우지 않음')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        op, backend_name, pages, workdir = args.child
+        run_child(op, backend_name, int(pages), workdir)
+        return 0
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_pdf_')
+    try:
+        page_paths = make_pages(os.path.join(workdir, 'pages'), args.variants, tuple(args.page_size))
+        if 'outline' in args.ops:
+            # 개요 적용 대상 PDF 는 stream 백엔드로 미리 만든다.
+            from pdf_backend import create_pdf_backend
+            for pages in args.pages:
+                with create_pdf_backend('stream').create_writer(os.path.join(workdir, f'base_{pages}.pdf')) as writer:
+                    for n in range(pages):
+                        writer.add_page(writer.add_png(page_paths[n % len(page_paths)]))
+
+        print(f'page size = {args.page_size[0]}x{args.page_size[1]}, variants = {args.variants}, workdir = {workdir}')
+        print(f'{"pages":>6}  {"op":<8}{"backend":<10}{"seconds":>10}{"peak MB":>10}{"size MB":>10}')
+        best = {}
+        for pages in args.pages:
+            for op in args.ops:
+                for backend_name in args.backends:
+                    result = run_once(op, backend_name, pages, workdir)
+                    if 'skip' in result:
+                        print(f'{pages:>6}  {op:<8}{backend_name:<10}  {result["skip"]}')
+                        continue
+                    rss = f'{result["peak_rss_mb"]:.0f}' if result['peak_rss_mb'] is not None else '-'
+                    print(f'{pages:>6}  {op:<8}{backend_name:<10}{result["seconds"]:>10.2f}{rss:>10}'
+                          f'{result["size_mb"]:>10.1f}')
+                    if (op, pages) not in best or result['seconds'] < best[op, pages][1]:
+                        best[op, pages] = (backend_name, result['seconds'])
+
+        print()
+        for (op, pages), (backend_name, seconds) in best.items():
+            print(f'가장 빠른 백엔드 - {op} {pages}페이지: {backend_name} ({seconds:.2f}초)')
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# end of file
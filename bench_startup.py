@@ -0,0 +1,151 @@
+"""
+GUI 시작 시간 벤치마크
+
+새 프로세스에서 프로그램을 띄워 단계별 시작 시간을 측정한다. (import 상태가 섞이지 않도록 매 회 새 프로세스)
+모든 시간은 프로세스를 띄운 시점 기준 누적 시간(ms)이다.
+    - python start       : 파이썬 인터프리터 시작 (site-packages 로드 포함)
+    - import Qt          : PyQt6 import
+    - import main_window : 탭/캡쳐 모듈 import
+    - MainWindow()       : 메인 창 생성 (설정 불러오기 포함)
+    - first paint        : 메인 창이 처음 그려질 때까지 (프로세스 시작 기준)
+첫 화면 전에 import 되면 안 되는 무거운 모듈(numpy, requests, PyPDF2 등)이 import 되었는지도 검사한다.
+--max-ms 를 지정하면 first paint 중앙값이 그보다 크거나 무거운 모듈이 import 된 경우 종료코드 1 을 반환한다. (회귀 검사용)
+
+사용법 :
+    $ python bench_startup.py --runs 5
+    $ python bench_startup.py --offscreen --max-ms 800     # 화면 없는 환경 (QT_QPA_PLATFORM=offscreen)
+    $ python bench_startup.py --imports                    # import 시간이 큰 모듈 목록 (python -X importtime)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# 첫 화면 전에 import 되면 안 되는 모듈 (처음 사용할 때 import 한다)
+HEAVY_MODULES = ('numpy', 'PIL.Image', 'requests', 'PyPDF2', 'pyautogui', 'mss', 'auto_pdf_capture')
+PHASES = ('python start', 'import Qt', 'import main_window', 'MainWindow()', 'first paint')
+SPAWN_ENV = 'BENCH_STARTUP_SPAWN'  # 부모 프로세스가 자식을 띄운 시각 (time.time())
+
+
+def run_child() -> None:
+    """자식 프로세스에서 실행된다. 단계별 시간(ms)을 JSON 한 줄로 출력한다."""
+    # 프로세스를 띄운 시각을 perf_counter 기준으로 환산한다.
+    start = time.perf_counter() - (time.time() - float(os.environ.get(SPAWN_ENV, time.time())))
+    timings = {'python start': time.perf_counter() - start}
+
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+    timings['import Qt'] = time.perf_counter() - start
+
+    import main_window
+    timings['import main_window'] = time.perf_counter() - start
+
+    app = QApplication(sys.argv[:1])
+    window = main_window.MainWindow()
+    timings['MainWindow()'] = time.perf_counter() - start
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and 'first paint' not in timings:
+                timings['first paint'] = time.perf_counter() - start
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    paint_filter = FirstPaint()
+    window.installEventFilter(paint_filter)
+    window.show()
+    QTimer.singleShot(10000, app.quit)  # 그려지지 않는 환경에서 멈추지 않도록
+    app.exec()
+
+    result = {phase: round(seconds * 1000, 1) for phase, seconds in timings.items()}
+    result['heavy_modules'] = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(json.dumps(result))
+
+
+def run_once(offscreen: bool) -> dict:
+    env = dict(os.environ)
+    if offscreen:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+    env[SPAWN_ENV] = repr(time.time())
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'], env=env,
+                          cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f'종료코드 {proc.returncode}')
+    # 프로그램이 출력하는 로그 중 마지막 JSON 줄이 결과
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def import_times(count: int) -> list[tuple[float, str]]:
+    """python -X importtime 으로 main_window import 시 누적 시간이 큰 최상위 모듈을 구한다.
+
+    Returns:
+        [(누적 시간(ms), 모듈명)] 큰 순서
+    """
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main_window'],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        # 'import time:  self [us] | cumulative | imported package' 형식. 패키지명 앞 공백이 깊을수록 하위 import
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if len(name) - len(name.lstrip()) == 1:  # 최상위 import
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GUI 시작 시간 측정')
+    parser.add_argument('--runs', type=int, default=5, help='반복 횟수 (매 회 새 프로세스)')
+    parser.add_argument('--offscreen', action='store_true', help='화면 없이 측정 (QT_QPA_PLATFORM=offscreen)')
+    parser.add_argument('--max-ms', type=float, default=0, help='first paint 중앙값 한도(ms). 넘으면 종료코드 1')
+    parser.add_argument('--imports', action='store_true', help='import 시간이 큰 모듈 목록 출력')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return 0
+
+    try:
+        results = [run_once(args.offscreen) for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(f'❌ 프로그램 실행 실패: {e}')
+        return 1
+    print(f'runs = {args.runs}')
+    print(f'{"phase":<22}{"min":>10}{"median":>10}{"max":>10}  (ms, 프로세스 시작 기준)')
+    for phase in PHASES:
+        values = [result[phase] for result in results if phase in result]
+        if not values:
+            print(f'{phase:<22}{"-":>10}{"-":>10}{"-":>10}')
+            continue
+        print(f'{phase:<22}{min(values):>10.1f}{statistics.median(values):>10.1f}{max(values):>10.1f}')
+
+    failed = False
+    heavy = sorted({name for result in results for name in result['heavy_modules']})
+    if heavy:
+        print(f'⚠️ 첫 화면 전에 import 된 무거운 모듈: {", ".join(heavy)}')
+        failed = True
+    paints = [result['first paint'] for result in results if 'first paint' in result]
+    if args.max_ms and (not paints or statistics.median(paints) > args.max_ms):
+        print(f'⚠️ first paint 가 한도 {args.max_ms:.0f}ms 를 넘었습니다.')
+        failed = True
+
+    if args.imports:
+        print(f'\n{"module":<30}{"cumulative ms":>15}')
+        for ms, name in import_times(15):
+            print(f'{name:<30}{ms:>15.1f}')
+
+    return 1 if failed and args.max_ms else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# end of file
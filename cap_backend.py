@@ -0,0 +1,151 @@
+"""
+캡쳐 백엔드 모듈입니다.
+
+auto_pdf_capture 가 화면 픽셀을 가져오는 방법을 교체할 수 있도록 공통 인터페이스를 제공한다.
+    - pyautogui : 기존 방식. 리눅스에서는 pyscreeze 가 페이지마다 외부 스크린샷 도구를 실행한 뒤
+                  전체화면 이미지를 잘라내므로 느리다.
+    - mss       : 지정 영역만 직접 가져온다. 리눅스(X11)에서는 XShm(공유메모리) 경로를 사용한다.
+    - replay    : 폴더에 저장된 프레임을 순서대로 돌려준다. 화면 없이 캡쳐 루프 전체를 벤치마크할 때 사용한다.
+"""
+
+import os
+from PIL import Image
+
+
+class CaptureBackend:
+    """캡쳐 백엔드의 기본 클래스"""
+
+    name = ''
+
+    def grab(self, region: tuple) -> Image.Image:
+        """지정 영역을 캡쳐한다.
+
+        Args:
+            region: 캡쳐할 영역 (x, y, width, height)
+
+        Returns:
+            캡쳐된 이미지
+        """
+        raise NotImplementedError
+
+    def screen_size(self) -> tuple[int, int]:
+        """전체화면 크기 (width, height) 를 반환한다."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """백엔드가 잡고 있는 자원을 해제한다."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class PyautoguiBackend(CaptureBackend):
+    """pyautogui.screenshot 을 사용하는 기존 방식의 백엔드"""
+
+    name = 'pyautogui'
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def grab(self, region: tuple) -> Image.Image:
+        # noinspection PyTypeChecker
+        return self._pyautogui.screenshot(region=region)
+
+    def screen_size(self) -> tuple[int, int]:
+        return tuple(self._pyautogui.size())
+
+
+class MssBackend(CaptureBackend):
+    """mss 를 사용하여 지정 영역만 직접 가져오는 백엔드
+
+    주의 : mss 인스턴스는 생성한 쓰레드에서만 사용해야 한다. (X11 디스플레이 연결이 쓰레드에 묶인다)
+    """
+
+    name = 'mss'
+
+    def __init__(self):
+        import mss
+        self._sct = mss.mss()
+
+    def grab(self, region: tuple) -> Image.Image:
+        x, y, width, height = region
+        shot = self._sct.grab({'left': int(x), 'top': int(y), 'width': int(width), 'height': int(height)})
+        # BGRA 버퍼를 복사 한번으로 RGB 이미지로 변환
+        return Image.frombytes('RGB', shot.size, shot.bgra, 'raw', 'BGRX')
+
+    def screen_size(self) -> tuple[int, int]:
+        # monitors[0] 은 전체 모니터를 합친 영역, monitors[1] 이 기본 모니터
+        monitor = self._sct.monitors[1]
+        return monitor['width'], monitor['height']
+
+    def close(self) -> None:
+        self._sct.close()
+
+
+class ReplayBackend(CaptureBackend):
+    """폴더에 저장된 프레임을 순서대로 돌려주는 백엔드
+
+    프레임이 모두 소진되면 처음부터 다시 돌려준다. (loop=False 이면 마지막 프레임을 반복)
+    프레임이 요청 영역보다 크면 좌상단 기준으로 영역 크기만큼 잘라서 돌려준다.
+    """
+
+    name = 'replay'
+
+    def __init__(self, frame_dir: str, loop: bool = True):
+        if not frame_dir or not os.path.isdir(frame_dir):
+            raise ValueError(f"replay 프레임 폴더가 없습니다: {frame_dir}")
+        self.frame_paths = sorted(os.path.join(frame_dir, f) for f in os.listdir(frame_dir)
+                                  if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+        if not self.frame_paths:
+            raise ValueError(f"replay 프레임 폴더에 이미지가 없습니다: {frame_dir}")
+        self.loop = loop
+        self._index = 0
+
+    def grab(self, region: tuple) -> Image.Image:
+        if self._index >= len(self.frame_paths):
+            self._index = 0 if self.loop else len(self.frame_paths) - 1
+        path = self.frame_paths[self._index]
+        self._index += 1
+
+        with Image.open(path) as im:
+            im.load()
+            frame = im if im.mode == 'RGB' else im.convert('RGB')
+        width, height = int(region[2]), int(region[3])
+        if frame.width > width or frame.height > height:
+            frame = frame.crop((0, 0, min(frame.width, width), min(frame.height, height)))
+        return frame
+
+    def screen_size(self) -> tuple[int, int]:
+        with Image.open(self.frame_paths[0]) as im:
+            return im.size
+
+
+CAPTURE_BACKENDS = {
+    PyautoguiBackend.name: PyautoguiBackend,
+    MssBackend.name: MssBackend,
+    ReplayBackend.name: ReplayBackend,
+}
+
+
+def create_capture_backend(name: str = 'pyautogui', **kwargs) -> CaptureBackend:
+    """이름으로 캡쳐 백엔드를 생성한다.
+
+    Args:
+        name: 백엔드 이름 ('pyautogui', 'mss', 'replay')
+        **kwargs: 백엔드 생성자 인자 (replay 의 경우 frame_dir)
+
+    Returns:
+        CaptureBackend 인스턴스
+    """
+    try:
+        backend_cls = CAPTURE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"지원하지 않는 캡쳐 백엔드입니다: {name} (가능한 값: {', '.join(CAPTURE_BACKENDS)})")
+    return backend_cls(**kwargs)
+
+# end of file
@@ -0,0 +1,143 @@
+"""
+캡쳐 세션 매니페스트 모듈입니다.
+
+캡쳐 디렉토리(__{file_name}) 마다 manifest.jsonl 파일에 세션 정보와 페이지별 기록을 한 줄씩 추가한다.
+한 줄씩 append 만 하므로 캡쳐 도중 프로세스가 죽어도 마지막으로 기록된 페이지까지는 남는다.
+
+기록 종류 (type)
+    - session  : 세션 시작. 파일명, 페이지수, 캡쳐 영역 등
+    - page     : 페이지 캡쳐. index, file, region, side, hash(원본 픽셀 sha256), timestamp
+                 (PNG 인코딩 프로세스를 쓰면 파일 기록이 끝난 뒤에 기록한다)
+    - remove   : 페이지 삭제 (중복 페이지 감지 등)
+    - complete : 캡쳐 완료
+    - pdf      : pdf 생성. 페이지 정렬/필터/인코딩 설정 (다시 캡쳐한 페이지를 교체할 수 있는 pdf 인지 판단)
+"""
+
+import hashlib
+import json
+import os
+import time
+from PIL import Image
+
+MANIFEST_NAME = 'manifest.jsonl'
+_PNG_IEND = b'IEND\xaeB`\x82'  # PNG 파일의 마지막 12바이트 중 chunk type + CRC
+
+
+def content_hash(image: Image.Image) -> str:
+    """프레임 원본 픽셀의 sha256 해시 (PNG 인코딩 결과와 무관하게 같은 화면이면 같은 값)"""
+    return hashlib.sha256(image.tobytes()).hexdigest()
+
+
+def is_complete_png(path: str) -> bool:
+    """PNG 파일이 끝까지 기록되었는지 확인한다. (IEND chunk 로 끝나는지만 검사하므로 빠르다)"""
+    try:
+        if os.path.getsize(path) < 12:
+            return False
+        with open(path, 'rb') as f:
+            f.seek(-8, os.SEEK_END)
+            return f.read(8) == _PNG_IEND
+    except OSError:
+        return False
+
+
+class CaptureManifest:
+    """캡쳐 세션 매니페스트
+
+    Args:
+        directory: 캡쳐 디렉토리 경로
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.session: dict = {}
+        self.pages: dict[int, dict] = {}
+        self.completed = False
+        self.pdf_build: dict | None = None  # 마지막 pdf 생성 설정
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 도중 중단된 마지막 줄은 무시한다.
+                    continue
+                kind = record.get('type')
+                if kind == 'session':
+                    self.session = record
+                    self.pages = {}
+                    self.completed = False
+                    self.pdf_build = None
+                elif kind == 'page':
+                    self.pages[record['index']] = record
+                    self.completed = False
+                elif kind == 'remove':
+                    for index in record['indices']:
+                        self.pages.pop(index, None)
+                    self.completed = False
+                elif kind == 'complete':
+                    self.completed = True
+                elif kind == 'pdf':
+                    self.pdf_build = record
+
+    def _append(self, record: dict) -> None:
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.session)
+
+    def start_session(self, **info) -> None:
+        """새 세션을 시작한다. 기존 기록은 버린다."""
+        self.session = {'type': 'session', 'timestamp': time.time(), **info}
+        self.pages = {}
+        self.completed = False
+        self.pdf_build = None
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.session, ensure_ascii=False) + '\n')
+
+    def add_page(self, *, index: int, file: str, region: tuple, side: str, frame_hash: str) -> None:
+        """페이지 캡쳐 기록을 추가한다."""
+        record = {'type': 'page', 'index': index, 'file': file, 'region': list(region),
+                  'side': side, 'hash': frame_hash, 'timestamp': time.time()}
+        self.pages[index] = record
+        self.completed = False
+        self._append(record)
+
+    def remove_pages(self, indices) -> None:
+        """페이지 기록을 삭제한다."""
+        indices = list(indices)
+        for index in indices:
+            self.pages.pop(index, None)
+        self.completed = False
+        self._append({'type': 'remove', 'indices': indices, 'timestamp': time.time()})
+
+    def mark_complete(self) -> None:
+        """캡쳐 완료를 기록한다."""
+        self.completed = True
+        self._append({'type': 'complete', 'pages': len(self.pages), 'timestamp': time.time()})
+
+    def record_pdf_build(self, **options) -> None:
+        """pdf 생성 설정을 기록한다."""
+        self.pdf_build = {'type': 'pdf', **options, 'timestamp': time.time()}
+        self._append(self.pdf_build)
+
+    def valid_page_count(self) -> int:
+        """1페이지부터 연속으로 온전히 저장된 페이지 수를 반환한다. (파일 존재 및 PNG 완결성 확인)"""
+        count = 0
+        while True:
+            record = self.pages.get(count + 1)
+            if record is None or not is_complete_png(os.path.join(self.directory, record['file'])):
+                return count
+            count += 1
+
+    def page_files(self) -> list[str]:
+        """기록된 페이지 파일 경로를 페이지 순서대로 반환한다."""
+        return [os.path.join(self.directory, self.pages[index]['file']) for index in sorted(self.pages)]
+
+# end of file
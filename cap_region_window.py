@@ -1,13 +1,20 @@
 from PyQt6.QtWidgets import (QApplication, QWidget)
-from PyQt6.QtCore import Qt, QRect, QPoint, pyqtSignal
+from PyQt6.QtCore import Qt, QRect, QPoint, QTimer, pyqtSignal
 from PyQt6.QtGui import QPainter, QPen, QColor
 from supa_settings import SupaSettings
 from supa_common import log
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from content_bounds import ContentBounds
 
 
 class CapRegionWindow(QWidget):
     """캡쳐 영역을 표시하는 창"""
     window_closed = pyqtSignal()  # 창이 닫힐 때 발생하는 시그널
+    preview_max_side = 800  # 미리보기 감지 시 샘플링할 최대 크기(px)
+    overlay_hide_ms = 60    # 캡쳐 전 가이드 창이 화면에서 사라질 때까지 기다리는 시간(ms)
+    overlay_pen_pad = 2     # 미리보기 캡쳐에서 가이드 선 주변으로 함께 지울 폭(px, 창 좌표)
     
     def __init__(self, parent=None):
         super().__init__(parent, Qt.WindowType.Window | Qt.WindowType.WindowStaysOnTopHint) 
@@ -24,6 +31,14 @@ class CapRegionWindow(QWidget):
         self.corner_size = 10
         self.main_window: 'MainWindow' = parent
         self.min_size = 100
+        self.auto_bounds: 'ContentBounds | None' = None  # 자동 감지 결과 (창 좌표)
+        self.auto_preview = False
+        self._auto_bounds_busy = False
+        self._preview_backend = None  # 미리보기 동안 열어 두는 캡쳐 백엔드
+        self._preview_backend_name = ''
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.timeout.connect(lambda: self.start_auto_bounds(preview=True))
         self.initUI()
         
     def initUI(self):
@@ -75,13 +90,32 @@ class CapRegionWindow(QWidget):
                         
                 except ValueError:
                     pass
+
+            # 펼침면 모드면 좌/우 페이지를 나누는 가운데 점선 그리기
+            if self.main_window and self.main_window.basic_tab.spread_check.isChecked():
+                pen = QPen(QColor(255, 255, 255), 1)
+                pen.setStyle(Qt.PenStyle.DotLine)
+                painter.setPen(pen)
+                x = self.cap_region_rect.left() + self.cap_region_rect.width() // 2
+                painter.drawLine(x, self.cap_region_rect.top(), x, self.cap_region_rect.bottom())
             
+        # 자동 감지된 종이/컨텐츠 영역 (하늘색 점선)
+        if self.auto_bounds is not None:
+            pen = QPen(QColor(0, 200, 255), 1)
+            pen.setStyle(Qt.PenStyle.DotLine)
+            painter.setPen(pen)
+            painter.drawRect(self._to_qrect(self.auto_bounds.page))
+            pen.setStyle(Qt.PenStyle.DashLine)
+            painter.setPen(pen)
+            painter.drawRect(self._to_qrect(self.auto_bounds.content))
+
         if self.begin and self.end and self.is_drawing:
             painter.setPen(QPen(QColor(255, 255, 255), 2))
             rect = QRect(self.begin, self.end)
             painter.drawRect(rect)
 
-        log(self, f'rect - x:{self.cap_region_rect.x()} y:{self.cap_region_rect.y()} w:{self.cap_region_rect.width()} h:{self.cap_region_rect.height()} - x:{self.cap_region_rect.x()}')
+        if self.cap_region_rect is not None:
+            log(self, f'rect - x:{self.cap_region_rect.x()} y:{self.cap_region_rect.y()} w:{self.cap_region_rect.width()} h:{self.cap_region_rect.height()} - x:{self.cap_region_rect.x()}')
     
     def get_edge_or_corner_at(self, pos):
         if self.cap_region_rect is None:
@@ -277,6 +311,163 @@ class CapRegionWindow(QWidget):
         super().moveEvent(event)
         if self.cap_region_rect is not None:
             self.save_rectangle_settings()
+        self._schedule_preview()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._schedule_preview()
+
+    @staticmethod
+    def _to_qrect(box: tuple[int, int, int, int]) -> QRect:
+        left, top, right, bottom = box
+        return QRect(left, top, right - left, bottom - top)
+
+    def set_auto_preview(self, enabled: bool) -> None:
+        """창을 옮기거나 크기를 바꿀 때마다 컨텐츠 영역을 다시 감지하여 미리 보여줄지 설정한다."""
+        self.auto_preview = enabled
+        if enabled:
+            self._schedule_preview()
+        else:
+            self._preview_timer.stop()
+            self._close_preview_backend()
+            self.auto_bounds = None
+            self.update()
+
+    def _close_preview_backend(self) -> None:
+        if self._preview_backend is not None:
+            self._preview_backend.close()
+            self._preview_backend = None
+
+    def _schedule_preview(self) -> None:
+        # 창을 움직이는 동안은 감지를 미루고 멈춘 뒤에 한번만 감지한다.
+        if self.auto_preview and self.isVisible():
+            self._preview_timer.start(200)
+
+    def start_auto_bounds(self, on_detected=None, preview: bool = False) -> None:
+        """창 아래의 화면을 캡쳐하여 종이/컨텐츠 영역을 감지한다.
+
+        가이드 창(사각형, 반투명 배경)이 캡쳐에 섞이지 않도록 잠시 완전히 투명하게 만든 뒤 캡쳐한다.
+
+        미리보기는 창을 옮길 때마다 실행되므로 창을 숨기지 않고 캡쳐한 뒤 가이드 선만 주변 픽셀로 지운다.
+        (캡쳐 백엔드도 미리보기를 끌 때까지 열어 둔다)
+
+        Args:
+            on_detected: 감지가 끝나면 ContentBounds(창 좌표) 또는 None 을 인자로 호출할 함수
+            preview: True면 성기게 샘플링하여 빠르게 감지한다.
+        """
+        if self._auto_bounds_busy:
+            return
+        if preview:
+            self._detect_preview_bounds()
+            return
+        self._auto_bounds_busy = True
+        opacity = self.windowOpacity()
+        self.setWindowOpacity(0.0)
+        QTimer.singleShot(self.overlay_hide_ms, lambda: self._detect_auto_bounds(opacity, on_detected))
+
+    def _detect_auto_bounds(self, opacity: float, on_detected) -> None:
+        # numpy/Pillow 는 프로그램 시작 시간을 줄이기 위해 처음 감지할 때 import
+        from cap_backend import create_capture_backend
+        try:
+            origin = self.mapToGlobal(QPoint(0, 0))
+            backend_name = self.main_window.basic_tab.backend_combo.currentText()
+            with create_capture_backend(backend_name) as backend:
+                image = backend.grab((origin.x(), origin.y(), self.width(), self.height()))
+        except Exception as e:
+            log(self, f'auto bounds grab failed: {e}')
+            image = None
+        finally:
+            self.setWindowOpacity(opacity)
+            self._auto_bounds_busy = False
+
+        self._show_auto_bounds(image, on_detected, False)
+
+    def _detect_preview_bounds(self) -> None:
+        from cap_backend import create_capture_backend
+        try:
+            backend_name = self.main_window.basic_tab.backend_combo.currentText()
+            if self._preview_backend is None or self._preview_backend_name != backend_name:
+                self._close_preview_backend()
+                self._preview_backend = create_capture_backend(backend_name)
+                self._preview_backend_name = backend_name
+            origin = self.mapToGlobal(QPoint(0, 0))
+            image = self._preview_backend.grab((origin.x(), origin.y(), self.width(), self.height()))
+            image = self._erase_overlay(image)
+        except Exception as e:
+            log(self, f'auto bounds preview grab failed: {e}')
+            self._close_preview_backend()
+            image = None
+        self._show_auto_bounds(image, None, True)
+
+    def _show_auto_bounds(self, image, on_detected, preview: bool) -> None:
+        from content_bounds import detect_content_bounds
+
+        bounds = None
+        if image is not None:
+            bounds = detect_content_bounds(image, max_side=self.preview_max_side if preview else None)
+            if bounds is not None and image.width != self.width():
+                # HiDPI 화면에서는 캡쳐 픽셀이 창 좌표보다 크다.
+                bounds = bounds.scaled(self.width() / image.width)
+        self.auto_bounds = bounds
+        self.update()
+        if on_detected is not None:
+            on_detected(bounds)
+
+    def _overlay_lines(self) -> list[tuple[int, int, int, int]]:
+        """paintEvent 가 그리는 가이드 선들 [(x1, y1, x2, y2)] (창 좌표. 사각형은 네 변으로 나눈다)"""
+        rects = []
+        lines = []
+        if self.cap_region_rect is not None:
+            rect = self.cap_region_rect
+            rects.append(rect)
+            margins = self.main_window.basic_tab.getMargins()
+            if any(margin > 0 for margin in margins.values()):
+                rects.append(rect.adjusted(-margins['left'], -margins['top'], margins['right'], margins['bottom']))
+            diff_width = self.main_window.basic_tab.diff_width_edit.text()
+            if diff_width.isdigit() and 0 < int(diff_width) and rect.left() + int(diff_width) <= rect.right():
+                x = rect.left() + int(diff_width)
+                lines.append((x, rect.top(), x, rect.bottom()))
+            if self.main_window.basic_tab.spread_check.isChecked():
+                x = rect.left() + rect.width() // 2
+                lines.append((x, rect.top(), x, rect.bottom()))
+        if self.auto_bounds is not None:
+            rects += [self._to_qrect(self.auto_bounds.page), self._to_qrect(self.auto_bounds.content)]
+        for rect in rects:
+            left, top, right, bottom = rect.left(), rect.top(), rect.x() + rect.width(), rect.y() + rect.height()
+            lines += [(left, top, right, top), (left, bottom, right, bottom),
+                      (left, top, left, bottom), (right, top, right, bottom)]
+        return lines
+
+    def _erase_overlay(self, image):
+        """가이드 창을 숨기지 않고 캡쳐한 이미지에서 가이드 선을 바로 바깥쪽 픽셀로 덮어 지운다."""
+        import numpy as np
+        from PIL import Image
+
+        pixels = np.array(image.convert('RGB'))
+        height, width = pixels.shape[:2]
+        scale = width / self.width()
+        pad = self.overlay_pen_pad
+        for x1, y1, x2, y2 in self._overlay_lines():
+            left, right = max(0, int((min(x1, x2) - pad) * scale)), min(width, int((max(x1, x2) + pad + 1) * scale))
+            top, bottom = max(0, int((min(y1, y2) - pad) * scale)), min(height, int((max(y1, y2) + pad + 1) * scale))
+            if left >= right or top >= bottom:
+                continue
+            if y1 == y2:
+                source = top - 1 if top > 0 else min(bottom, height - 1)
+                pixels[top:bottom, left:right] = pixels[source, left:right]
+            else:
+                source = left - 1 if left > 0 else min(right, width - 1)
+                pixels[top:bottom, left:right] = pixels[top:bottom, source:source + 1]
+        return Image.fromarray(pixels)
+
+    def apply_auto_bounds(self, bounds: 'ContentBounds') -> None:
+        """감지된 컨텐츠 영역을 캡쳐영역으로 설정한다. (여백은 BasicTab 에서 설정)"""
+        self.cap_region_rect = self._to_qrect(bounds.content)
+        self.begin = None
+        self.end = None
+        self.can_draw = False
+        self.save_rectangle_settings()
+        self.update()
 
     def ensure_minimum_size(self, new_rect):
         """사각형이 최소 크기 이상을 유지하도록 보장"""
@@ -294,8 +485,14 @@ class CapRegionWindow(QWidget):
                 
         return new_rect
 
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._preview_timer.stop()
+        self._close_preview_backend()
+
     def closeEvent(self, event):
         """모달리스 창이 닫힐 때 설정 저장"""
+        self._close_preview_backend()
         self.window_closed.emit()
         self.save_rectangle_settings()
         if isinstance(self.parent(), self.main_window.__class__):
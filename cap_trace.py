@@ -0,0 +1,157 @@
+"""
+캡쳐 단계별 소요시간 기록(trace) 모듈입니다.
+
+캡쳐 1회(페이지 넘김 -> 렌더링 대기 -> 캡쳐 -> 저장)마다 단계별 소요시간을 기록하고,
+캡쳐가 끝나면 단계별 p50/p95/max 요약을 로그로 출력하고 JSON 또는 CSV 로 저장한다.
+느린 캡쳐가 뷰어(렌더링 대기), 디스크(파일 기록), 인코더(PNG 인코딩) 중 어디 때문인지 구분하는 용도이다.
+
+단계 :
+    - turn   : 페이지 넘김 입력 (키 입력/클릭/스크롤)
+    - settle : 렌더링 대기 (자동 대기의 샘플 캡쳐 시간은 grab 으로 따로 센다. 고정 딜레이면 딜레이 시간)
+    - grab   : 화면 캡쳐
+    - encode : PNG 인코딩 (인코딩 프로세스를 쓰면 인코더 프로세스에서 걸린 시간)
+    - save   : 파일 기록 (인코딩 프로세스를 쓰면 인코더 프로세스에서 걸린 시간)
+    - submit : 인코딩 대기열에 넣는 시간 (인코더가 밀려 슬롯이 없으면 길어진다)
+인코딩 프로세스를 쓰면 encode/save 는 다음 캡쳐와 동시에 진행되므로 캡쳐별 합계(total)는 실제 경과시간보다 클 수 있다.
+"""
+
+import csv
+import json
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+
+PHASES = ('turn', 'settle', 'grab', 'encode', 'save', 'submit')
+PHASE_LABELS = {'turn': '페이지 넘김', 'settle': '렌더링 대기', 'grab': '화면 캡쳐',
+                'encode': 'PNG 인코딩', 'save': '파일 기록', 'submit': '인코딩 대기열'}
+TRACE_FORMATS = ('json', 'csv')
+
+
+@dataclass
+class TraceRow:
+    """캡쳐 1회의 기록"""
+    capture: int                                        # 캡쳐 순번 (1부터)
+    pages: list[int] = field(default_factory=list)      # 이 캡쳐로 저장한 페이지 인덱스
+    phases: dict[str, float] = field(default_factory=dict)  # 단계별 소요시간(초). 같은 단계가 여러번이면 합계
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """정렬된 값 리스트에서 백분위 값을 구한다. (nearest-rank)"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class CaptureTrace:
+    """캡쳐 단계별 소요시간 기록"""
+
+    def __init__(self):
+        self.rows: list[TraceRow] = []
+        self._path_rows: dict[str, TraceRow] = {}
+
+    @property
+    def current(self) -> TraceRow:
+        """진행중인 캡쳐의 기록 (begin 전이면 새로 시작한다)"""
+        return self.rows[-1] if self.rows else self.begin()
+
+    def begin(self) -> TraceRow:
+        """새 캡쳐 기록을 시작한다."""
+        row = TraceRow(len(self.rows) + 1)
+        self.rows.append(row)
+        return row
+
+    def add(self, phase: str, seconds: float) -> None:
+        """진행중인 캡쳐에 단계 소요시간을 더한다."""
+        self.current.add(phase, seconds)
+
+    @contextmanager
+    def measure(self, phase: str):
+        """with 블록의 소요시간을 진행중인 캡쳐의 phase 단계로 기록한다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def timed(self, phase: str, fn: Callable) -> Callable:
+        """fn 을 호출할 때마다 소요시간을 phase 단계로 기록하는 함수를 반환한다."""
+        def wrapper(*args, **kwargs):
+            with self.measure(phase):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def add_page(self, index: int, path: str = '') -> None:
+        """진행중인 캡쳐가 저장한 페이지를 기록한다. path 는 add_file_timing 으로 나중에 시간을 더할 때 사용한다."""
+        row = self.current
+        row.pages.append(index)
+        if path:
+            self._path_rows[path] = row
+
+    def add_file_timing(self, path: str, phase: str, seconds: float) -> None:
+        """path 파일을 저장한 캡쳐에 단계 소요시간을 더한다. (인코딩 프로세스에서 받은 시간 등)"""
+        row = self._path_rows.get(path)
+        if row is not None:
+            row.add(phase, seconds)
+
+    def values(self, phase: str) -> list[float]:
+        """단계 소요시간들 (정렬됨, 해당 단계가 없는 캡쳐는 제외)"""
+        return sorted(row.phases[phase] for row in self.rows if phase in row.phases)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """단계별 {'count', 'p50', 'p95', 'max', 'total'}"""
+        result = {}
+        for phase in PHASES:
+            values = self.values(phase)
+            if values:
+                result[phase] = {'count': len(values), 'p50': percentile(values, 50), 'p95': percentile(values, 95),
+                                 'max': values[-1], 'total': sum(values)}
+        return result
+
+    def log_summary(self, show_log_fn: Callable[[str], None]) -> None:
+        """단계별 소요시간 분포를 로그로 출력한다."""
+        summary = self.summary()
+        if not summary:
+            return
+        show_log_fn(f'단계별 소요시간(초) - 캡쳐 {len(self.rows)}회')
+        for phase, stats in summary.items():
+            show_log_fn(f'  {PHASE_LABELS[phase]} ({phase}) {stats["count"]}건 - p50 {stats["p50"]:.3f} / '
+                        f'p95 {stats["p95"]:.3f} / max {stats["max"]:.3f}, 합계 {stats["total"]:.2f}')
+
+    def write_json(self, path: str) -> None:
+        data = {
+            'summary': self.summary(),
+            'captures': [{'capture': row.capture, 'pages': row.pages, **row.phases} for row in self.rows],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
+    def write_csv(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['capture', 'pages', *PHASES, 'total'])
+            for row in self.rows:
+                writer.writerow([row.capture, ' '.join(map(str, row.pages)),
+                                 *(f'{row.phases[phase]:.6f}' if phase in row.phases else '' for phase in PHASES),
+                                 f'{sum(row.phases.values()):.6f}'])
+
+    def write(self, path: str, trace_format: str = 'json') -> None:
+        """기록을 파일로 저장한다.
+
+        Args:
+            path: 저장할 파일 경로
+            trace_format: 'json' 또는 'csv'
+        """
+        if trace_format == 'json':
+            self.write_json(path)
+        elif trace_format == 'csv':
+            self.write_csv(path)
+        else:
+            raise ValueError(f"지원하지 않는 trace 형식입니다: {trace_format} (가능한 값: {', '.join(TRACE_FORMATS)})")
+
+# end of file
@@ -0,0 +1,374 @@
+"""
+명령줄(CLI) 실행 모듈입니다.
+
+GUI 없이 캡쳐, pdf 생성, 목차 OCR, 개요 정리/적용을 실행한다. Qt 를 전혀 import 하지 않으므로
+디스플레이 서버가 없는 서버나 스크립트/cron 에서 바로 실행할 수 있다. (capture 는 화면이 필요하다)
+무거운 모듈(numpy, requests, PyPDF2 등)은 해당 명령을 실행할 때만 import 한다.
+
+책마다 JSON 설정 파일 하나를 두고 사용한다. 상대 경로는 설정 파일이 있는 디렉토리 기준이며,
+캡쳐 디렉토리(__책이름)도 그 디렉토리에 만들어진다.
+
+사용법 :
+    $ python cli.py init book.json --file-name "책이름 (저자) - 출판사"
+    $ python cli.py capture -c book.json
+    $ python cli.py recapture -c book.json 57-60
+    $ python cli.py build-pdf -c book.json --profile auto
+    $ python cli.py recover-pdf -c book.json      # 작성 도중 중단된 pdf 를 마지막 체크포인트까지 복구
+    $ python cli.py ocr -c book.json
+    $ python cli.py format-outline -c book.json
+    $ python cli.py apply-outline -c book.json
+
+설정 파일 예시 (init 으로 생성) :
+    {
+      "file_name": "책이름 (저자) - 출판사",
+      "capture": {"page_loop": 300, "region": [100, 100, 900, 1200],
+                  "margin": {"top": 0, "right": 0, "bottom": 0, "left": 0}, "automation_delay": 0.2},
+      "pdf": {"profile": "rgb", "jpeg_quality": 85, "align_pages": false, "checkpoint_every": 50,
+              "blank_pages": "keep", "duplicate_pages": "keep", "backend": "stream"},
+      "ocr": {"images": "toc", "output": "책이름 (저자) - 출판사.txt", "concurrency": 4, "rate_limit": 0,
+              "max_retries": 4, "cache": true, "cache_dir": "", "cache_max_mb": 200, "preprocess": true,
+              "text_height": 32, "stitch": false, "stitch_max_height": 4000},
+      "outline": {"file": "책이름 (저자) - 출판사.txt", "pdf": "__책이름 (저자) - 출판사/책이름 (저자) - 출판사.pdf",
+                  "page_offset": 0, "fill_none_page": false}
+    }
+    capture 항목에는 auto_pdf_capture 의 인자를 그대로 적을 수 있다. (backend, input_driver, settle_samples 등)
+    OCR 비밀키/API URL 은 설정 파일의 ocr.secret_key / ocr.api_url 또는
+    환경변수 CLOVA_OCR_SECRET_KEY / CLOVA_OCR_API_URL 로 지정한다.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+OCR_SECRET_ENV = 'CLOVA_OCR_SECRET_KEY'
+OCR_API_URL_ENV = 'CLOVA_OCR_API_URL'
+DEPTH_SEP = '    '  # 개요 깊이 구분자 (개요생성 탭과 같음)
+PAGE_SEP = '\t'     # 제목/페이지 구분자
+
+
+class CliError(Exception):
+    """설정/인자 오류 (사용자에게 메시지만 보여주고 종료한다)"""
+    pass
+
+
+def default_config(file_name: str) -> dict:
+    """init 명령이 만드는 설정 파일 내용"""
+    return {
+        'file_name': file_name,
+        'capture': {
+            'page_loop': 300,
+            'region': [0, 0, 800, 1000],
+            'margin': {'top': 0, 'right': 0, 'bottom': 0, 'left': 0},
+            'diff_width': 0,
+            'automation_delay': 0.2,
+            'left_first': True,
+            'backend': 'mss',
+            'input_driver': 'pyautogui',
+        },
+        'pdf': {'profile': 'rgb', 'jpeg_quality': 85, 'align_pages': False, 'checkpoint_every': 50,
+                'blank_pages': 'keep', 'duplicate_pages': 'keep', 'backend': 'stream'},
+        'ocr': {'images': 'toc', 'output': f'{file_name}.txt', 'concurrency': 4, 'rate_limit': 0, 'max_retries': 4,
+                'cache': True, 'cache_dir': '', 'cache_max_mb': 200, 'preprocess': True, 'text_height': 32,
+                'stitch': False, 'stitch_max_height': 4000},
+        'outline': {'file': f'{file_name}.txt', 'pdf': os.path.join(f'__{file_name}', f'{file_name}.pdf'),
+                    'page_offset': 0, 'fill_none_page': False},
+    }
+
+
+def load_config(path: str) -> dict:
+    """설정 파일을 읽고, 이후 상대 경로가 설정 파일 기준이 되도록 작업 디렉토리를 옮긴다."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        raise CliError(f'설정 파일이 없습니다: {path}')
+    except json.JSONDecodeError as e:
+        raise CliError(f'설정 파일 형식이 잘못되었습니다: {path} ({e})')
+    if not isinstance(config, dict) or not config.get('file_name'):
+        raise CliError(f'설정 파일에 file_name 이 없습니다: {path}')
+    os.chdir(os.path.dirname(os.path.abspath(path)))
+    return config
+
+
+def _section(config: dict, name: str) -> dict:
+    section = config.get(name) or {}
+    if not isinstance(section, dict):
+        raise CliError(f'설정 파일의 {name} 항목은 객체여야 합니다.')
+    return section
+
+
+def _capture_dir(config: dict) -> str:
+    """캡쳐 이미지와 pdf 가 저장되는 디렉토리 (auto_pdf_capture 와 같은 규칙)"""
+    return f'./__{config["file_name"]}'
+
+
+def _pdf_kwargs(config: dict, args: argparse.Namespace) -> dict:
+    """pdf 항목 + 명령줄 옵션 -> create_pdf 인자"""
+    from pdf_backend import check_pdf_writer_backend
+
+    pdf = _section(config, 'pdf')
+    backend = args.pdf_backend or pdf.get('backend', 'stream')
+    try:
+        # 'pypdf2' 는 개요 적용(apply-outline)에만 쓸 수 있다.
+        check_pdf_writer_backend(backend)
+    except ValueError as e:
+        raise CliError(f'설정 파일의 pdf.backend 값이 잘못되었습니다. {e}') from None
+    return {
+        'profile': args.profile or pdf.get('profile', 'rgb'),
+        'jpeg_quality': args.jpeg_quality or pdf.get('jpeg_quality', 85),
+        'align_pages': args.align or pdf.get('align_pages', False),
+        'checkpoint_every': pdf.get('checkpoint_every', 50),
+        'blank_pages': args.blank_pages or pdf.get('blank_pages', 'keep'),
+        'duplicate_pages': args.duplicate_pages or pdf.get('duplicate_pages', 'keep'),
+        'backend': backend,
+    }
+
+
+def cmd_init(args: argparse.Namespace) -> int:
+    if os.path.exists(args.config) and not args.force:
+        raise CliError(f'설정 파일이 이미 있습니다: {args.config} (덮어쓰려면 --force)')
+    file_name = args.file_name or os.path.splitext(os.path.basename(args.config))[0]
+    with open(args.config, 'w', encoding='utf-8') as f:
+        json.dump(default_config(file_name), f, ensure_ascii=False, indent=2)
+    print(f'설정 파일을 만들었습니다: {args.config}')
+    return 0
+
+
+def parse_page_range(text: str) -> tuple[int, int]:
+    """'57-60' 또는 '57' 형식의 페이지 범위를 (첫 페이지, 마지막 페이지)로 변환한다."""
+    first, _, last = text.partition('-')
+    try:
+        pages = int(first), int(last or first)
+    except ValueError:
+        raise CliError(f'페이지 범위 형식이 잘못되었습니다: {text} (예: 57-60)') from None
+    if not 1 <= pages[0] <= pages[1]:
+        raise CliError(f'페이지 범위가 잘못되었습니다: {text}')
+    return pages
+
+
+def cmd_capture(args: argparse.Namespace) -> int:
+    import inspect
+    from auto_pdf_capture import auto_pdf_capture
+
+    config = load_config(args.config)
+    capture = dict(_section(config, 'capture'))
+    region = capture.pop('region', None)
+    if not region or len(region) != 4:
+        raise CliError('capture.region 에 캡쳐 영역 [x1, y1, x2, y2] 를 지정하세요.')
+    kwargs = {
+        'file_name': config['file_name'],
+        'x1': region[0], 'y1': region[1], 'x2': region[2], 'y2': region[3],
+        'margin': {'top': 0, 'right': 0, 'bottom': 0, 'left': 0},
+        'open_dir': False,
+    }
+    pdf = _pdf_kwargs(config, args)
+    kwargs.update(pdf_profile=pdf['profile'], jpeg_quality=pdf['jpeg_quality'],
+                  align_pages=pdf['align_pages'], pdf_checkpoint_every=pdf['checkpoint_every'],
+                  blank_pages=pdf['blank_pages'], duplicate_pages=pdf['duplicate_pages'], pdf_backend=pdf['backend'])
+    kwargs.update(capture)
+    if args.page_loop:
+        kwargs['page_loop'] = args.page_loop
+    if args.resume:
+        kwargs['resume'] = True
+    if args.pages:
+        kwargs['recapture'] = parse_page_range(args.pages)
+
+    params = inspect.signature(auto_pdf_capture).parameters
+    unknown = sorted(set(kwargs) - set(params) - {'log_message_signal', 'is_running'})
+    if unknown:
+        raise CliError(f'capture 항목에 알 수 없는 설정이 있습니다: {", ".join(unknown)}')
+    if 'page_loop' not in kwargs:
+        raise CliError('capture.page_loop 에 캡쳐 페이지수를 지정하세요.')
+
+    return 0 if auto_pdf_capture(**kwargs) else 1
+
+
+def cmd_build_pdf(args: argparse.Namespace) -> int:
+    from auto_pdf_capture import create_pdf
+
+    config = load_config(args.config)
+    output_dir = _capture_dir(config)
+    if not os.path.isdir(output_dir):
+        raise CliError(f'캡쳐 디렉토리가 없습니다: {output_dir}')
+    create_pdf(output_dir=output_dir, file_name=config['file_name'], show_log_fn=print,
+               open_dir=False, **_pdf_kwargs(config, args))
+    return 0
+
+
+def cmd_recover_pdf(args: argparse.Namespace) -> int:
+    from auto_pdf_capture import recover_interrupted_pdf
+
+    config = load_config(args.config)
+    pdf_file = args.pdf or os.path.join(_capture_dir(config), f'{config["file_name"]}.pdf')
+    if not os.path.exists(pdf_file):
+        raise CliError(f'파일이 없습니다: {pdf_file}')
+    if not recover_interrupted_pdf(pdf_file, print):
+        return 1
+    print(f'✅ pdf 를 사용할 수 있습니다: {pdf_file}')
+    return 0
+
+
+def _ocr_credentials(ocr: dict) -> tuple[str, str]:
+    secret_key = ocr.get('secret_key') or os.environ.get(OCR_SECRET_ENV, '')
+    api_url = ocr.get('api_url') or os.environ.get(OCR_API_URL_ENV, '')
+    if not secret_key or not api_url:
+        raise CliError(f'OCR 비밀키/API URL 을 설정 파일의 ocr.secret_key / ocr.api_url 또는 '
+                       f'환경변수 {OCR_SECRET_ENV} / {OCR_API_URL_ENV} 로 지정하세요.')
+    return secret_key, api_url
+
+
+def cmd_ocr(args: argparse.Namespace) -> int:
+    from outline_ocr import get_image_files, run_ocr, write_list2file
+
+    config = load_config(args.config)
+    ocr = _section(config, 'ocr')
+    secret_key, api_url = _ocr_credentials(ocr)
+    images = args.images or ocr.get('images', 'toc')
+    image_files = get_image_files(images)
+    if not image_files:
+        raise CliError(f'OCR 할 이미지가 없습니다: {images}')
+    output = args.output or ocr.get('output') or f'{config["file_name"]}.txt'
+
+    concurrency = args.concurrency or ocr.get('concurrency', 4)
+    rate_limit = args.rate_limit if args.rate_limit is not None else ocr.get('rate_limit', 0)
+    max_retries = args.max_retries if args.max_retries is not None else ocr.get('max_retries', 4)
+    ocr_lines = run_ocr(secret_key, api_url, image_files, concurrency=concurrency, rate_limit=rate_limit,
+                        max_retries=max_retries, use_cache=not args.no_cache and ocr.get('cache', True),
+                        cache_dir=ocr.get('cache_dir', ''), cache_max_mb=ocr.get('cache_max_mb', 200),
+                        preprocess=not args.no_preprocess and ocr.get('preprocess', True),
+                        text_height=ocr.get('text_height', 32), stitch=args.stitch or ocr.get('stitch', False),
+                        stitch_max_height=ocr.get('stitch_max_height', 4000))
+    if not ocr_lines:
+        print('OCR 결과가 없습니다.')
+        return 1
+    write_list2file(ocr_lines, output)
+    print(f'OCR 결과 {len(ocr_lines)}줄 저장: {output}')
+    return 0
+
+
+def cmd_format_outline(args: argparse.Namespace) -> int:
+    from outline_ocr import apply_indentation, apply_none_page, apply_page_offset, read_file2list, write_list2file
+
+    config = load_config(args.config)
+    outline = _section(config, 'outline')
+    input_file = args.input or outline.get('file') or f'{config["file_name"]}.txt'
+    output_file = args.output or input_file
+    page_offset = args.page_offset if args.page_offset is not None else outline.get('page_offset', 0)
+    fill_none_page = args.fill_none_page or outline.get('fill_none_page', False)
+
+    if not os.path.exists(input_file):
+        raise CliError(f'개요 파일이 없습니다: {input_file}')
+    lines = [line for line in read_file2list(input_file) if line]
+    lines = apply_indentation(input_lines=lines)
+    lines = apply_page_offset(input_lines=lines, page_offset=page_offset)
+    if fill_none_page:
+        lines = apply_none_page(input_lines=lines, page_offset=-1)
+    write_list2file(lines, output_file)
+    print(f'개요 {len(lines)}줄 저장: {output_file}')
+    return 0
+
+
+def cmd_apply_outline(args: argparse.Namespace) -> int:
+    from pypdf2_ol_gen import pdf_outline_gen
+
+    config = load_config(args.config)
+    outline = _section(config, 'outline')
+    pdf_file = args.pdf or outline.get('pdf') or os.path.join(_capture_dir(config), f'{config["file_name"]}.pdf')
+    ol_file = args.outline or outline.get('file') or f'{config["file_name"]}.txt'
+    for path in (pdf_file, ol_file):
+        if not os.path.exists(path):
+            raise CliError(f'파일이 없습니다: {path}')
+
+    # pdf.backend 가 기본값(stream)이 아니면 개요도 그 백엔드로 적용한다.
+    backend = 'pypdf2' if args.rewrite else _section(config, 'pdf').get('backend', 'stream')
+    success, message = pdf_outline_gen(pdf_file=pdf_file, ol_file=ol_file, depth_sep=DEPTH_SEP, page_sep=PAGE_SEP,
+                                       backend='' if backend == 'stream' else backend)
+    print(message)
+    return 0 if success else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description='auto-pdf-capture 명령줄 실행')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name: str, help_text: str, func) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help_text, description=help_text)
+        command.set_defaults(func=func)
+        if name != 'init':
+            command.add_argument('-c', '--config', required=True, help='책 설정 파일 (JSON)')
+        return command
+
+    def add_pdf_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument('--profile', help='pdf 압축 프로파일 (rgb, gray, palette, bilevel, jpeg, auto)')
+        command.add_argument('--jpeg-quality', type=int, help='profile 이 jpeg 일 때 JPEG 품질')
+        command.add_argument('--align', action='store_true', help='pdf 생성 전에 페이지 좌우 자동 정렬')
+        command.add_argument('--blank-pages', choices=('keep', 'drop', 'share'),
+                             help='빈 페이지 처리 (keep: 그대로, drop: 제외, share: 이미지 하나를 공유)')
+        command.add_argument('--duplicate-pages', choices=('keep', 'drop', 'share'),
+                             help='중복 페이지 처리 (keep: 그대로, drop: 제외, share: 앞 페이지 이미지를 공유)')
+        command.add_argument('--pdf-backend', choices=('stream', 'pikepdf'),
+                             help='pdf 작성 백엔드 (bench_pdf_backend.py 로 비교)')
+
+    command = add_command('init', '책 설정 파일 만들기', cmd_init)
+    command.add_argument('config', help='만들 설정 파일 경로')
+    command.add_argument('--file-name', help='책 이름 (없으면 설정 파일 이름)')
+    command.add_argument('--force', action='store_true', help='이미 있으면 덮어쓰기')
+
+    command = add_command('capture', '화면 캡쳐 후 pdf 생성', cmd_capture)
+    command.set_defaults(pages=None)
+    command.add_argument('--page-loop', type=int, help='캡쳐 페이지수 (설정 파일 값 대신 사용)')
+    command.add_argument('--resume', action='store_true', help='중단된 캡쳐를 이어서 진행')
+    add_pdf_options(command)
+
+    command = add_command('recapture', '일부 페이지만 다시 캡쳐하여 pdf 의 해당 페이지 교체', cmd_capture)
+    command.add_argument('pages', help='다시 캡쳐할 페이지 범위 (예: 57-60). 캡쳐 대상을 첫 페이지 바로 앞 페이지에 맞춰 두고 실행')
+    command.set_defaults(page_loop=None, resume=False)
+    add_pdf_options(command)
+
+    command = add_command('build-pdf', '캡쳐된 이미지로 pdf 다시 생성', cmd_build_pdf)
+    add_pdf_options(command)
+
+    command = add_command('recover-pdf', '작성 도중 중단된 pdf 를 마지막 체크포인트까지 복구', cmd_recover_pdf)
+    command.add_argument('--pdf', help='pdf 파일 (없으면 캡쳐 디렉토리의 pdf)')
+
+    command = add_command('ocr', '목차 이미지 OCR', cmd_ocr)
+    command.add_argument('--images', help='목차 이미지 폴더')
+    command.add_argument('-o', '--output', help='OCR 결과 텍스트 파일')
+    command.add_argument('--concurrency', type=int, help='동시 OCR 요청 수 (기본 4)')
+    command.add_argument('--rate-limit', type=float, help='초당 최대 OCR 요청 수 (0 이면 제한 없음)')
+    command.add_argument('--max-retries', type=int, help='429/5xx/시간초과 재시도 횟수 (기본 4)')
+    command.add_argument('--no-cache', action='store_true', help='저장된 OCR 응답을 쓰지 않고 모두 다시 요청')
+    command.add_argument('--no-preprocess', action='store_true', help='이미지를 전처리하지 않고 원본 그대로 업로드')
+    command.add_argument('--stitch', action='store_true', help='연속된 이미지를 이어붙여 한 번에 요청')
+
+    command = add_command('format-outline', '개요 파일 들여쓰기/페이지 보정', cmd_format_outline)
+    command.add_argument('-i', '--input', help='개요 파일')
+    command.add_argument('-o', '--output', help='저장할 파일 (없으면 입력 파일에 덮어쓰기)')
+    command.add_argument('--page-offset', type=int, help='페이지 번호에 더할 값 (예: 1, -1)')
+    command.add_argument('--fill-none-page', action='store_true', help='페이지 번호가 없는 항목을 다음 항목 페이지로 채우기')
+
+    command = add_command('apply-outline', '개요 파일을 pdf 에 적용', cmd_apply_outline)
+    command.add_argument('--pdf', help='pdf 파일')
+    command.add_argument('--outline', help='개요 파일')
+    command.add_argument('--rewrite', action='store_true',
+                         help='pdf 전체를 다시 써서 적용 (원본은 _BAK_ 사본으로 보관. 기본은 pdf 끝에 개요만 덧붙임)')
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except CliError as e:
+        print(f'❌ {e}', file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print('\n중지되었습니다.', file=sys.stderr)
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# end of file
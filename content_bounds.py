@@ -0,0 +1,104 @@
+"""
+페이지 컨텐츠 영역 자동 감지 모듈입니다.
+
+캡쳐영역 가이드 창 아래의 화면을 한번 캡쳐하여 NumPy 행/열 투영(projection profile)으로
+    1. 종이(페이지 바탕색) 영역: 바탕색 픽셀이 절반 이상인 열/행이 연속된 구간 (뷰어 배경, 툴바 제외)
+    2. 컨텐츠 영역: 종이 영역 안에서 바탕색과 다른 잉크 픽셀이 있는 첫 행/열 ~ 마지막 행/열
+을 구한다. 컨텐츠 영역은 캡쳐영역(흰색 사각형)이 되고, 종이 가장자리까지의 거리는 여백(margin)이 된다.
+"""
+
+from dataclasses import dataclass
+import numpy as np
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class ContentBounds:
+    """감지 결과. 좌표는 (left, top, right, bottom) 이며 right/bottom 은 포함하지 않는다."""
+    page: tuple[int, int, int, int]     # 종이 영역
+    content: tuple[int, int, int, int]  # 컨텐츠(잉크) 영역
+
+    @property
+    def margins(self) -> dict[str, int]:
+        """컨텐츠 영역에서 종이 가장자리까지의 여백 (BasicTab.getMargins 와 같은 형식)"""
+        return {'top': self.content[1] - self.page[1], 'right': self.page[2] - self.content[2],
+                'bottom': self.page[3] - self.content[3], 'left': self.content[0] - self.page[0]}
+
+    def scaled(self, factor: float) -> 'ContentBounds':
+        """좌표에 factor 를 곱한 결과를 반환한다. (캡쳐 픽셀 -> 화면 논리 좌표 변환 등)"""
+        def scale(box):
+            return tuple(round(v * factor) for v in box)
+        return ContentBounds(scale(self.page), scale(self.content))
+
+
+def _run_around(mask: np.ndarray, center: int) -> tuple[int, int] | None:
+    """1차원 bool 배열에서 center 를 포함하는 True 구간 [start, end) 를 찾는다.
+    center 가 구간에 없으면 가장 긴 구간을 반환한다."""
+    if not mask.any():
+        return None
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    runs = edges.reshape(-1, 2)
+    for start, end in runs:
+        if start <= center < end:
+            return int(start), int(end)
+    start, end = max(runs, key=lambda run: run[1] - run[0])
+    return int(start), int(end)
+
+
+def detect_content_bounds(image: Image.Image, *, paper_tolerance: int = 16, ink_threshold: int = 48,
+                          min_ink: int = 2, edge: int = 3, max_side: int | None = None) -> ContentBounds | None:
+    """이미지에서 종이 영역과 컨텐츠 영역을 감지한다.
+
+    Args:
+        image: 캡쳐 이미지 (페이지가 가운데 오도록 캡쳐)
+        paper_tolerance: 종이 바탕색으로 볼 밝기 차이
+        ink_threshold: 잉크(컨텐츠)로 볼 바탕색과의 밝기 차이
+        min_ink: 컨텐츠 행/열로 판단할 최소 잉크 픽셀 수
+        edge: 종이 가장자리 그림자/테두리를 무시할 폭(px)
+        max_side: 지정하면 긴 변이 max_side 이하가 되도록 건너뛰며 샘플링한다. (미리보기용. 정밀도는 떨어진다)
+
+    Returns:
+        ContentBounds (원본 이미지 픽셀 좌표). 종이나 컨텐츠를 찾지 못하면 None
+    """
+    gray = np.asarray(image.convert('L'), dtype=np.int16)
+    step = 1
+    if max_side and max(gray.shape) > max_side:
+        step = -(-max(gray.shape) // max_side)
+        gray = gray[::step, ::step]
+    height, width = gray.shape
+
+    # 가운데 1/3 영역의 중앙값을 종이 바탕색으로 본다. (글자가 차지하는 면적은 절반보다 훨씬 작다)
+    paper = int(np.median(gray[height // 3:height * 2 // 3 or 1, width // 3:width * 2 // 3 or 1]))
+    paper_mask = np.abs(gray - paper) <= paper_tolerance
+
+    cols = _run_around(paper_mask.mean(axis=0) >= 0.5, width // 2)
+    if cols is None:
+        return None
+    left, right = cols
+    rows = _run_around(paper_mask[:, left:right].mean(axis=1) >= 0.5, height // 2)
+    if rows is None:
+        return None
+    top, bottom = rows
+
+    # 종이 안쪽에서 잉크 픽셀의 행/열 투영
+    inset = max(1, edge // step)
+    inner = gray[top + inset:bottom - inset, left + inset:right - inset]
+    if inner.size == 0:
+        return None
+    ink = np.abs(inner - paper) > ink_threshold
+    ink_rows = np.flatnonzero(ink.sum(axis=1) >= min_ink)
+    ink_cols = np.flatnonzero(ink.sum(axis=0) >= min_ink)
+    if ink_rows.size == 0 or ink_cols.size == 0:
+        return None
+
+    content = (left + inset + int(ink_cols[0]), top + inset + int(ink_rows[0]),
+               left + inset + int(ink_cols[-1]) + 1, top + inset + int(ink_rows[-1]) + 1)
+    bounds = ContentBounds((left, top, right, bottom), content)
+    if step > 1:
+        def clamp(box):
+            return (box[0], box[1], min(box[2], image.width), min(box[3], image.height))
+        bounds = bounds.scaled(step)
+        bounds = ContentBounds(clamp(bounds.page), clamp(bounds.content))
+    return bounds
+
+# end of file
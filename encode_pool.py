@@ -0,0 +1,183 @@
+"""
+PNG 인코딩 프로세스 풀 모듈입니다.
+
+캡쳐 쓰레드는 원본 픽셀을 공유메모리 슬롯에 복사한 뒤 바로 다음 페이지로 넘어가고,
+PNG 압축과 디스크 저장은 별도의 인코더 프로세스들이 처리한다.
+    - 슬롯 개수만큼만 동시에 대기할 수 있다. 슬롯이 모두 사용중이면 submit 이 대기한다. (backpressure)
+    - 프로세스로 넘기는 것은 슬롯 이름/크기/경로 뿐이라 픽셀 데이터의 pickle 복사가 없다.
+    - 인코더에서 발생한 오류는 다음 submit 또는 flush 에서 EncodeError 로 전달된다.
+    - 프레임마다 인코딩/파일 기록에 걸린 시간을 timings 에 남긴다. (cap_trace 참고)
+    - 인코더가 공유메모리의 픽셀로 sha256 을 계산해 돌려준다. (캡쳐 쓰레드에서 픽셀을 다시 복사/해시하지 않는다)
+      기록이 끝난 프레임은 pop_done 으로 가져간다.
+"""
+
+import hashlib
+import io
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing import shared_memory
+import numpy as np
+from PIL import Image
+from supa_common import log
+
+
+class EncodeError(Exception):
+    """인코더 프로세스에서 발생한 오류"""
+    pass
+
+
+def encode_png(image: Image.Image, output_path: str) -> tuple[float, float]:
+    """이미지를 PNG로 인코딩한 뒤 파일에 기록한다.
+
+    Returns:
+        (인코딩 시간(초), 파일 기록 시간(초))
+    """
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    encoded = time.perf_counter()
+    with open(output_path, 'wb') as f:
+        f.write(buffer.getbuffer())
+    return encoded - start, time.perf_counter() - encoded
+
+
+def _encode_worker(shm_name: str, mode: str, size: tuple, nbytes: int,
+                   output_path: str) -> tuple[str, float, float, str]:
+    """인코더 프로세스에서 실행된다. 공유메모리의 픽셀을 PNG로 저장하고 픽셀의 sha256 을 계산한다.
+
+    Returns:
+        (파일 경로, 인코딩 시간, 파일 기록 시간, 원본 픽셀 sha256. cap_manifest.content_hash 와 같은 값)
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        image = Image.frombuffer(mode, size, shm.buf, 'raw', mode, 0, 1)
+        encode_time, write_time = encode_png(image, output_path)
+        pixels = shm.buf[:nbytes]
+        frame_hash = hashlib.sha256(pixels).hexdigest()
+        # frombuffer 이미지와 memoryview 가 공유메모리를 참조하고 있으므로 close 전에 해제한다.
+        pixels.release()
+        del image
+    finally:
+        shm.close()
+    return output_path, encode_time, write_time, frame_hash
+
+
+class EncodePool:
+    """공유메모리 슬롯과 인코더 프로세스 풀로 PNG 저장을 비동기 처리한다.
+
+    Args:
+        workers: 인코더 프로세스 수
+        max_pending: 동시에 대기할 수 있는 프레임 수 (공유메모리 슬롯 수). 0이면 workers * 2
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 0):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * 2
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots: list[shared_memory.SharedMemory | None] = [None] * self.max_pending
+        self._free_slots = list(range(self.max_pending))
+        self._cond = threading.Condition()
+        self._pending: set[Future] = set()
+        self._errors: list[BaseException] = []
+        self.timings: dict[str, tuple[float, float]] = {}  # 파일 경로 -> (인코딩 시간, 파일 기록 시간)
+        self._done: list[tuple[str, str]] = []  # pop_done 으로 가져가지 않은 (파일 경로, 픽셀 sha256)
+
+    def _acquire_slot(self, nbytes: int) -> int:
+        """빈 슬롯을 하나 가져온다. 빈 슬롯이 없으면 인코더가 따라올 때까지 대기한다."""
+        with self._cond:
+            while not self._free_slots and not self._errors:
+                self._cond.wait()
+            self._raise_if_failed()
+            slot = self._free_slots.pop()
+
+        shm = self._slots[slot]
+        if shm is None or shm.size < nbytes:
+            # 처음 사용하거나 프레임이 더 커진 경우에만 새로 할당한다.
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            self._slots[slot] = shared_memory.SharedMemory(create=True, size=nbytes)
+        return slot
+
+    def _release_slot(self, slot: int, future: Future) -> None:
+        with self._cond:
+            self._pending.discard(future)
+            error = future.exception()
+            if error is not None:
+                self._errors.append(error)
+            else:
+                output_path, encode_time, write_time, frame_hash = future.result()
+                self.timings[output_path] = (encode_time, write_time)
+                self._done.append((output_path, frame_hash))
+            self._free_slots.append(slot)
+            self._cond.notify_all()
+
+    def _raise_if_failed(self) -> None:
+        if self._errors:
+            error = self._errors[0]
+            raise EncodeError(f"PNG 인코딩 실패: {error}") from error
+
+    def submit(self, image: Image.Image, output_path: str) -> None:
+        """프레임을 인코딩 대기열에 넣는다. 픽셀은 공유메모리로 복사되므로 호출 후 image 는 재사용해도 된다.
+
+        Args:
+            image: 저장할 이미지
+            output_path: 저장할 PNG 파일 경로
+
+        Raises:
+            EncodeError: 이전에 제출한 프레임의 인코딩이 실패한 경우
+        """
+        # 중간 bytes 객체 없이 픽셀을 공유메모리로 바로 복사한다. ('1' 은 비트 단위로 묶인 raw 형식이라 tobytes 사용)
+        pixels = np.asarray(image) if image.mode != '1' else np.frombuffer(image.tobytes(), np.uint8)
+        slot = self._acquire_slot(pixels.nbytes)
+        shm = self._slots[slot]
+        np.copyto(np.ndarray(pixels.shape, pixels.dtype, buffer=shm.buf), pixels)
+
+        future = self._executor.submit(_encode_worker, shm.name, image.mode, image.size, pixels.nbytes, output_path)
+        with self._cond:
+            self._pending.add(future)
+        future.add_done_callback(lambda f, s=slot: self._release_slot(s, f))
+
+    def pop_done(self) -> list[tuple[str, str]]:
+        """디스크 기록이 끝난 프레임 [(파일 경로, 원본 픽셀 sha256)] 을 완료된 순서대로 가져간다."""
+        with self._cond:
+            done, self._done = self._done, []
+        return done
+
+    def flush(self) -> None:
+        """대기중인 모든 프레임이 디스크에 기록될 때까지 기다린다.
+
+        Raises:
+            EncodeError: 인코딩이 하나라도 실패한 경우
+        """
+        with self._cond:
+            while self._pending:
+                self._cond.wait()
+            self._raise_if_failed()
+
+    def close(self) -> None:
+        """대기중인 프레임을 모두 기록한 뒤 프로세스와 공유메모리를 정리한다."""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+            for shm in self._slots:
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+            self._slots = [None] * self.max_pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.close()
+        except EncodeError as e:
+            # with 블록의 예외가 인코더 오류에 가려지지 않도록 로그만 남긴다.
+            if exc_type is None:
+                raise
+            log(self, f'ERROR {e}')
+
+# end of file
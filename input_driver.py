@@ -0,0 +1,297 @@
+"""
+입력(페이지 넘김) 드라이버 모듈입니다.
+
+auto_pdf_capture 가 페이지를 넘기는 키 입력/클릭/휠 스크롤을 보내는 방법을 교체할 수 있도록 공통 인터페이스를 제공한다.
+    - pyautogui : 기존 방식. 호출마다 pyautogui.PAUSE(기본 0.1초) 만큼 쉬는 것은 끄고 보낸다. (failsafe 는 유지)
+    - xtest     : 리눅스(X11) XTest 확장으로 직접 보낸다. (python-xlib 필요)
+    - uinput    : 리눅스 커널 가상 입력장치(/dev/uinput)로 보낸다. Wayland 에서도 동작한다. (evdev 필요, 쓰기 권한 필요)
+    - recording : 실제 입력 없이 호출 기록만 남긴다. 화면 없이 캡쳐 루프를 돌릴 때(replay 백엔드 등) 사용한다.
+드라이버마다 호출 1회에 걸린 시간을 기록하므로 overhead_summary() 로 드라이버 자체의 지연을 비교할 수 있다.
+"""
+
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class InputEvent:
+    """RecordingDriver 가 기록한 입력"""
+    action: str     # 'press', 'click', 'scroll'
+    args: tuple
+    time: float     # time.perf_counter() 값
+
+
+class InputDriver:
+    """입력 드라이버의 기본 클래스. 하위 클래스는 _press/_click/_scroll 을 구현한다."""
+
+    name = ''
+
+    def __init__(self):
+        self._call_times: list[float] = []
+
+    def press(self, key: str) -> None:
+        """키를 한번 누른다. 키 이름은 pyautogui 와 같다. ('right', 'left', 'pagedown', 'space' 등)"""
+        self._timed(self._press, key)
+
+    def click(self, x: int, y: int) -> None:
+        """화면 좌표 (x, y) 를 왼쪽 버튼으로 클릭한다."""
+        self._timed(self._click, int(x), int(y))
+
+    def scroll(self, amount: int, x: int, y: int) -> None:
+        """화면 좌표 (x, y) 에서 휠을 amount 칸 굴린다. (음수면 아래로)"""
+        self._timed(self._scroll, int(amount), int(x), int(y))
+
+    def _timed(self, fn, *args) -> None:
+        start = time.perf_counter()
+        fn(*args)
+        self._call_times.append(time.perf_counter() - start)
+
+    def _press(self, key: str) -> None:
+        raise NotImplementedError
+
+    def _click(self, x: int, y: int) -> None:
+        raise NotImplementedError
+
+    def _scroll(self, amount: int, x: int, y: int) -> None:
+        raise NotImplementedError
+
+    @property
+    def calls(self) -> int:
+        """지금까지 보낸 입력 횟수"""
+        return len(self._call_times)
+
+    @property
+    def overhead(self) -> float:
+        """입력 1회에 걸린 평균 시간(초). 호출이 없으면 0"""
+        return sum(self._call_times) / len(self._call_times) if self._call_times else 0.0
+
+    def overhead_summary(self) -> str:
+        """입력 호출 지연 요약 (로그 출력용)"""
+        if not self._call_times:
+            return f'입력 드라이버 {self.name} - 호출 없음'
+        return (f'입력 드라이버 {self.name} - 호출 {self.calls}회, 평균 {self.overhead * 1000:.2f}ms / '
+                f'최대 {max(self._call_times) * 1000:.2f}ms, 합계 {sum(self._call_times):.2f}초')
+
+    def close(self) -> None:
+        """드라이버가 잡고 있는 자원을 해제한다."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class PyautoguiDriver(InputDriver):
+    """pyautogui 를 사용하는 기존 방식의 드라이버
+
+    pause 가 False 면 호출마다 pyautogui.PAUSE 만큼 쉬지 않는다. (렌더링 대기는 automation_delay/자동 대기가 담당)
+    마우스를 화면 모서리로 옮기면 중지되는 failsafe 는 그대로 동작한다.
+    """
+
+    name = 'pyautogui'
+
+    def __init__(self, pause: bool = False):
+        super().__init__()
+        import pyautogui
+        self._pyautogui = pyautogui
+        self.pause = pause
+
+    def _press(self, key: str) -> None:
+        self._pyautogui.press(key, _pause=self.pause)
+
+    def _click(self, x: int, y: int) -> None:
+        self._pyautogui.click(x, y, _pause=self.pause)
+
+    def _scroll(self, amount: int, x: int, y: int) -> None:
+        self._pyautogui.scroll(amount, x=x, y=y, _pause=self.pause)
+
+
+# pyautogui 키 이름 -> X11 keysym 이름
+_X11_KEYSYMS = {
+    'right': 'Right', 'left': 'Left', 'up': 'Up', 'down': 'Down',
+    'pagedown': 'Next', 'pageup': 'Prior', 'home': 'Home', 'end': 'End',
+    'space': 'space', 'enter': 'Return', 'return': 'Return', 'esc': 'Escape', 'tab': 'Tab',
+}
+
+
+class XTestDriver(InputDriver):
+    """X11 XTest 확장으로 입력을 직접 보내는 드라이버
+
+    주의 : X 디스플레이 연결은 생성한 쓰레드에서만 사용해야 한다. (MssBackend 와 같음)
+    """
+
+    name = 'xtest'
+
+    def __init__(self, display: str | None = None):
+        super().__init__()
+        from Xlib import X, XK, display as xdisplay
+        from Xlib.ext import xtest
+        self._X = X
+        self._xtest = xtest
+        self._display = xdisplay.Display(display)
+        if not self._display.has_extension('XTEST'):
+            self._display.close()
+            raise RuntimeError('X 서버가 XTEST 확장을 지원하지 않습니다.')
+        self._keycodes = {}
+        for key, keysym_name in _X11_KEYSYMS.items():
+            self._keycodes[key] = self._display.keysym_to_keycode(XK.string_to_keysym(keysym_name))
+        self._XK = XK
+
+    def _keycode(self, key: str) -> int:
+        keycode = self._keycodes.get(key)
+        if keycode is None:
+            keycode = self._display.keysym_to_keycode(self._XK.string_to_keysym(key))
+            if not keycode:
+                raise ValueError(f"지원하지 않는 키입니다: {key}")
+            self._keycodes[key] = keycode
+        return keycode
+
+    def _press(self, key: str) -> None:
+        keycode = self._keycode(key)
+        self._xtest.fake_input(self._display, self._X.KeyPress, keycode)
+        self._xtest.fake_input(self._display, self._X.KeyRelease, keycode)
+        self._display.sync()
+
+    def _move(self, x: int, y: int) -> None:
+        self._xtest.fake_input(self._display, self._X.MotionNotify, x=x, y=y)
+
+    def _click(self, x: int, y: int) -> None:
+        self._move(x, y)
+        self._xtest.fake_input(self._display, self._X.ButtonPress, 1)
+        self._xtest.fake_input(self._display, self._X.ButtonRelease, 1)
+        self._display.sync()
+
+    def _scroll(self, amount: int, x: int, y: int) -> None:
+        # X11 에서 휠은 버튼 4(위)/5(아래) 누름으로 전달된다.
+        self._move(x, y)
+        button = 4 if amount > 0 else 5
+        for _ in range(abs(amount)):
+            self._xtest.fake_input(self._display, self._X.ButtonPress, button)
+            self._xtest.fake_input(self._display, self._X.ButtonRelease, button)
+        self._display.sync()
+
+    def close(self) -> None:
+        self._display.close()
+
+
+class UinputDriver(InputDriver):
+    """리눅스 uinput 가상 입력장치로 입력을 보내는 드라이버
+
+    키보드+휠 장치와, 클릭 위치를 절대좌표로 지정하는 포인터 장치(처음 클릭할 때 생성)를 만든다.
+    장치를 만든 직후에는 윈도 시스템이 장치를 인식할 때까지 잠시 기다린다.
+
+    Args:
+        screen_size: 화면 크기 (width, height). 클릭 좌표를 절대좌표 범위로 변환할 때 사용한다.
+        settle: 장치 생성 후 대기시간(초)
+    """
+
+    name = 'uinput'
+
+    def __init__(self, screen_size: tuple[int, int] | None = None, settle: float = 0.5):
+        super().__init__()
+        from evdev import UInput, AbsInfo, ecodes
+        self._UInput = UInput
+        self._AbsInfo = AbsInfo
+        self._ecodes = ecodes
+        self.screen_size = screen_size
+        self.settle = settle
+        keys = [code for name, code in ecodes.ecodes.items() if name.startswith('KEY_')]
+        self._keyboard = UInput({ecodes.EV_KEY: keys, ecodes.EV_REL: [ecodes.REL_WHEEL]},
+                                name='auto-pdf-capture-keyboard')
+        self._pointer = None
+        time.sleep(settle)
+
+    def _keycode(self, key: str) -> int:
+        name = 'KEY_' + {'pagedown': 'PAGEDOWN', 'pageup': 'PAGEUP', 'return': 'ENTER'}.get(key, key.upper())
+        code = self._ecodes.ecodes.get(name)
+        if code is None:
+            raise ValueError(f"지원하지 않는 키입니다: {key}")
+        return code
+
+    def _press(self, key: str) -> None:
+        code = self._keycode(key)
+        self._keyboard.write(self._ecodes.EV_KEY, code, 1)
+        self._keyboard.write(self._ecodes.EV_KEY, code, 0)
+        self._keyboard.syn()
+
+    def _move(self, x: int, y: int) -> None:
+        ecodes = self._ecodes
+        if self._pointer is None:
+            if not self.screen_size:
+                raise ValueError('uinput 드라이버로 클릭하려면 screen_size 가 필요합니다.')
+            width, height = self.screen_size
+            self._pointer = self._UInput({
+                ecodes.EV_KEY: [ecodes.BTN_LEFT],
+                ecodes.EV_ABS: [(ecodes.ABS_X, self._AbsInfo(0, 0, width - 1, 0, 0, 0)),
+                                (ecodes.ABS_Y, self._AbsInfo(0, 0, height - 1, 0, 0, 0))],
+            }, name='auto-pdf-capture-pointer')
+            time.sleep(self.settle)
+        self._pointer.write(ecodes.EV_ABS, ecodes.ABS_X, x)
+        self._pointer.write(ecodes.EV_ABS, ecodes.ABS_Y, y)
+        self._pointer.syn()
+
+    def _click(self, x: int, y: int) -> None:
+        self._move(x, y)
+        self._pointer.write(self._ecodes.EV_KEY, self._ecodes.BTN_LEFT, 1)
+        self._pointer.write(self._ecodes.EV_KEY, self._ecodes.BTN_LEFT, 0)
+        self._pointer.syn()
+
+    def _scroll(self, amount: int, x: int, y: int) -> None:
+        # uinput 휠은 포인터가 있는 창으로 전달되므로 포인터를 먼저 옮긴다. (screen_size 가 없으면 현재 위치)
+        if self.screen_size:
+            self._move(x, y)
+        self._keyboard.write(self._ecodes.EV_REL, self._ecodes.REL_WHEEL, amount)
+        self._keyboard.syn()
+
+    def close(self) -> None:
+        self._keyboard.close()
+        if self._pointer is not None:
+            self._pointer.close()
+
+
+class RecordingDriver(InputDriver):
+    """실제 입력을 보내지 않고 호출만 기록하는 드라이버"""
+
+    name = 'recording'
+
+    def __init__(self):
+        super().__init__()
+        self.events: list[InputEvent] = []
+
+    def _press(self, key: str) -> None:
+        self.events.append(InputEvent('press', (key,), time.perf_counter()))
+
+    def _click(self, x: int, y: int) -> None:
+        self.events.append(InputEvent('click', (x, y), time.perf_counter()))
+
+    def _scroll(self, amount: int, x: int, y: int) -> None:
+        self.events.append(InputEvent('scroll', (amount, x, y), time.perf_counter()))
+
+
+INPUT_DRIVERS = {
+    PyautoguiDriver.name: PyautoguiDriver,
+    XTestDriver.name: XTestDriver,
+    UinputDriver.name: UinputDriver,
+    RecordingDriver.name: RecordingDriver,
+}
+
+
+def create_input_driver(name: str = 'pyautogui', **kwargs) -> InputDriver:
+    """이름으로 입력 드라이버를 생성한다.
+
+    Args:
+        name: 드라이버 이름 ('pyautogui', 'xtest', 'uinput', 'recording')
+        **kwargs: 드라이버 생성자 인자 (uinput 의 경우 screen_size)
+
+    Returns:
+        InputDriver 인스턴스
+    """
+    try:
+        driver_cls = INPUT_DRIVERS[name]
+    except KeyError:
+        raise ValueError(f"지원하지 않는 입력 드라이버입니다: {name} (가능한 값: {', '.join(INPUT_DRIVERS)})")
+    return driver_cls(**kwargs)
+
+# end of file
@@ -1,8 +1,10 @@
 from PyQt6.QtWidgets import QApplication
+import multiprocessing
 import sys
 from main_window import MainWindow
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # PyInstaller 빌드에서 PNG 인코딩 프로세스를 띄우기 위해 필요
     app = QApplication(sys.argv)
     main_window = MainWindow()
     main_window.show()
@@ -2,15 +2,19 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QTabWidget)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QKeySequence, QAction, QShortcut
 from tab_basic import BasicTab
-from tab_ocr import OcrTab
-from tab_gen_outline import GenOutlineTab
 from settings_dialog import SettingsDialog
 from supa_settings import SupaSettings
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from tab_ocr import OcrTab
+    from tab_gen_outline import GenOutlineTab
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.settings = SupaSettings()  
+        self._lazy_tabs: dict[str, tuple[QWidget, Callable[[], QWidget]]] = {}  # 속성명 -> (빈 위젯, 탭 생성 함수)
         self.initUI()
         self.loadSettings()   # 설정 불러오기
         self.setup_shortcuts()
@@ -31,17 +35,63 @@ class MainWindow(QMainWindow):
         self.basic_tab = BasicTab(self)
         self.tab_widget.addTab(self.basic_tab, "캡쳐자동화")
 
-        # 두 번째 탭
-        self.ocr_tab = OcrTab(self)
-        self.tab_widget.addTab(self.ocr_tab, "개요OCR추출")
-
-        # 세 번째 탭
-        self.gen_outline_tab = GenOutlineTab(self)
-        self.tab_widget.addTab(self.gen_outline_tab, "개요적용")
+        # 두 번째, 세 번째 탭은 처음 표시될 때 생성한다. (프로그램 시작 시간 단축)
+        self._add_lazy_tab('ocr_tab', "개요OCR추출", self._create_ocr_tab)
+        self._add_lazy_tab('gen_outline_tab', "개요적용", self._create_gen_outline_tab)
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
 
         self.setWindowTitle('메인 창')
         self.setGeometry(100, 100, 500, 400)
 
+    def _create_ocr_tab(self) -> QWidget:
+        from tab_ocr import OcrTab
+        return OcrTab(self)
+
+    def _create_gen_outline_tab(self) -> QWidget:
+        from tab_gen_outline import GenOutlineTab
+        return GenOutlineTab(self)
+
+    def _add_lazy_tab(self, name: str, title: str, factory: Callable[[], QWidget]) -> None:
+        """처음 표시될 때(또는 처음 접근할 때) 생성되는 탭을 추가한다. 그 전까지는 빈 위젯을 둔다."""
+        placeholder = QWidget(self)
+        self._lazy_tabs[name] = (placeholder, factory)
+        self.tab_widget.addTab(placeholder, title)
+
+    def _lazy_tab(self, name: str) -> QWidget:
+        """탭을 반환한다. 아직 생성되지 않았으면 생성하여 빈 위젯과 교체한다."""
+        tab = self.__dict__.get(f'_{name}')
+        if tab is not None:
+            return tab
+        placeholder, factory = self._lazy_tabs.pop(name)
+        tab = factory()
+        setattr(self, f'_{name}', tab)
+
+        index = self.tab_widget.indexOf(placeholder)
+        title = self.tab_widget.tabText(index)
+        current = self.tab_widget.currentIndex()
+        self.tab_widget.blockSignals(True)
+        self.tab_widget.removeTab(index)
+        self.tab_widget.insertTab(index, tab, title)
+        self.tab_widget.setCurrentIndex(current)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+        return tab
+
+    def _on_tab_changed(self, index: int) -> None:
+        widget = self.tab_widget.widget(index)
+        for name, (placeholder, _) in list(self._lazy_tabs.items()):
+            if placeholder is widget:
+                self._lazy_tab(name)
+                break
+
+    @property
+    def ocr_tab(self) -> 'OcrTab':
+        return self._lazy_tab('ocr_tab')
+
+    @property
+    def gen_outline_tab(self) -> 'GenOutlineTab':
+        return self._lazy_tab('gen_outline_tab')
+
     def loadSettings(self):
         """저장된 설정 불러오기"""
         # 창 위치/크기 설정 불러오기
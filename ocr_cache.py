@@ -0,0 +1,129 @@
+"""
+OCR 응답 캐시 모듈입니다.
+
+이미지 데이터 + 요청 파라미터(version, lang, format 등)의 sha256 을 키로 OCR API 응답(JSON)을 디스크에 저장한다.
+같은 목차 이미지를 다시 스캔하면 API 를 호출하지 않고 저장된 응답을 사용한다.
+    - 저장 위치 : <cache_dir>/<키 앞 2글자>/<키>.json (기본 cache_dir 은 default_cache_dir())
+    - 크기 제한 : 전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은 응답부터 지운다. (LRU, 파일 수정시간 기준)
+여러 쓰레드에서 동시에 사용할 수 있다.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+OCR_CACHE_MAX_MB = 200  # 기본 캐시 크기 제한(MB)
+
+
+def default_cache_dir() -> str:
+    """OS 의 사용자 캐시 폴더 아래 OCR 캐시 폴더"""
+    base = (os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA')
+            or os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'auto-pdf-cap', 'ocr')
+
+
+class OcrCache:
+    """내용 주소(sha256) 기반 OCR 응답 디스크 캐시
+
+    Args:
+        directory: 캐시 폴더 (빈 문자열이면 default_cache_dir())
+        max_bytes: 캐시 전체 크기 제한 (바이트)
+    """
+
+    def __init__(self, directory: str = '', max_bytes: int = OCR_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+
+    @staticmethod
+    def make_key(data: bytes, params: dict) -> str:
+        """이미지 데이터와 요청 파라미터로 캐시 키를 만든다. (파라미터가 다르면 다른 키)"""
+        digest = hashlib.sha256(data)
+        digest.update(b'\0' + json.dumps(params, sort_keys=True).encode('UTF-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def _entries(self) -> list[tuple[float, str, int]]:
+        """[(마지막 사용 시각, 경로, 크기)]"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def get(self, key: str) -> dict | None:
+        """저장된 응답을 반환한다. 없거나 읽을 수 없으면 None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = json.loads(f.read())
+            os.utime(path)  # LRU : 사용 시각 갱신
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        """응답을 저장하고 크기 제한을 넘으면 오래된 응답을 지운다."""
+        path = self._path(key)
+        data = json.dumps(result, ensure_ascii=False).encode('UTF-8')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            try:
+                self._size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """오래 사용하지 않은 응답부터 지워 max_bytes 의 90% 이하로 줄인다. (_lock 안에서 호출)"""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, _, size in entries)
+        target = self.max_bytes * 0.9
+        for _, path, size in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    @property
+    def size(self) -> int:
+        """캐시 전체 크기 (바이트)"""
+        return self._size
+
+    def clear(self) -> None:
+        """저장된 응답을 모두 지운다."""
+        with self._lock:
+            for _, path, _ in self._entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+# end of file
@@ -0,0 +1,230 @@
+"""
+OCR API 클라이언트 모듈입니다.
+
+CLOVA OCR API 요청을 보내는 클라이언트. 여러 쓰레드에서 동시에 사용할 수 있다.
+    - 연결 재사용   : keep-alive 세션 하나를 공유한다. (연결 풀 크기 = concurrency)
+    - 속도 제한     : 토큰 버킷으로 초당 요청 수를 rate 이하로 맞춘다. (0 이면 제한 없음)
+    - 재시도        : 429, 5xx, 시간초과는 지수 백오프(full jitter)로 max_retries 번까지 다시 요청한다.
+                      Retry-After 헤더가 있으면 그 시간만큼 기다리며, 429 를 받으면 모든 쓰레드가 함께 기다린다.
+    - 통계          : 요청/재시도/429/5xx/시간초과 수와 대기 시간을 stats 에 모은다.
+"""
+
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+import json
+import random
+import threading
+import time
+import uuid
+
+
+class TokenBucket:
+    """쓰레드 안전한 토큰 버킷
+
+    Args:
+        rate: 초당 채워지는 토큰 수 (0 이하면 제한 없음)
+        burst: 버킷 크기 (한 번에 몰아서 보낼 수 있는 요청 수)
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._hold_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 하나를 얻을 때까지 기다린다.
+
+        Returns:
+            기다린 시간(초)
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.rate > 0:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._hold_until and (self.rate <= 0 or self._tokens >= 1):
+                    if self.rate > 0:
+                        self._tokens -= 1
+                    return waited
+                delay = max(self._hold_until - now, (1 - self._tokens) / self.rate if self.rate > 0 else 0)
+            time.sleep(delay)
+            waited += delay
+
+    def hold(self, seconds: float) -> None:
+        """seconds 동안 모든 acquire() 를 멈춘다. (429 응답을 받은 경우)"""
+        with self._lock:
+            self._hold_until = max(self._hold_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+@dataclass
+class OcrClientStats:
+    """OCR 요청 통계"""
+    requests: int = 0              # 보낸 요청 수 (재시도 포함)
+    retries: int = 0               # 재시도 수
+    throttled: int = 0             # 429 응답 수
+    server_errors: int = 0         # 5xx 응답 수
+    timeouts: int = 0              # 시간초과 수
+    wait_seconds: float = 0.0      # 토큰 버킷(속도 제한) 대기 시간 합
+    backoff_seconds: float = 0.0   # 재시도 전 대기 시간 합
+    upload_bytes: int = 0          # 업로드한 이미지 데이터 크기 합 (재시도 포함)
+    request_seconds: float = 0.0   # 요청~응답 시간 합 (재시도 포함)
+
+    @property
+    def average_seconds(self) -> float:
+        """요청 하나의 평균 응답 시간(초)"""
+        return self.request_seconds / self.requests if self.requests else 0.0
+
+    def summary(self) -> str:
+        return (f'요청 {self.requests}건, 재시도 {self.retries}건 '
+                f'(429: {self.throttled}, 5xx: {self.server_errors}, 시간초과: {self.timeouts}), '
+                f'속도제한 대기 {self.wait_seconds:.1f}초, 백오프 {self.backoff_seconds:.1f}초, '
+                f'업로드 {self.upload_bytes / (1024 * 1024):.2f}MB, 평균 응답 {self.average_seconds:.2f}초')
+
+
+class OcrClient:
+    """CLOVA OCR API 클라이언트
+
+    Args:
+        secret_key: OCR 비밀키
+        api_url: OCR API URL
+        concurrency: 동시에 사용할 쓰레드 수 (연결 풀 크기)
+        rate: 초당 최대 요청 수 (0 이면 제한 없음)
+        burst: 한 번에 몰아서 보낼 수 있는 요청 수
+        max_retries: 429/5xx/시간초과 시 최대 재시도 횟수
+        backoff_base: 첫 재시도의 최대 대기 시간(초). 재시도마다 두 배
+        backoff_max: 재시도 대기 시간 상한(초)
+        retry_after_max: Retry-After 헤더를 따를 최대 시간(초)
+        timeout: 요청 하나의 시간초과(초)
+    """
+
+    version = 'V2'
+    lang = 'ko'
+
+    def __init__(self, secret_key: str, api_url: str, *, concurrency: int = 4, rate: float = 0.0, burst: int = 1,
+                 max_retries: int = 4, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 retry_after_max: float = 120.0, timeout: float = 60.0):
+        import requests  # 프로그램 시작 시간을 줄이기 위해 OCR 실행시 import
+        from requests.adapters import HTTPAdapter
+
+        self._requests = requests
+        self.api_url = api_url
+        self.headers = {
+            'X-OCR-SECRET': secret_key,
+        }
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.stats = OcrClientStats()
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _count(self, **values) -> None:
+        with self._stats_lock:
+            for name, value in values.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _backoff(self, attempt: int) -> float:
+        """attempt 번째(0부터) 재시도 전 대기 시간 (full jitter)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response) -> float | None:
+        """Retry-After 헤더(초 또는 HTTP 날짜)를 초로 변환한다. 없거나 잘못된 값이면 None"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(0.0, seconds), self.retry_after_max)
+
+    def request_params(self, image_format: str = 'png') -> dict:
+        """요청마다 바뀌지 않는 파라미터 (응답 캐시 키에 사용)"""
+        return {'version': self.version, 'lang': self.lang, 'format': image_format}
+
+    def request_message(self, image_format: str = 'png') -> dict:
+        """CLOVA 요청 가이드 형식의 message 항목"""
+        # 참조 : https://api.ncloud-docs.com/docs/ai-application-service-ocr-example01
+        return {
+            'version': self.version,
+            'requestId': str(uuid.uuid4()),
+            'timestamp': int(round(time.time() * 1000)),
+            'lang': self.lang,
+            'images': [
+                {
+                    'format': image_format,
+                    'name': 'demo',
+                }
+            ],
+        }
+
+    def ocr_bytes(self, data: bytes, image_format: str = 'png') -> dict:
+        """이미지 데이터를 OCR 하고 응답 JSON 을 반환한다.
+
+        Raises:
+            requests.exceptions.RequestException: 재시도 후에도 실패한 경우 (429/5xx 는 HTTPError)
+            ValueError: 응답이 JSON 이 아닌 경우
+        """
+        requests = self._requests
+        for attempt in range(self.max_retries + 1):
+            self._count(wait_seconds=self.bucket.acquire(), requests=1)
+            # 재시도마다 requestId/timestamp 를 새로 만든다.
+            payload = {'message': json.dumps(self.request_message(image_format)).encode('UTF-8')}
+            files = [
+                ('file', (f'image.{image_format}', data)),
+            ]
+            start = time.perf_counter()
+            try:
+                response = self.session.post(self.api_url, headers=self.headers, data=payload, files=files,
+                                             timeout=self.timeout)
+            except requests.exceptions.Timeout:
+                self._count(timeouts=1, upload_bytes=len(data), request_seconds=time.perf_counter() - start)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                self._count(upload_bytes=len(data), request_seconds=time.perf_counter() - start)
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                if response.status_code == 429:
+                    self._count(throttled=1)
+                else:
+                    self._count(server_errors=1)
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                retry_after = self._retry_after(response)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if response.status_code == 429:
+                    # 다른 쓰레드도 같은 한도에 걸리므로 함께 기다린다.
+                    self.bucket.hold(delay)
+            self._count(retries=1, backoff_seconds=delay)
+            time.sleep(delay)
+        raise AssertionError('unreachable')
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# end of file
@@ -0,0 +1,146 @@
+"""
+OCR 업로드 전처리 모듈입니다.
+
+목차 이미지를 OCR API 로 보내기 전에 업로드 크기를 줄인다.
+    1. 여백 제거   : 종이 바깥(뷰어 배경)과 글자 바깥의 흰 여백을 잘라낸다. (content_bounds)
+    2. 흑백 변환   : 8비트 흑백(L)으로 바꾼다.
+    3. 축소        : 글자 줄 높이가 target_text_height 보다 크면 그 높이가 되도록 줄인다. (레티나 캡쳐 등)
+    4. 다시 인코딩 : API 가 받는 형식(OCR_IMAGE_FORMATS) 중 가장 작은 형식으로 인코딩한다.
+                     (CLOVA OCR 은 jpg/png/pdf/tiff 만 받으므로 WebP 는 사용하지 않는다)
+원본이 더 작으면 원본을 그대로 보낸다.
+"""
+
+from dataclasses import dataclass, field
+import io
+import numpy as np
+from PIL import Image
+
+from content_bounds import detect_content_bounds
+
+OCR_IMAGE_FORMATS = ('jpg', 'png')  # 업로드 형식 후보 (CLOVA OCR 이 받는 형식)
+_PIL_FORMATS = {'jpg': 'JPEG', 'png': 'PNG'}
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """전처리 결과"""
+    data: bytes                        # 업로드할 이미지 데이터
+    format: str                        # 'jpg', 'png' (요청의 images[].format)
+    original_bytes: int                # 원본 데이터 크기
+    box: tuple[int, int, int, int]     # 원본 이미지에서 잘라낸 영역 (left, top, right, bottom)
+    scale: float = 1.0                 # 잘라낸 영역에 곱한 축소 비율
+    size: tuple[int, int] = field(default=(0, 0))  # 업로드 이미지 크기
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - len(self.data)
+
+
+def estimate_text_height(gray: np.ndarray, ink_threshold: int = 48, min_height: int = 4) -> int | None:
+    """흑백 이미지에서 글자 줄 높이(px)의 중앙값을 구한다.
+
+    잉크 픽셀이 있는 행이 연속된 구간을 글자 줄 하나로 본다. (수평 투영)
+    줄을 찾지 못하면 None
+    """
+    paper = int(np.median(gray))
+    ink = np.abs(gray.astype(np.int16) - paper) > ink_threshold
+    rows = ink.sum(axis=1) > max(1, gray.shape[1] // 500)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.astype(np.int8), [0]))))
+    heights = edges[1::2] - edges[::2]
+    heights = heights[heights >= min_height]
+    if not heights.size:
+        return None
+    return int(np.median(heights))
+
+
+def _source_format(image: Image.Image) -> str | None:
+    for name, pil_format in _PIL_FORMATS.items():
+        if image.format == pil_format:
+            return name
+    return None
+
+
+class OcrPreprocessor:
+    """OCR 업로드 전처리기
+
+    Args:
+        target_text_height: 축소 후 글자 줄 높이(px). 0 이면 축소하지 않는다.
+        jpeg_quality: JPEG 인코딩 품질
+        padding: 잘라낸 영역 바깥에 남길 여백(px, 원본 기준)
+        formats: 업로드 형식 후보
+    """
+
+    def __init__(self, target_text_height: int = 32, jpeg_quality: int = 80, padding: int = 16,
+                 formats: tuple[str, ...] = OCR_IMAGE_FORMATS):
+        for image_format in formats:
+            if image_format not in _PIL_FORMATS:
+                raise ValueError(f"지원하지 않는 업로드 형식입니다: {image_format} "
+                                 f"(가능한 값: {', '.join(_PIL_FORMATS)})")
+        self.target_text_height = target_text_height
+        self.jpeg_quality = jpeg_quality
+        self.padding = padding
+        self.formats = tuple(formats)
+
+    @property
+    def params(self) -> dict:
+        """결과에 영향을 주는 설정값 (OCR 응답 캐시 키에 사용)"""
+        return {'target_text_height': self.target_text_height, 'jpeg_quality': self.jpeg_quality,
+                'padding': self.padding, 'formats': list(self.formats)}
+
+    def _encode(self, image: Image.Image, image_format: str) -> bytes:
+        buffer = io.BytesIO()
+        if image_format == 'jpg':
+            image.save(buffer, 'JPEG', quality=self.jpeg_quality, optimize=True)
+        else:
+            image.save(buffer, 'PNG', optimize=True)
+        return buffer.getvalue()
+
+    def encode(self, image: Image.Image) -> tuple[bytes, str]:
+        """업로드 형식 후보 중 가장 작은 형식으로 인코딩한다. Returns: (데이터, 형식)"""
+        candidates = [(self._encode(image, image_format), image_format) for image_format in self.formats]
+        return min(candidates, key=lambda candidate: len(candidate[0]))
+
+    def process(self, image: Image.Image) -> tuple[Image.Image, tuple[int, int, int, int], float]:
+        """여백 제거, 흑백 변환, 축소를 적용한다. (인코딩 전 단계)
+
+        Returns:
+            (흑백 이미지, 원본에서 잘라낸 영역, 축소 비율)
+        """
+        width, height = image.size
+        # 2. 흑백 변환 (여백 감지와 축소도 흑백 이미지로 한다)
+        gray = image.convert('L')
+
+        # 1. 여백 제거
+        box = (0, 0, width, height)
+        bounds = detect_content_bounds(gray)
+        if bounds is not None:
+            left, top, right, bottom = bounds.content
+            box = (max(0, left - self.padding), max(0, top - self.padding),
+                   min(width, right + self.padding), min(height, bottom + self.padding))
+            gray = gray.crop(box)
+
+        # 3. 축소 (확대는 하지 않는다)
+        scale = 1.0
+        if self.target_text_height > 0:
+            text_height = estimate_text_height(np.asarray(gray))
+            if text_height and text_height > self.target_text_height:
+                scale = self.target_text_height / text_height
+                gray = gray.resize((max(1, round(gray.width * scale)), max(1, round(gray.height * scale))),
+                                   Image.Resampling.LANCZOS)
+        return gray, box, scale
+
+    def prepare(self, data: bytes) -> PreparedImage:
+        """이미지 데이터를 전처리한다. (여러 쓰레드에서 동시에 호출해도 된다)"""
+        with Image.open(io.BytesIO(data)) as image:
+            source_format = _source_format(image)
+            image.load()
+            width, height = image.size
+            gray, box, scale = self.process(image)
+
+        # 4. 가장 작은 형식으로 인코딩
+        encoded, image_format = self.encode(gray)
+        if source_format in self.formats and len(data) <= len(encoded):
+            return PreparedImage(data, source_format, len(data), (0, 0, width, height), 1.0, (width, height))
+        return PreparedImage(encoded, image_format, len(data), box, scale, gray.size)
+
+# end of file
@@ -0,0 +1,101 @@
+"""
+OCR 이미지 이어붙이기 모듈입니다.
+
+여러 장의 목차 이미지를 세로로 이어붙인 이미지(composite) 하나로 OCR 요청하여 요청 수를 줄인다.
+(요청마다 드는 인증/TLS/API 대기열 시간이 한 번만 든다)
+    - 묶기   : 이어붙인 높이가 max_height 를 넘지 않도록 연속된 이미지끼리 묶는다. (한 장이 더 크면 혼자 묶음)
+    - 붙이기 : 이미지 사이에 gap 높이의 빈 띠를 넣어 다른 이미지의 글자가 한 줄로 합쳐지지 않게 한다.
+    - 나누기 : 응답의 필드를 boundingPoly 세로 중심 위치로 원래 이미지에 나누고, 좌표를 원래 이미지 기준으로 되돌린다.
+              필드 순서는 응답 순서를 유지하며, 이미지별 마지막 필드는 줄끝(lineBreak)으로 만든다.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+import copy
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+OCR_STITCH_MAX_HEIGHT = 4000  # 이어붙인 이미지의 최대 높이(px)
+OCR_STITCH_GAP = 64           # 이미지 사이 빈 띠 높이(px)
+
+
+@dataclass(frozen=True)
+class StitchSegment:
+    """이어붙인 이미지 안에서 원래 이미지 하나가 차지하는 세로 구간"""
+    top: int
+    height: int
+
+
+def plan_composites(heights: list[int], max_height: int = OCR_STITCH_MAX_HEIGHT,
+                    gap: int = OCR_STITCH_GAP) -> list[list[int]]:
+    """이미지 높이 목록을 이어붙일 묶음(연속된 인덱스 리스트)으로 나눈다."""
+    groups: list[list[int]] = []
+    height = 0
+    for index, image_height in enumerate(heights):
+        if groups and height + gap + image_height <= max_height:
+            groups[-1].append(index)
+            height += gap + image_height
+        else:
+            groups.append([index])
+            height = image_height
+    return groups
+
+
+def stitch_images(images: list['Image.Image'], gap: int = OCR_STITCH_GAP) -> tuple['Image.Image', list[StitchSegment]]:
+    """이미지들을 왼쪽 정렬로 세로로 이어붙인다. (빈 곳은 흰색)
+
+    Returns:
+        (이어붙인 이미지, 이미지별 세로 구간)
+    """
+    from PIL import Image  # 기본값 상수만 가져가는 모듈(outline_ocr)이 GUI 시작시 Pillow 를 import 하지 않도록
+
+    mode = 'L' if all(image.mode == 'L' for image in images) else 'RGB'
+    width = max(image.width for image in images)
+    height = sum(image.height for image in images) + gap * (len(images) - 1)
+    composite = Image.new(mode, (width, height), 'white')
+    segments = []
+    top = 0
+    for image in images:
+        composite.paste(image if image.mode == mode else image.convert(mode), (0, top))
+        segments.append(StitchSegment(top, image.height))
+        top += image.height + gap
+    return composite, segments
+
+
+def _field_center_y(field: dict) -> float:
+    vertices = field.get('boundingPoly', {}).get('vertices') or [{}]
+    return sum(vertex.get('y', 0) for vertex in vertices) / len(vertices)
+
+
+def split_result(ocr_result: dict, segments: list[StitchSegment]) -> list[dict]:
+    """이어붙인 이미지의 OCR 응답을 이미지별 응답({'images': [{'fields': [...]}]}) 리스트로 나눈다.
+
+    빈 띠에 걸친 필드는 가까운 이미지에 넣는다.
+    """
+    tops = [segment.top for segment in segments]
+    fields_by_segment: list[list[dict]] = [[] for _ in segments]
+    for image in ocr_result['images']:
+        for field in image['fields']:
+            y = _field_center_y(field)
+            index = max(0, bisect_right(tops, y) - 1)
+            segment = segments[index]
+            if y >= segment.top + segment.height and index + 1 < len(segments):
+                # 빈 띠 안 : 아래 이미지가 더 가까우면 아래 이미지
+                if segments[index + 1].top - y < y - (segment.top + segment.height):
+                    index += 1
+                    segment = segments[index]
+            field = copy.deepcopy(field)
+            for vertex in field.get('boundingPoly', {}).get('vertices', []):
+                vertex['y'] = vertex.get('y', 0) - segment.top
+            fields_by_segment[index].append(field)
+
+    results = []
+    for fields in fields_by_segment:
+        if fields:
+            fields[-1]['lineBreak'] = True  # 다음 이미지의 첫 글자와 한 줄로 합쳐지지 않도록
+        results.append({'images': [{'inferResult': 'SUCCESS', 'fields': fields}]})
+    return results
+
+# end of file
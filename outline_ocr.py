@@ -1,135 +1,268 @@
-import requests
-import uuid
-import time
-import json
 import re
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Callable
+from ocr_cache import OCR_CACHE_MAX_MB
+from ocr_stitch import OCR_STITCH_MAX_HEIGHT
 
+OCR_CONCURRENCY = 4   # 기본 동시 OCR 요청 수
+OCR_RATE_LIMIT = 0.0  # 기본 초당 최대 OCR 요청 수 (0 이면 제한 없음)
+OCR_MAX_RETRIES = 4   # 기본 429/5xx/시간초과 재시도 횟수
+OCR_TEXT_HEIGHT = 32    # 기본 업로드 전처리 글자 줄 높이(px)
 
-def run_ocr(secret_key: str, api_url: str, image_files: list, show_log: Callable[[str], None] = None) -> list:
-    secret_key = secret_key
-    api_url = api_url
-    image_files = image_files
 
-    headers = {
-        'X-OCR-SECRET': secret_key,
-    }
+def _log(show_log: Callable[[str], None] | None, message: str) -> None:
+    if show_log:
+        show_log(message)
+    else:
+        print(message)
 
+
+def parse_ocr_result(ocr_result: dict) -> list:
+    """OCR API 응답을 개요 라인 리스트로 변환한다. (페이지 번호 앞에는 \t)"""
     ocr_lines: list = []
 
-    # 처리 이미지 파일 개수만큼 순회
-    for i, image_file in enumerate(image_files):
-        if show_log:
-            show_log(f'OCR처리중 ({i+1}/{len(image_files)}) - "{os.path.basename(image_file)}"')
-        else:
-            print(f'OCR처리중 ({i+1}/{len(image_files)}) - "{os.path.basename(image_file)}"')
-
-        # CLOVA 요청 가이드 형식에 따름
-        # 참조 : https://api.ncloud-docs.com/docs/ai-application-service-ocr-example01
-        request_json = {
-            'version': 'V2',
-            'requestId': str(uuid.uuid4()),
-            'timestamp': int(round(time.time() * 1000)),
-            'lang': 'ko',
-            'images': [
-                {
-                    'format': 'png',
-                    'name': 'demo',
-                }
-            ],
-        }
-
-        payload = {'message': json.dumps(request_json).encode('UTF-8')}
-
-        try:
-            with open(image_file, 'rb') as f:
-                files = [
-                    ('file', f),
-                ]
-                response = requests.request("POST", api_url, headers=headers, data=payload, files=files)
-                response.raise_for_status()
-        except FileNotFoundError:
-            if show_log:
-                show_log(f"⚠️ 이미지 파일을 찾을 수 없습니다: {image_file}")
-            else:
-                print(f"⚠️ 이미지 파일을 찾을 수 없습니다: {image_file}")
-            continue
-        except requests.exceptions.ConnectionError:
-            if show_log:
-                show_log("⚠️ 네트워크 연결을 확인할 수 없습니다.")
-            else:
-                print("⚠️ 네트워크 연결을 확인할 수 없습니다.")
-            return ocr_lines
-        except requests.exceptions.RequestException as e:
-            if show_log:
-                show_log(f"❌ OCR API 요청 중 오류 발생: {e}")
+    # 응답값 ocr_result['images'] 가 배열로 들어온다고 가이드 되어 있지만,
+    # 하나의 값만 들어오고 배열로 들어오는 경우는 없는듯 하다.
+    for image in ocr_result['images']:
+        # noinspection PyRedeclaration
+        line_start = True
+        # noinspection PyRedeclaration
+        line = ''
+        for field in image['fields']:
+            text: str = field['inferText'].strip()  # 추출된 글자 (앞뒤 공백 제거)
+            line_break: bool = field['lineBreak']  # 라인끝 여부
+
+            # 페이지 번호인지 확인
+            # 1. 순수 숫자인 경우
+            # 2. 숫자+'p'로 끝나는 경우 (예: "123p")
+            # 3. 숫자+'페이지'로 끝나는 경우 (예: "123페이지")
+            is_page_number = False
+            if text.isdigit():  # 순수 숫자
+                text = int(text)  # "014" 와 같은 경우도 숫자로 변환 : "014" -> 4
+                is_page_number = True
             else:
-                print(f"❌ OCR API 요청 중 오류 발생: {e}")
-            return ocr_lines
-        
-        try:
-            ocr_result = response.json()
-        except json.JSONDecodeError:
-            if show_log:
-                show_log("❌ OCR API 응답을 처리할 수 없습니다.")
+                # 'p' 또는 '페이지'로 끝나는 경우 처리
+                for suffix in ['p', '페이지']:
+                    if text.endswith(suffix) and text[:-len(suffix)].isdigit():
+                        text = text[:-len(suffix)]  # 접미사 제거
+                        is_page_number = True
+                        break
+
+            # 텍스트 포맷팅 설정
+            # 필드값이 페이지값인지 여부에 따라 접두어로 \t를 붙인다.
+            if not line_start and line_break and is_page_number:
+                prefix = '\t'
+            elif not line_start:
+                prefix = ' '
             else:
-                print("❌ OCR API 응답을 처리할 수 없습니다.")
-            continue
+                prefix = ''
 
-        # print(json.dumps(ocr_result, indent=2))
-
-        # 응답값 ocr_result['images'] 가 배열로 들어온다고 가이드 되어 있지만,
-        # 하나의 값만 들어오고 배열로 들어오는 경우는 없는듯 하다.
-        for image in ocr_result['images']:
-            # noinspection PyRedeclaration
-            line_start = True
-            # noinspection PyRedeclaration
-            line = ''
-            for field in image['fields']:
-                text: str = field['inferText'].strip()  # 추출된 글자 (앞뒤 공백 제거)
-                line_break: bool = field['lineBreak']  # 라인끝 여부
-
-                # 페이지 번호인지 확인
-                # 1. 순수 숫자인 경우
-                # 2. 숫자+'p'로 끝나는 경우 (예: "123p")
-                # 3. 숫자+'페이지'로 끝나는 경우 (예: "123페이지")
-                is_page_number = False
-                if text.isdigit():  # 순수 숫자
-                    text = int(text)  # "014" 와 같은 경우도 숫자로 변환 : "014" -> 4
-                    is_page_number = True
-                else:
-                    # 'p' 또는 '페이지'로 끝나는 경우 처리
-                    for suffix in ['p', '페이지']:
-                        if text.endswith(suffix) and text[:-len(suffix)].isdigit():
-                            text = text[:-len(suffix)]  # 접미사 제거
-                            is_page_number = True
-                            break
-
-                # 텍스트 포맷팅 설정
-                # 필드값이 페이지값인지 여부에 따라 접두어로 \t를 붙인다.
-                if not line_start and line_break and is_page_number:
-                    prefix = '\t'
-                elif not line_start:
-                    prefix = ' '
-                else:
-                    prefix = ''
+            line += f'{prefix}{text}'
 
-                line += f'{prefix}{text}'
+            # 다음 라인 처리 설정
+            line_start = line_break
 
-                # 다음 라인 처리 설정
-                line_start = line_break
+            # 라인끝 처리
+            if line_break:
+                if line.strip():  # 빈 라인 제외
+                    ocr_lines.append(line)
+                line = ''
+    return ocr_lines
 
-                # 라인끝 처리
-                if line_break:
-                    if line.strip():  # 빈 라인 제외
-                        ocr_lines.append(line)
-                    line = ''
-    if show_log:
-        show_log(f'OCR처리완료! 총 {len(image_files)}건 \n\n')
-    else:
-        print(f'OCR처리완료! 총 {len(image_files)}건 \n\n')
+
+def run_ocr(secret_key: str, api_url: str, image_files: list, show_log: Callable[[str], None] = None,
+            concurrency: int = OCR_CONCURRENCY, rate_limit: float = OCR_RATE_LIMIT,
+            max_retries: int = OCR_MAX_RETRIES, use_cache: bool = True, cache_dir: str = '',
+            cache_max_mb: int = OCR_CACHE_MAX_MB, preprocess: bool = True,
+            text_height: int = OCR_TEXT_HEIGHT, stitch: bool = False,
+            stitch_max_height: int = OCR_STITCH_MAX_HEIGHT) -> list:
+    """이미지들을 OCR 하여 개요 라인 리스트를 반환한다.
+
+    최대 concurrency 개의 요청을 동시에 보내고(연결은 keep-alive 세션으로 재사용),
+    결과는 image_files 순서대로 합친다. 진행 로그는 이미지 하나가 끝날 때마다 출력한다.
+    요청은 초당 rate_limit 건 이하로 보내고, 429/5xx/시간초과는 max_retries 번까지 다시 요청한다. (ocr_client 참조)
+    use_cache 면 응답을 cache_dir(빈 문자열이면 기본 폴더)에 저장해 두고, 같은 이미지는 API 를 호출하지 않는다. (ocr_cache 참조)
+    내용이 같은 이미지가 여러 개면 한 번만 요청한다.
+    preprocess 면 여백 제거/흑백/축소(글자 줄 높이 text_height)/재인코딩으로 업로드 크기를 줄인다. (ocr_preprocess 참조)
+    stitch 면 연속된 이미지를 높이 stitch_max_height 이하로 이어붙여 한 번에 요청하고,
+    필드 위치로 원래 이미지에 나눈다. (ocr_stitch 참조. 캐시는 이미지별로, 한 장씩 요청한 응답과 따로 저장한다)
+    재시도 후에도 네트워크/API 오류가 나면 남은 요청을 취소하고, 오류가 난 이미지 앞까지의 결과만 반환한다.
+    """
+    import requests  # 프로그램 시작 시간을 줄이기 위해 OCR 실행시 import
+    from ocr_client import OcrClient
+    from ocr_cache import OcrCache
+    from ocr_preprocess import OcrPreprocessor
+    from ocr_stitch import OCR_STITCH_GAP, plan_composites, split_result, stitch_images
+    from PIL import Image
+
+    concurrency = max(1, min(int(concurrency), len(image_files) or 1))
+    total = len(image_files)
+
+    results: list[list | None] = [None] * total  # 이미지 순서대로의 라인 리스트
+    failed = False  # 네트워크/API 오류로 중단했는지 여부
+    done = 0
+    cache_hits = 0
+    original_bytes = 0  # 요청한 이미지의 원본 크기 합
+    prepared_bytes = 0  # 전처리 후 크기 합
+    preprocessor = OcrPreprocessor(int(text_height)) if preprocess else None
+
+    with OcrClient(secret_key, api_url, concurrency=concurrency, rate=float(rate_limit),
+                   max_retries=int(max_retries)) as client:
+        cache = None
+        if use_cache:
+            try:
+                cache = OcrCache(cache_dir, int(cache_max_mb) * 1024 * 1024)
+            except OSError as e:
+                _log(show_log, f"⚠️ OCR 캐시 폴더를 사용할 수 없습니다: {e}")
+
+        # 캐시 키(이미지 내용 + 요청 파라미터)별로 묶는다. 같은 키의 이미지는 한 번만 요청한다.
+        if preprocessor:
+            params = {**client.request_params('auto'), 'preprocess': preprocessor.params}
+        else:
+            params = client.request_params()
+        if stitch:
+            # 이어붙여 요청한 응답은 나누고 좌표를 옮기고 줄끝을 넣은 결과이므로 한 장씩 요청한 응답과 따로 저장한다.
+            params = {**params, 'stitch': True, 'stitch_gap': OCR_STITCH_GAP}
+
+        pending: dict[str, tuple[bytes, list[int]]] = {}  # 요청할 키 -> (이미지 데이터, 이미지 인덱스들)
+        hit_lines: dict[str, list] = {}  # 캐시에 있던 키 -> 라인 리스트
+        for i, image_file in enumerate(image_files):
+            try:
+                with open(image_file, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                _log(show_log, f"⚠️ 이미지 파일을 찾을 수 없습니다: {image_file}")
+                results[i] = []
+                done += 1
+                continue
+            key = OcrCache.make_key(data, params)
+            if key in pending:
+                pending[key][1].append(i)
+                continue
+            if key not in hit_lines:
+                ocr_result = cache.get(key) if cache else None
+                if ocr_result is None:
+                    pending[key] = (data, [i])
+                    continue
+                hit_lines[key] = parse_ocr_result(ocr_result)
+            results[i] = list(hit_lines[key])
+            done += 1
+            cache_hits += 1
+            _log(show_log, f'OCR캐시 사용 ({done}/{total}) - "{os.path.basename(image_file)}"')
+
+        def ocr_task(key: str) -> tuple[dict[str, dict], int]:
+            """(워커 쓰레드) 이미지 하나를 전처리 후 요청한다. Returns: ({키: 응답 JSON}, 업로드 크기)"""
+            data = pending[key][0]
+            if preprocessor:
+                try:
+                    prepared = preprocessor.prepare(data)
+                except OSError:
+                    pass  # 이미지로 읽을 수 없으면 원본 그대로 보낸다.
+                else:
+                    return {key: client.ocr_bytes(prepared.data, prepared.format)}, len(prepared.data)
+            return {key: client.ocr_bytes(data)}, len(data)
+
+        def load_task(key: str) -> 'Image.Image | None':
+            """(워커 쓰레드) 이어붙일 이미지를 읽어 전처리한다. 이미지로 읽을 수 없으면 None"""
+            try:
+                with Image.open(io.BytesIO(pending[key][0])) as image:
+                    image.load()
+                    return preprocessor.process(image)[0] if preprocessor else image.convert('RGB')
+            except OSError:
+                return None
+
+        def stitch_task(keys: list[str], images: list['Image.Image']) -> tuple[dict[str, dict], int]:
+            """(워커 쓰레드) 이미지들을 이어붙여 한 번에 요청하고 응답을 이미지별로 나눈다."""
+            composite, segments = stitch_images(images)
+            if preprocessor:
+                data, image_format = preprocessor.encode(composite)
+            else:
+                buffer = io.BytesIO()
+                composite.save(buffer, 'PNG')
+                data, image_format = buffer.getvalue(), 'png'
+            ocr_result = client.ocr_bytes(data, image_format)
+            return dict(zip(keys, split_result(ocr_result, segments))), len(data)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {}  # future -> 요청에 포함된 키들
+            keys = list(pending)
+            if stitch and len(keys) > 1:
+                # 전처리한 이미지 높이로 이어붙일 묶음을 정한다. (이미지 순서대로 연속된 것끼리)
+                images = list(executor.map(load_task, keys))
+                for key in [key for key, image in zip(keys, images) if image is None]:
+                    futures[executor.submit(ocr_task, key)] = [key]
+                loaded = [(key, image) for key, image in zip(keys, images) if image is not None]
+                for group in plan_composites([image.height for _, image in loaded], int(stitch_max_height)):
+                    group_keys = [loaded[j][0] for j in group]
+                    futures[executor.submit(stitch_task, group_keys, [loaded[j][1] for j in group])] = group_keys
+                _log(show_log, f'이미지 {len(keys)}장을 {len(futures)}번의 요청으로 묶었습니다.')
+            else:
+                for key in keys:
+                    futures[executor.submit(ocr_task, key)] = [key]
+
+            # 완료되는 순서대로 처리
+            for future in as_completed(futures):
+                group_keys = futures[future]
+                try:
+                    key_results, upload_size = future.result()
+                except ValueError:  # 응답 JSON 오류 (requests 의 JSONDecodeError 도 ValueError)
+                    _log(show_log, "❌ OCR API 응답을 처리할 수 없습니다.")
+                    for key in group_keys:
+                        for i in pending[key][1]:
+                            results[i] = []
+                        done += len(pending[key][1])
+                    continue
+                except requests.exceptions.ConnectionError:
+                    _log(show_log, "⚠️ 네트워크 연결을 확인할 수 없습니다.")
+                    failed = True
+                    break
+                except requests.exceptions.RequestException as e:
+                    _log(show_log, f"❌ OCR API 요청 중 오류 발생: {e}")
+                    failed = True
+                    break
+
+                prepared_bytes += upload_size
+                for key in group_keys:
+                    ocr_result = key_results[key]
+                    data, indexes = pending[key]
+                    original_bytes += len(data)
+                    lines = parse_ocr_result(ocr_result)
+                    if cache:
+                        try:
+                            cache.put(key, ocr_result)
+                        except OSError:
+                            pass  # 캐시 저장 실패는 OCR 결과에 영향이 없으므로 무시
+                    for i in indexes:
+                        results[i] = list(lines)
+                    done += len(indexes)
+                    same = f' 외 같은 이미지 {len(indexes) - 1}건' if len(indexes) > 1 else ''
+                    _log(show_log, f'OCR처리중 ({done}/{total}) - "{os.path.basename(image_files[indexes[0]])}"{same}')
+
+            if failed:
+                # 아직 시작하지 않은 요청은 취소한다. (진행중인 요청은 끝날 때까지 기다린다)
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    # 같은 이미지 : 요청한 이미지와 캐시에서 가져온 이미지 중 앞 이미지와 키가 같은 것
+    duplicates = sum(len(indexes) - 1 for _, indexes in pending.values()) + cache_hits - len(hit_lines)
+    cache_summary = f'캐시 적중 {cache.hits} / 미적중 {cache.misses}' if cache else '캐시 사용 안 함'
+    _log(show_log, f'OCR 요청 통계: {client.stats.summary()}, {cache_summary}, 같은 이미지 {duplicates}건')
+    if preprocessor and original_bytes:
+        _log(show_log, f'업로드 전처리: {original_bytes / (1024 * 1024):.2f}MB -> {prepared_bytes / (1024 * 1024):.2f}MB '
+                       f'({(1 - prepared_bytes / original_bytes) * 100:.0f}% 감소)')
+
+    # 이미지 순서대로 합친다. 오류가 났거나 처리되지 않은 이미지를 만나면 거기서 멈춘다.
+    # (뒤 이미지의 결과가 있더라도 중간이 빠진 개요가 되지 않도록 버린다)
+    ocr_lines: list = []
+    for lines in results:
+        if lines is None:
+            break
+        ocr_lines.extend(lines)
+
+    if not failed:
+        _log(show_log, f'OCR처리완료! 총 {len(image_files)}건 \n\n')
     return ocr_lines
 
 
@@ -0,0 +1,108 @@
+"""
+PDF 취합 단계의 빈 페이지 / 중복 페이지 필터 모듈입니다.
+
+    - 빈 페이지    : 바탕색(중앙값 밝기)과 ink_threshold 이상 차이 나는 잉크 픽셀 비율이 blank_coverage 이하인 페이지
+    - 중복 페이지  : 파일 내용이 같은 페이지(identical, 위치 무관) 또는
+                     바로 앞 페이지와 dHash 해밍거리가 hash_distance 이하인 페이지(similar, 페이지 넘김이 늦어 같은 화면을 두번 캡쳐한 경우)
+찾은 페이지는 'drop' 이면 PDF 에서 빼고, 'share' 이면 앞서 기록한 페이지의 이미지 XObject 를 다시 참조하는 페이지로 넣는다.
+('share' 는 페이지 수(=개요의 페이지 번호)가 그대로 유지되고 이미지 데이터는 한 번만 기록된다)
+"""
+
+from dataclasses import dataclass
+import hashlib
+import numpy as np
+from PIL import Image
+
+from page_hash import dhash, hamming
+
+FILTER_ACTIONS = ('keep', 'drop', 'share')
+
+
+@dataclass(frozen=True)
+class PageDecision:
+    """페이지 한 장에 대한 필터 결과"""
+    action: str              # 'keep', 'drop', 'share'
+    reason: str = ''         # 'blank', 'identical', 'similar'
+    source: str | None = None  # action 이 'share' 일 때 이미지를 공유할 (먼저 기록된) 페이지 파일 경로
+
+
+def ink_coverage(image: Image.Image, ink_threshold: int = 48, max_side: int = 1024) -> float:
+    """페이지에서 잉크 픽셀이 차지하는 비율 (0~1)
+
+    바탕색은 밝기 중앙값으로 잡는다. 긴 변이 max_side 이하가 되도록 줄여서 계산한다.
+    """
+    gray = image.convert('L')
+    step = max(1, -(-max(gray.size) // max_side))
+    if step > 1:
+        gray = gray.reduce(step)
+    pixels = np.asarray(gray, dtype=np.int16)
+    paper = int(np.median(pixels))
+    return float(np.count_nonzero(np.abs(pixels - paper) > ink_threshold)) / pixels.size
+
+
+def file_digest(path: str) -> str:
+    """파일 내용의 sha256 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PageFilter:
+    """페이지를 순서대로 check() 하여 빼거나 공유할 페이지를 고른다.
+
+    Args:
+        blank: 빈 페이지 처리 ('keep', 'drop', 'share'). 'share' 면 모든 빈 페이지가 첫 빈 페이지 이미지를 공유한다.
+        duplicates: 중복 페이지 처리 ('keep', 'drop', 'share')
+        blank_coverage: 빈 페이지로 볼 최대 잉크 비율
+        ink_threshold: 잉크로 볼 바탕색과의 밝기 차이
+        hash_distance: 앞 페이지와 같은 페이지로 볼 최대 dHash 해밍거리 (음수면 파일 내용이 같은 경우만 중복)
+    """
+
+    def __init__(self, blank: str = 'keep', duplicates: str = 'keep', *, blank_coverage: float = 0.0005,
+                 ink_threshold: int = 48, hash_distance: int = 2):
+        for name, value in (('blank', blank), ('duplicates', duplicates)):
+            if value not in FILTER_ACTIONS:
+                raise ValueError(f"{name} 값이 잘못되었습니다: {value} (가능한 값: {', '.join(FILTER_ACTIONS)})")
+        self.blank = blank
+        self.duplicates = duplicates
+        self.blank_coverage = blank_coverage
+        self.ink_threshold = ink_threshold
+        self.hash_distance = hash_distance
+        self._digests: dict[str, str] = {}  # 파일 해시 -> 처음 기록된 페이지 경로
+        self._prev_hash: int | None = None
+        self._prev_source: str | None = None
+        self._blank_source: str | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.blank != 'keep' or self.duplicates != 'keep'
+
+    def check(self, path: str) -> PageDecision:
+        """페이지 파일을 검사한다. 'keep' 인 페이지만 이후 페이지의 공유 대상(source)이 된다."""
+        digest = file_digest(path) if self.duplicates != 'keep' else None
+        if digest in self._digests:
+            return PageDecision(self.duplicates, 'identical', self._digests[digest])
+
+        with Image.open(path) as image:
+            # 빈 페이지는 중복 검사에서 제외한다. (연속된 빈 페이지는 blank 설정을 따른다)
+            if ink_coverage(image, self.ink_threshold) <= self.blank_coverage:
+                self._prev_hash = None
+                if self.blank == 'share' and self._blank_source is None:
+                    self._blank_source = path
+                    return PageDecision('keep')
+                return PageDecision(self.blank, 'blank', self._blank_source)
+            page_hash = dhash(image) if self.duplicates != 'keep' and self.hash_distance >= 0 else None
+
+        if (page_hash is not None and self._prev_hash is not None
+                and hamming(page_hash, self._prev_hash) <= self.hash_distance):
+            return PageDecision(self.duplicates, 'similar', self._prev_source)
+
+        if digest is not None:
+            self._digests[digest] = path
+        self._prev_hash = page_hash
+        self._prev_source = path
+        return PageDecision('keep')
+
+# end of file
@@ -0,0 +1,36 @@
+"""
+페이지 이미지의 perceptual hash 모듈입니다.
+
+difference hash(dHash) 를 사용한다. 이미지를 흑백으로 (hash_size + 1) x hash_size 크기로 축소한 뒤
+좌우로 이웃한 픽셀의 밝기 비교 결과를 비트로 모은다.
+같은 페이지를 다시 캡쳐한 경우(안티앨리어싱, 커서 깜빡임 정도의 차이) 해밍거리가 거의 0에 가깝다.
+"""
+
+from PIL import Image
+
+
+def dhash(image: Image.Image, hash_size: int = 16) -> int:
+    """이미지의 difference hash 를 계산한다.
+
+    Args:
+        image: 대상 이미지
+        hash_size: 해시 한 변의 크기. 비트 수는 hash_size * hash_size
+
+    Returns:
+        해시값 (정수)
+    """
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """두 해시값의 해밍거리(다른 비트 수)를 반환한다."""
+    return bin(a ^ b).count('1')
+
+# end of file
@@ -0,0 +1,125 @@
+"""
+PDF 페이지 인코딩 프로파일 모듈입니다.
+
+캡쳐한 페이지의 대부분은 흰 바탕의 검은 글자이므로 24비트 RGB 로 넣으면 용량이 크게 낭비된다.
+페이지마다 색상 비율을 검사하여 컬러 그림이 있는 페이지는 RGB 를 유지하고, 글자 페이지만 프로파일에 맞게 줄인다.
+
+프로파일
+    - rgb     : 항상 24비트 RGB (무손실, 기존 동작)
+    - gray    : 8비트 흑백 (무손실 Flate)
+    - palette : 16색 적응형 팔레트, 4비트 (흑백 페이지이므로 사실상 16단계 흑백)
+    - bilevel : 1비트 흑백, CCITT G4
+    - jpeg    : JPEG (글자 페이지는 흑백 JPEG)
+    - auto    : 글자 페이지 중 회색 픽셀(안티앨리어싱)이 거의 없으면 bilevel, 그 외는 palette
+
+GUI 는 시작할 때 PROFILES 만 사용하므로 numpy/Pillow 는 검사/변환할 때 import 한다. (프로그램 시작 시간 단축)
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+
+PROFILES = ('rgb', 'gray', 'palette', 'bilevel', 'jpeg', 'auto')
+
+
+@dataclass(frozen=True)
+class PageEncoding:
+    """페이지에 적용할 인코딩"""
+    mode: str      # 변환할 이미지 모드 ('RGB', 'L', 'P', '1')
+    encoding: str  # StreamingPdfWriter.add_image 의 encoding ('flate', 'jpeg', 'ccitt')
+
+    @property
+    def label(self) -> str:
+        return {'flate': {'RGB': 'rgb', 'L': 'gray', 'P': 'palette'}.get(self.mode, 'flate'),
+                'jpeg': 'jpeg-rgb' if self.mode == 'RGB' else 'jpeg-gray',
+                'ccitt': 'bilevel'}[self.encoding]
+
+
+RGB_ENCODING = PageEncoding('RGB', 'flate')
+
+
+def _thumbnail_array(image: 'Image.Image', max_side: int) -> 'np.ndarray':
+    """검사용으로 축소한 RGB 배열 (작은 컬러 그림도 놓치지 않도록 너무 작게 줄이지 않는다)"""
+    import numpy as np
+    from PIL import Image
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    scale = max(image.width, image.height) / max_side
+    if scale > 1:
+        image = image.resize((max(1, round(image.width / scale)), max(1, round(image.height / scale))),
+                             Image.Resampling.NEAREST)
+    return np.asarray(image, dtype=np.int16)
+
+
+def colour_ratio(image: 'Image.Image', chroma_threshold: int = 60, max_side: int = 512) -> float:
+    """채도(max(R,G,B) - min(R,G,B))가 chroma_threshold 를 넘는 픽셀의 비율을 반환한다.
+
+    흰/세피아 바탕의 글자 페이지는 0에 가깝고, 컬러 그림이 있는 페이지는 그림 면적만큼 커진다.
+    """
+    import numpy as np
+    if image.mode in ('1', 'L', 'LA', 'I', 'F'):
+        return 0.0
+    pixels = _thumbnail_array(image, max_side)
+    chroma = pixels.max(axis=2) - pixels.min(axis=2)
+    return float(np.count_nonzero(chroma > chroma_threshold)) / chroma.size
+
+
+def midtone_ratio(image: 'Image.Image', low: int = 64, high: int = 192, max_side: int = 1024) -> float:
+    """밝기가 low ~ high 사이인 회색 픽셀의 비율을 반환한다. (작을수록 1비트로 바꿔도 손실이 적다)"""
+    import numpy as np
+    gray = np.asarray(image.convert('L'), dtype=np.uint8)
+    step = max(1, max(gray.shape) // max_side)
+    gray = gray[::step, ::step]
+    return float(np.count_nonzero((gray > low) & (gray < high))) / gray.size
+
+
+def choose_encoding(image: 'Image.Image', profile: str, colour_threshold: float = 0.002,
+                    bilevel_threshold: float = 0.02) -> PageEncoding:
+    """페이지 이미지에 적용할 인코딩을 고른다. 컬러 페이지는 jpeg 프로파일이 아니면 항상 RGB 를 유지한다.
+
+    Args:
+        image: 페이지 이미지
+        profile: PROFILES 중 하나
+        colour_threshold: 컬러 페이지로 판단할 컬러 픽셀 비율
+        bilevel_threshold: auto 프로파일에서 1비트로 판단할 회색 픽셀 비율
+
+    Returns:
+        PageEncoding
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"지원하지 않는 프로파일입니다: {profile} (가능한 값: {', '.join(PROFILES)})")
+    if profile == 'rgb':
+        return RGB_ENCODING
+
+    colourful = colour_ratio(image) > colour_threshold
+    if profile == 'jpeg':
+        return PageEncoding('RGB' if colourful else 'L', 'jpeg')
+    if colourful:
+        return RGB_ENCODING
+    if profile == 'gray':
+        return PageEncoding('L', 'flate')
+    if profile == 'palette':
+        return PageEncoding('P', 'flate')
+    if profile == 'bilevel' or midtone_ratio(image) <= bilevel_threshold:
+        return PageEncoding('1', 'ccitt')
+    return PageEncoding('P', 'flate')
+
+
+def convert_for_encoding(image: 'Image.Image', page_encoding: PageEncoding) -> 'Image.Image':
+    """이미지를 인코딩에 맞는 모드로 변환한다."""
+    from PIL import Image
+    mode = page_encoding.mode
+    if image.mode == mode:
+        return image
+    if mode == 'P':
+        # 적응형 16색 팔레트. 흑백 페이지는 팔레트도 회색 16단계가 된다.
+        source = image if image.mode in ('L', 'RGB') else image.convert('RGB')
+        return source.quantize(colors=16, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+    if mode == '1':
+        return image.convert('L').convert('1', dither=Image.Dither.NONE)
+    return image.convert(mode)
+
+# end of file
@@ -0,0 +1,125 @@
+"""
+캡쳐 후 페이지 좌우 정렬(registration) 모듈입니다.
+
+diff_width 는 오른쪽 페이지를 고정 픽셀만큼 옮기는 수동 보정값이라 잘못 잡으면 다시 캡쳐해야 한다.
+이 모듈은 캡쳐가 끝난 뒤 페이지마다
+    1. 열 투영(column profile): 열마다 바탕색과 다른 정도(잉크량)의 합
+    2. 기준 프로파일과의 교차상관(FFT, 전체 페이지를 한번에 벡터 연산)으로 가로 이동량 추정
+을 구하고, 모든 페이지를 공통 영역으로 잘라 글자 줄의 좌우 위치를 맞춘다.
+기준 프로파일은 가운데 페이지로 1차 추정한 뒤, 정렬된 프로파일들의 중앙값으로 한번 더 추정한다.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+from PIL import Image
+
+ALIGNED_DIR_NAME = '_aligned'
+
+
+@dataclass
+class RegistrationResult:
+    """정렬 결과"""
+    offsets: list[int]                  # 페이지별 가로 이동량(px). 기준 페이지보다 컨텐츠가 오른쪽에 있으면 양수
+    scores: list[float]                 # 페이지별 정규화 상관계수 (낮으면 추정을 믿기 어렵다)
+    box_width: int                      # 공통 영역 폭
+    output_paths: list[str]             # 정렬된 페이지 파일 경로 (입력 순서)
+
+
+def column_profile(path: str, row_step: int = 4) -> np.ndarray:
+    """페이지 이미지의 열 투영을 계산한다. (row_step 행마다 샘플링)"""
+    with Image.open(path) as image:
+        gray = np.asarray(image.convert('L'), dtype=np.int16)[::row_step]
+    background = int(np.median(gray))
+    return np.abs(gray - background).sum(axis=0, dtype=np.float32)
+
+
+def estimate_offsets(profiles: list[np.ndarray], reference: np.ndarray,
+                     max_shift: int) -> tuple[np.ndarray, np.ndarray]:
+    """프로파일들을 기준 프로파일과 교차상관하여 가로 이동량을 추정한다.
+
+    Returns:
+        (이동량 배열, 정규화 상관계수 배열)
+    """
+    width = max(max(len(p) for p in profiles), len(reference))
+    n = 1 << (2 * width - 1).bit_length()
+    matrix = np.zeros((len(profiles), width), dtype=np.float32)
+    for row, profile in enumerate(profiles):
+        matrix[row, :len(profile)] = profile - profile.mean()
+    ref = np.zeros(width, dtype=np.float32)
+    ref[:len(reference)] = reference - reference.mean()
+
+    # corr[k] = sum_x p[x + k] * ref[x]  (k < 0 은 뒤쪽에 순환되어 있다)
+    corr = np.fft.irfft(np.fft.rfft(matrix, n, axis=1) * np.conj(np.fft.rfft(ref, n)), n, axis=1)
+    lags = np.concatenate((np.arange(0, max_shift + 1), np.arange(-max_shift, 0)))
+    window = np.concatenate((corr[:, :max_shift + 1], corr[:, n - max_shift:]), axis=1)
+    best = window.argmax(axis=1)
+
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(ref)
+    scores = np.divide(window[np.arange(len(profiles)), best], norms,
+                       out=np.zeros(len(profiles), dtype=np.float64), where=norms > 0)
+    return lags[best], scores
+
+
+def _crop_page(args: tuple[str, str, tuple[int, int, int, int]]) -> str:
+    src, dst, box = args
+    with Image.open(src) as image:
+        image.crop(box).save(dst)
+    return dst
+
+
+def register_pages(paths: list[str], output_dir: str | None = None, *, max_shift: int = 200,
+                   min_score: float = 0.3, workers: int | None = None) -> RegistrationResult:
+    """페이지들의 가로 위치를 맞춰 공통 영역으로 잘라 저장한다.
+
+    Args:
+        paths: 페이지 이미지 경로 (페이지 순서)
+        output_dir: 정렬된 페이지를 저장할 디렉토리. 없으면 첫 페이지 디렉토리의 '_aligned'
+        max_shift: 탐색할 최대 이동량(px). 페이지 폭의 1/4 을 넘지 않는다.
+        min_score: 이 값보다 상관계수가 낮은 페이지(빈 페이지, 그림 페이지 등)는
+                   같은 쪽(홀/짝) 페이지들의 이동량 중앙값을 대신 사용한다.
+        workers: 프로세스 수. None이면 CPU 코어 수
+
+    Returns:
+        RegistrationResult
+    """
+    if not paths:
+        raise ValueError("정렬할 페이지가 없습니다.")
+    output_dir = output_dir or os.path.join(os.path.dirname(paths[0]), ALIGNED_DIR_NAME)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        profiles = list(executor.map(column_profile, paths, chunksize=chunksize))
+
+        widths = np.array([len(p) for p in profiles])
+        max_shift = max(1, min(max_shift, int(widths.min()) // 4))
+        offsets, scores = estimate_offsets(profiles, profiles[len(profiles) // 2], max_shift)
+
+        # 정렬된 프로파일들의 중앙값을 기준으로 다시 추정 (특정 기준 페이지에 치우치지 않도록)
+        aligned = np.stack([np.roll(np.pad(p, (0, widths.max() - len(p))), -offset)
+                            for p, offset in zip(profiles, offsets)])
+        offsets, scores = estimate_offsets(profiles, np.median(aligned, axis=0), max_shift)
+
+        # 추정을 믿기 어려운 페이지는 같은 쪽 페이지들의 중앙값으로 대체
+        for parity in (0, 1):
+            same_side = np.arange(parity, len(profiles), 2)
+            confident = same_side[scores[same_side] >= min_score]
+            fallback = int(np.median(offsets[confident])) if confident.size else 0
+            offsets[same_side[scores[same_side] < min_score]] = fallback
+
+        # 페이지 i 의 컨텐츠가 offset_i 만큼 오른쪽에 있으므로 (offset_i - 최소 이동량) 부터 잘라낸다.
+        starts = offsets - offsets.min()
+        box_width = int((widths - starts).min())
+        jobs = []
+        for path, start in zip(paths, starts):
+            with Image.open(path) as image:
+                height = image.height
+            jobs.append((path, os.path.join(output_dir, os.path.basename(path)),
+                         (int(start), 0, int(start) + box_width, height)))
+        output_paths = list(executor.map(_crop_page, jobs, chunksize=chunksize))
+
+    return RegistrationResult([int(o) for o in offsets], [float(s) for s in scores], box_width, output_paths)
+
+# end of file
@@ -0,0 +1,82 @@
+"""
+페이지 렌더링 완료(settle) 감지 모듈입니다.
+
+페이지 넘김 키를 누른 뒤 고정 시간을 기다리는 대신, 캡쳐 영역을 성기게 샘플링한 체크섬을
+반복 측정하여 페이지가 이전 프레임과 달라지고 N회 연속 같은 값을 유지하면 렌더링이 끝난 것으로 본다.
+automation_delay 는 최대 대기시간(timeout) 으로만 사용한다.
+"""
+
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable
+from PIL import Image
+
+
+@dataclass
+class SettleResult:
+    """렌더링 대기 결과"""
+    image: Image.Image  # 마지막으로 캡쳐한 프레임 (렌더링이 끝났다면 그대로 페이지 캡쳐로 사용)
+    checksum: int       # image 의 체크섬
+    elapsed: float      # 키 입력 이후 대기한 시간(초)
+    samples: int        # 캡쳐한 횟수
+    changed: bool       # 이전 프레임과 달라졌는지 여부
+    timed_out: bool     # 최대 대기시간을 넘겼는지 여부
+
+
+def region_checksum(image: Image.Image, step: int = 8) -> int:
+    """이미지를 step 픽셀 간격으로 성기게 샘플링하여 체크섬을 계산한다.
+
+    Args:
+        image: 대상 이미지
+        step: 샘플링 간격(px). 클수록 빠르지만 작은 변화를 놓칠 수 있다.
+
+    Returns:
+        adler32 체크섬
+    """
+    width, height = image.size
+    sample = image.resize((max(1, width // step), max(1, height // step)), Image.Resampling.NEAREST)
+    return zlib.adler32(sample.tobytes())
+
+
+def wait_for_settle(grab: Callable[[], Image.Image], prev_checksum: int | None,
+                    timeout: float, stable_samples: int = 3,
+                    interval: float = 0.02, step: int = 8) -> SettleResult:
+    """페이지가 이전 프레임과 달라진 뒤 stable_samples 회 연속 같은 체크섬을 유지할 때까지 대기한다.
+
+    Args:
+        grab: 캡쳐 영역을 캡쳐하는 함수
+        prev_checksum: 키 입력 전 프레임의 체크섬 (None이면 변화 여부를 따지지 않는다)
+        timeout: 최대 대기시간(초). 넘기면 마지막 프레임을 그대로 돌려준다.
+        stable_samples: 렌더링 완료로 판단할 연속 동일 샘플 수
+        interval: 샘플링 간격(초)
+        step: 체크섬 샘플링 간격(px)
+
+    Returns:
+        SettleResult
+    """
+    start = time.perf_counter()
+    last_checksum = None
+    stable = 0
+    samples = 0
+    changed = prev_checksum is None
+
+    while True:
+        image = grab()
+        checksum = region_checksum(image, step)
+        samples += 1
+        elapsed = time.perf_counter() - start
+
+        if checksum != prev_checksum:
+            changed = True
+        if changed:
+            stable = stable + 1 if checksum == last_checksum else 1
+            if stable >= stable_samples:
+                return SettleResult(image, checksum, elapsed, samples, True, False)
+        last_checksum = checksum
+
+        if elapsed >= timeout:
+            return SettleResult(image, checksum, elapsed, samples, changed, True)
+        time.sleep(interval)
+
+# end of file
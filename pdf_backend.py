@@ -0,0 +1,249 @@
+"""
+PDF 백엔드 모듈입니다.
+
+PDF 를 다루는 두 작업의 구현을 교체할 수 있도록 공통 인터페이스를 제공한다.
+    - 이미지로 PDF 만들기 : create_writer() 로 받은 작성기에 add_png/add_image -> add_page -> close
+    - 개요(북마크) 적용   : set_outline()
+백엔드
+    - stream  : StreamingPdfWriter(PNG 패스스루, 체크포인트) 로 생성하고 개요는 증분 업데이트로 덧붙인다. (기본값)
+    - pypdf2  : PyPDF2 로 모든 페이지를 새 파일에 복사하며 개요를 적용한다. (기존 방식, 원본은 _BAK_ 사본) 개요만 지원
+    - pikepdf : qpdf(pikepdf) 로 생성/개요 적용. 저장할 때까지 모든 이미지 데이터를 메모리에 들고 있다. pikepdf 패키지 필요
+                다시 캡쳐한 페이지 교체(splice_pdf)와 증분 업데이트 개요가 그대로 동작하도록
+                객체 스트림(xref stream)을 만들지 않고 xref 테이블 형식으로 저장한다.
+호스트마다 빠른 백엔드가 다를 수 있으므로 bench_pdf_backend.py 로 비교해서 고른다.
+"""
+
+import os
+from typing import Iterable
+from PIL import Image
+
+from pdf_writer import ImageRef, PdfObjectWriter, StreamingPdfWriter, append_outline
+
+OutlineItems = Iterable[tuple[int, str, int]]  # (깊이(0부터), 제목, 페이지 인덱스(0부터))
+
+
+class PdfBackend:
+    """PDF 백엔드의 기본 클래스"""
+
+    name = ''
+
+    def create_writer(self, path: str, checkpoint_every: int = 0):
+        """이미지로 PDF 를 만드는 작성기를 생성한다. (StreamingPdfWriter 와 같은 add_png/add_image/add_page/close)
+
+        Args:
+            path: 생성할 PDF 파일 경로
+            checkpoint_every: N페이지마다 중간 결과를 기록한다. (지원하지 않는 백엔드는 무시)
+        """
+        raise NotImplementedError(f"{self.name} 백엔드는 PDF 생성을 지원하지 않습니다.")
+
+    def set_outline(self, path: str, items: OutlineItems) -> None:
+        """PDF 의 개요를 items 로 바꾼다.
+
+        Raises:
+            IndexError: 페이지 인덱스가 PDF 페이지 수를 벗어난 경우
+            ValueError: 개요 깊이가 잘못되었거나 백엔드가 처리할 수 없는 PDF 인 경우
+        """
+        raise NotImplementedError(f"{self.name} 백엔드는 개요 적용을 지원하지 않습니다.")
+
+
+class StreamBackend(PdfBackend):
+    """StreamingPdfWriter + 증분 업데이트 개요 (기본 백엔드)"""
+
+    name = 'stream'
+
+    def create_writer(self, path: str, checkpoint_every: int = 0) -> StreamingPdfWriter:
+        return StreamingPdfWriter(path, checkpoint_every=checkpoint_every)
+
+    def set_outline(self, path: str, items: OutlineItems) -> None:
+        append_outline(path, items)
+
+
+class Pypdf2Backend(PdfBackend):
+    """PyPDF2 로 PDF 전체를 다시 쓰며 개요를 적용하는 기존 방식의 백엔드"""
+
+    name = 'pypdf2'
+
+    def __init__(self):
+        import PyPDF2
+        self._pypdf2 = PyPDF2
+
+    def set_outline(self, path: str, items: OutlineItems) -> None:
+        pdf_dir = os.path.dirname(path)
+        pdf_name = os.path.basename(path)
+        new_path = os.path.join(pdf_dir, f'_{pdf_name}')
+
+        # origin PDF file open
+        with open(path, 'rb') as f_pdf:
+            pdf_reader = self._pypdf2.PdfReader(f_pdf)
+            pdf_writer = self._pypdf2.PdfWriter()
+
+            # get original pages (copy for new file)
+            for page in pdf_reader.pages:
+                pdf_writer.add_page(page)
+
+            parent_dic = {}
+            for depth_level, title, page in items:
+                if not 0 <= page < len(pdf_reader.pages):
+                    raise IndexError(f"페이지가 pdf 페이지 수({len(pdf_reader.pages)})를 벗어납니다. "
+                                     f"제목 : {title}, 페이지 : {page + 1}")
+                if depth_level > 0 and depth_level - 1 not in parent_dic:
+                    raise ValueError(f"개요 깊이가 앞 항목보다 2단계 이상 깊습니다. 제목 : {title}")
+                parent = parent_dic[depth_level - 1] if depth_level > 0 else None
+                parent_dic[depth_level] = pdf_writer.add_outline_item(title, page, parent=parent)
+
+            # 새로운 PDF 파일 작성
+            with open(new_path, 'wb') as f_pdf_new:
+                pdf_writer.write(f_pdf_new)
+
+        # 기존 파일과 새로운 파일 네이밍
+        os.replace(path, os.path.join(pdf_dir, f'_BAK_{pdf_name}'))
+        os.replace(new_path, path)
+
+
+class PikepdfWriter(PdfObjectWriter):
+    """pikepdf 로 이미지 페이지를 모아 close() 할 때 한 번에 저장하는 작성기 (StreamingPdfWriter 와 같은 사용법)
+
+    add_image/add_png 는 PdfObjectWriter 의 것을 그대로 사용하고(같은 인코딩, PNG 패스스루),
+    스트림 객체 기록만 pikepdf 객체 생성으로 바꾼다.
+    저장할 때까지 모든 페이지 데이터를 메모리에 들고 있으며 체크포인트는 지원하지 않는다.
+    """
+
+    def __init__(self, path: str, dpi: float = 72.0):
+        import pikepdf
+        super().__init__(fh=None)
+        self._pikepdf = pikepdf
+        self.path = path
+        self.dpi = dpi
+        self._pdf = pikepdf.new()
+        self._objects: dict[int, 'pikepdf.Object'] = {}  # new_obj() 번호 -> pikepdf 스트림
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pdf.pages)
+
+    def write_obj(self, num: int, body: bytes) -> None:
+        raise NotImplementedError("PikepdfWriter 는 스트림 객체만 기록한다.")
+
+    def write_stream_obj(self, num: int, entries: bytes, data: bytes) -> None:
+        self._objects[num] = self._pikepdf.Stream(self._pdf, data,
+                                                  self._pikepdf.Object.parse(b'<< ' + entries + b' >>'))
+
+    def write_stream_obj_chunks(self, num: int, entries: bytes, length: int, chunks: Iterable[bytes]) -> None:
+        self.write_stream_obj(num, entries, b''.join(chunks))
+
+    def add_page(self, image_ref: ImageRef) -> None:
+        """이미지 하나로 가득 찬 페이지를 추가한다."""
+        pikepdf = self._pikepdf
+        width = image_ref.width * 72.0 / self.dpi
+        height = image_ref.height * 72.0 / self.dpi
+        content = pikepdf.Stream(self._pdf, b'q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q' % (width, height))
+        page = pikepdf.Dictionary(
+            Type=pikepdf.Name.Page, MediaBox=[0, 0, width, height], Contents=content,
+            Resources=pikepdf.Dictionary(XObject=pikepdf.Dictionary(Im0=self._objects[image_ref.obj_num])))
+        self._pdf.pages.append(pikepdf.Page(page))
+
+    def add_image_page(self, image: Image.Image, encoding: str = 'flate', jpeg_quality: int = 85) -> None:
+        self.add_page(self.add_image(image, encoding, jpeg_quality))
+
+    def add_png_page(self, path: str, passthrough: bool = True) -> None:
+        self.add_page(self.add_png(path, passthrough))
+
+    def close(self) -> None:
+        """PDF 를 저장하고 닫는다."""
+        if self._pdf is None:
+            return
+        try:
+            # xref stream 으로 저장하면 PdfIncrementalWriter 로 증분 업데이트를 덧붙일 수 없다.
+            self._pdf.save(self.path, object_stream_mode=self._pikepdf.ObjectStreamMode.disable)
+        finally:
+            self._pdf.close()
+            self._pdf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # StreamingPdfWriter 와 달리 저장 전에는 파일이 없으므로 그대로 버린다.
+            self._pdf.close()
+            self._pdf = None
+
+
+class PikepdfBackend(PdfBackend):
+    """qpdf(pikepdf) 백엔드"""
+
+    name = 'pikepdf'
+
+    def __init__(self):
+        import pikepdf
+        self._pikepdf = pikepdf
+
+    def create_writer(self, path: str, checkpoint_every: int = 0) -> PikepdfWriter:
+        return PikepdfWriter(path)
+
+    def set_outline(self, path: str, items: OutlineItems) -> None:
+        pikepdf = self._pikepdf
+        with pikepdf.open(path, allow_overwriting_input=True) as pdf:
+            page_count = len(pdf.pages)
+            with pdf.open_outline() as outline:
+                outline.root.clear()
+                parents = [outline.root]  # 깊이별 자식 목록 (parents[d] 에 깊이 d 항목을 추가)
+                for depth, title, page_index in items:
+                    if not 0 <= page_index < page_count:
+                        raise IndexError(f"페이지가 pdf 페이지 수({page_count})를 벗어납니다. "
+                                         f"제목 : {title}, 페이지 : {page_index + 1}")
+                    if not 0 <= depth < len(parents):
+                        raise ValueError(f"개요 깊이가 앞 항목보다 2단계 이상 깊습니다. 제목 : {title}")
+                    item = pikepdf.OutlineItem(title, page_index, 'Fit')
+                    parents[depth].append(item)
+                    del parents[depth + 1:]
+                    parents.append(item.children)
+            pdf.save(path, object_stream_mode=pikepdf.ObjectStreamMode.preserve)
+
+
+PDF_BACKENDS = {
+    StreamBackend.name: StreamBackend,
+    Pypdf2Backend.name: Pypdf2Backend,
+    PikepdfBackend.name: PikepdfBackend,
+}
+
+# PDF 생성(create_writer)을 지원하는 백엔드 ('pypdf2' 는 개요 적용만 지원)
+PDF_WRITER_BACKENDS = tuple(name for name, backend_cls in PDF_BACKENDS.items()
+                            if backend_cls.create_writer is not PdfBackend.create_writer)
+
+
+def check_pdf_writer_backend(name: str) -> None:
+    """PDF 생성에 쓸 수 있는 백엔드인지 검사한다. (캡쳐/취합을 시작하기 전에 호출)
+
+    백엔드를 실제로 생성해 보므로 필요한 패키지(pikepdf 등)가 없으면 여기서 실패한다.
+
+    Raises:
+        ValueError: 없는 백엔드, PDF 생성을 지원하지 않는 백엔드, 패키지가 설치되지 않은 백엔드인 경우
+    """
+    if name not in PDF_WRITER_BACKENDS:
+        raise ValueError(f"PDF 생성에 사용할 수 없는 PDF 백엔드입니다: {name} "
+                         f"(가능한 값: {', '.join(PDF_WRITER_BACKENDS)})")
+    try:
+        create_pdf_backend(name)
+    except ImportError as e:
+        raise ValueError(f"{name} PDF 백엔드를 사용할 수 없습니다. 패키지를 설치하세요: {e}") from e
+
+
+def create_pdf_backend(name: str = 'stream') -> PdfBackend:
+    """이름으로 PDF 백엔드를 생성한다.
+
+    Args:
+        name: 백엔드 이름 ('stream', 'pypdf2', 'pikepdf')
+
+    Returns:
+        PdfBackend 인스턴스
+    """
+    try:
+        backend_cls = PDF_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"지원하지 않는 PDF 백엔드입니다: {name} (가능한 값: {', '.join(PDF_BACKENDS)})")
+    return backend_cls()
+
+# end of file
@@ -0,0 +1,715 @@
+"""
+스트리밍 PDF 작성 모듈입니다.
+
+Pillow 의 PDF 저장(save_all)은 모든 페이지를 디코딩한 상태로 메모리에 들고 있어야 한다.
+StreamingPdfWriter 는 페이지를 하나씩 디코딩 -> 기록 -> 해제하므로 페이지 수와 무관하게 메모리 사용량이 일정하다.
+
+PNG 파일은 가능하면 픽셀을 디코딩하지 않고 압축된 IDAT 데이터를 그대로 PDF 이미지 스트림으로 복사한다.
+(PDF 의 FlateDecode + PNG predictor 가 PNG 의 압축 형식과 같기 때문. PDF 취합이 거의 파일 복사 수준이 된다)
+
+checkpoint_every 를 지정하면 N페이지마다 그때까지의 페이지 트리와 xref 를 증분 업데이트(incremental update)
+형태로 기록해 둔다. 작성 도중 프로세스가 죽어도 recover_partial_pdf 로 마지막 체크포인트까지의 PDF를 살릴 수 있다.
+
+PdfIncrementalWriter 는 이미 작성된 PDF 뒤에 같은 방식의 증분 업데이트를 덧붙인다.
+(PdfPageSplicer: 다시 캡쳐한 페이지 교체, append_outline: 개요 추가)
+"""
+
+import io
+import os
+import re
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable
+import numpy as np
+from PIL import Image
+
+_PDF_HEADER = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+_EOF_MARKER = b'%%EOF'
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_PNG_COLORS = {0: 1, 2: 3, 3: 1}  # PNG color type -> 픽셀당 채널 수 (passthrough 가능한 타입만)
+
+
+@dataclass
+class ImageRef:
+    """PDF에 기록된 이미지 XObject 정보"""
+    obj_num: int
+    width: int
+    height: int
+
+
+@dataclass
+class PngInfo:
+    """PNG 파일의 헤더와 IDAT 청크 위치 정보"""
+    width: int
+    height: int
+    bit_depth: int
+    color_type: int
+    interlace: int
+    palette: bytes = b''
+    has_transparency: bool = False
+    idat_chunks: list[tuple[int, int]] = field(default_factory=list)  # (파일 오프셋, 길이)
+
+    @property
+    def can_passthrough(self) -> bool:
+        """픽셀을 디코딩하지 않고 IDAT 데이터를 그대로 PDF에 넣을 수 있는지 여부
+        (알파/투명도, 인터레이스, 16비트는 디코딩 후 다시 압축한다)"""
+        return (self.color_type in _PNG_COLORS and self.interlace == 0 and not self.has_transparency
+                and self.bit_depth <= 8 and bool(self.idat_chunks)
+                and (self.color_type != 3 or bool(self.palette)))
+
+    @property
+    def idat_length(self) -> int:
+        return sum(length for _, length in self.idat_chunks)
+
+
+def read_png_info(path: str) -> PngInfo | None:
+    """PNG 청크를 훑어 헤더와 IDAT 위치를 읽는다. (픽셀 데이터는 읽지 않는다)
+
+    Returns:
+        PngInfo. PNG 파일이 아니면 None
+    """
+    with open(path, 'rb') as f:
+        if f.read(8) != _PNG_SIGNATURE:
+            return None
+        info = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type == b'IHDR':
+                width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', f.read(13))
+                info = PngInfo(width, height, bit_depth, color_type, interlace)
+                f.seek(4, os.SEEK_CUR)  # CRC
+                continue
+            if info is None:
+                return None
+            if chunk_type == b'IDAT':
+                info.idat_chunks.append((f.tell(), length))
+            elif chunk_type == b'PLTE':
+                info.palette = f.read(length)
+                f.seek(4, os.SEEK_CUR)
+                continue
+            elif chunk_type == b'tRNS':
+                info.has_transparency = True
+            elif chunk_type == b'IEND':
+                break
+            f.seek(length + 4, os.SEEK_CUR)
+        return info
+
+
+class PdfObjectWriter:
+    """PDF 객체와 xref 섹션을 파일에 순서대로 기록하는 저수준 작성기
+
+    새 파일 작성(StreamingPdfWriter)과 기존 파일 뒤에 덧붙이는 증분 업데이트에서 함께 사용한다.
+
+    Args:
+        fh: 바이너리 쓰기 파일 객체 (파일 끝에 위치해 있어야 한다)
+        next_obj_num: 새로 할당할 첫 객체 번호
+    """
+
+    def __init__(self, fh: BinaryIO, next_obj_num: int = 1):
+        self._fh = fh
+        self._next_obj_num = next_obj_num
+        self._dirty: dict[int, int] = {}  # 마지막 xref 섹션 이후 기록된 객체 번호 -> 파일 오프셋
+
+    def new_obj(self) -> int:
+        """새 객체 번호를 할당한다."""
+        num = self._next_obj_num
+        self._next_obj_num += 1
+        return num
+
+    @property
+    def size(self) -> int:
+        """trailer 의 /Size 값 (가장 큰 객체 번호 + 1)"""
+        return self._next_obj_num
+
+    def write_obj(self, num: int, body: bytes) -> None:
+        """일반 객체를 기록한다. body 는 '<< ... >>' 같은 PDF 표현"""
+        self._dirty[num] = self._fh.tell()
+        self._fh.write(b'%d 0 obj\n' % num)
+        self._fh.write(body)
+        self._fh.write(b'\nendobj\n')
+
+    def write_stream_obj(self, num: int, entries: bytes, data: bytes) -> None:
+        """스트림 객체를 기록한다. entries 는 /Length 를 제외한 딕셔너리 항목"""
+        self._dirty[num] = self._fh.tell()
+        self._fh.write(b'%d 0 obj\n<< %s /Length %d >>\nstream\n' % (num, entries, len(data)))
+        self._fh.write(data)
+        self._fh.write(b'\nendstream\nendobj\n')
+
+    def write_stream_obj_chunks(self, num: int, entries: bytes, length: int, chunks: Iterable[bytes]) -> None:
+        """스트림 객체를 조각 단위로 기록한다. 데이터 전체를 메모리에 올리지 않고 복사할 때 사용한다."""
+        self._dirty[num] = self._fh.tell()
+        self._fh.write(b'%d 0 obj\n<< %s /Length %d >>\nstream\n' % (num, entries, length))
+        for chunk in chunks:
+            self._fh.write(chunk)
+        self._fh.write(b'\nendstream\nendobj\n')
+
+    def write_xref(self, trailer: bytes, prev: int | None = None) -> int:
+        """마지막 xref 섹션 이후 기록된 객체들의 xref 섹션과 trailer 를 기록한다.
+
+        Args:
+            trailer: trailer 딕셔너리 항목 (/Size, /Prev 제외. 예: b'/Root 1 0 R')
+            prev: 이전 xref 섹션의 오프셋 (증분 업데이트인 경우)
+
+        Returns:
+            기록한 xref 섹션의 오프셋
+        """
+        entries = dict(self._dirty)
+        xref_offset = self._fh.tell()
+        self._fh.write(b'xref\n')
+
+        # 0번 free 객체 항목은 증분 섹션에도 넣어준다. (일부 리더가 0번으로 시작하지 않는 섹션을 잘못 보정함)
+        nums = [0] + sorted(entries)
+        # 연속된 객체 번호끼리 하위 섹션으로 묶는다.
+        start = 0
+        while start < len(nums):
+            end = start
+            while end + 1 < len(nums) and nums[end + 1] == nums[end] + 1:
+                end += 1
+            self._fh.write(b'%d %d\n' % (nums[start], end - start + 1))
+            for num in nums[start:end + 1]:
+                if num == 0:
+                    self._fh.write(b'0000000000 65535 f \n')
+                else:
+                    self._fh.write(b'%010d 00000 n \n' % entries[num])
+            start = end + 1
+
+        prev_entry = b' /Prev %d' % prev if prev is not None else b''
+        self._fh.write(b'trailer\n<< /Size %d %s%s >>\n' % (self.size, trailer, prev_entry))
+        self._fh.write(b'startxref\n%d\n%s\n' % (xref_offset, _EOF_MARKER))
+        self._dirty.clear()
+        return xref_offset
+
+    def add_image(self, image: Image.Image, encoding: str = 'flate', jpeg_quality: int = 85) -> ImageRef:
+        """이미지 XObject 를 기록한다. (여러 페이지에서 공유할 수 있다)
+
+        Args:
+            image: 이미지 ('1', 'L', 'P', 'RGB'. 그 외 모드는 RGB 로 변환)
+            encoding: 'flate' (무손실), 'jpeg', 'ccitt' (1비트 CCITT G4)
+            jpeg_quality: encoding 이 'jpeg' 일 때 품질
+        """
+        if encoding not in _IMAGE_ENCODERS:
+            raise ValueError(f"지원하지 않는 이미지 인코딩입니다: {encoding} (가능한 값: {', '.join(IMAGE_ENCODINGS)})")
+        entries, data = _IMAGE_ENCODERS[encoding](image, jpeg_quality)
+        num = self.new_obj()
+        self.write_stream_obj(num, entries, data)
+        return ImageRef(num, image.width, image.height)
+
+    def add_png(self, path: str, passthrough: bool = True) -> ImageRef:
+        """PNG 파일을 이미지 XObject 로 기록한다.
+
+        passthrough 가 True 이고 가능한 PNG 라면 픽셀을 디코딩하지 않고 압축된 IDAT 데이터를 그대로 복사한다.
+        (알파/투명도, 인터레이스 PNG 는 디코딩 후 다시 압축한다)
+        """
+        info = read_png_info(path) if passthrough else None
+        if info is None or not info.can_passthrough:
+            with Image.open(path) as image:
+                return self.add_image(image)
+
+        num = self.new_obj()
+        self.write_stream_obj_chunks(num, _png_passthrough_entries(info), info.idat_length,
+                                     _read_chunks(path, info.idat_chunks))
+        return ImageRef(num, info.width, info.height)
+
+    def write_image_page(self, page_num: int, parent_num: int, image_ref: ImageRef, dpi: float) -> None:
+        """이미지 하나로 가득 찬 페이지 객체를 page_num 번호로 기록한다. (컨텐츠 스트림은 새 번호)"""
+        width = image_ref.width * 72.0 / dpi
+        height = image_ref.height * 72.0 / dpi
+
+        content_num = self.new_obj()
+        self.write_stream_obj(content_num, b'', b'q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q' % (width, height))
+        self.write_obj(page_num, b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.4f %.4f] '
+                                 b'/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>'
+                       % (parent_num, width, height, image_ref.obj_num, content_num))
+
+
+def _image_stream(image: Image.Image, compress_level: int = 6) -> tuple[bytes, bytes]:
+    """이미지를 PDF 이미지 XObject 스트림으로 변환한다.
+
+    Returns:
+        (딕셔너리 항목, 스트림 데이터)
+    """
+    raw = None
+    if image.mode == '1':
+        color_space, bpc = b'/DeviceGray', 1
+    elif image.mode == 'L':
+        color_space, bpc = b'/DeviceGray', 8
+    elif image.mode == 'P' and image.palette.mode == 'RGB':
+        palette = image.palette.tobytes()
+        colors = len(palette) // 3
+        color_space = b'[/Indexed /DeviceRGB %d <%s>]' % (colors - 1, palette.hex().encode())
+        bpc = 4 if colors <= 16 else 8
+        if bpc == 4:
+            # 한 바이트에 두 픽셀씩 채운다. (행마다 바이트 경계에 맞춰 패딩)
+            indices = np.asarray(image, dtype=np.uint8)
+            if image.width % 2:
+                indices = np.pad(indices, ((0, 0), (0, 1)))
+            raw = ((indices[:, 0::2] << 4) | indices[:, 1::2]).tobytes()
+    else:
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        color_space, bpc = b'/DeviceRGB', 8
+
+    data = zlib.compress(raw if raw is not None else image.tobytes(), compress_level)
+    entries = (b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s '
+               b'/BitsPerComponent %d /Filter /FlateDecode' % (image.width, image.height, color_space, bpc))
+    return entries, data
+
+
+def _jpeg_stream(image: Image.Image, quality: int = 85) -> tuple[bytes, bytes]:
+    """이미지를 JPEG(DCTDecode) 이미지 XObject 스트림으로 변환한다. (흑백 이미지는 흑백 JPEG)"""
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('RGB')
+    buf = io.BytesIO()
+    image.save(buf, 'JPEG', quality=quality, optimize=True)
+    color_space = b'/DeviceGray' if image.mode == 'L' else b'/DeviceRGB'
+    entries = (b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s '
+               b'/BitsPerComponent 8 /Filter /DCTDecode' % (image.width, image.height, color_space))
+    return entries, buf.getvalue()
+
+
+def _ccitt_stream(image: Image.Image) -> tuple[bytes, bytes]:
+    """이미지를 1비트 CCITT Group 4 (CCITTFaxDecode) 이미지 XObject 스트림으로 변환한다.
+
+    Pillow(libtiff)로 한 스트립짜리 G4 TIFF 를 만든 뒤 스트립 데이터만 떼어낸다.
+    """
+    if image.mode != '1':
+        image = image.convert('1', dither=Image.Dither.NONE)
+    buf = io.BytesIO()
+    image.save(buf, 'TIFF', compression='group4', tiffinfo={278: image.height})  # RowsPerStrip = 전체 높이
+    buf.seek(0)
+    with Image.open(buf) as tiff:
+        offset = tiff.tag_v2[273][0]     # StripOffsets
+        length = tiff.tag_v2[279][0]     # StripByteCounts
+    data = buf.getvalue()[offset:offset + length]
+    # Pillow 는 BlackIsZero 로 저장하므로 팩스 데이터의 '흑' 비트가 흰 픽셀이다. BlackIs1 로 뒤집어 해석하게 한다.
+    entries = (b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray '
+               b'/BitsPerComponent 1 /Filter /CCITTFaxDecode '
+               b'/DecodeParms << /K -1 /Columns %d /Rows %d /BlackIs1 true >>'
+               % (image.width, image.height, image.width, image.height))
+    return entries, data
+
+
+_IMAGE_ENCODERS = {
+    'flate': lambda image, jpeg_quality: _image_stream(image),
+    'jpeg': lambda image, jpeg_quality: _jpeg_stream(image, jpeg_quality),
+    'ccitt': lambda image, jpeg_quality: _ccitt_stream(image),
+}
+IMAGE_ENCODINGS = tuple(_IMAGE_ENCODERS)
+
+
+def _png_passthrough_entries(info: PngInfo) -> bytes:
+    """PNG IDAT 데이터를 그대로 쓰는 이미지 XObject 딕셔너리 항목 (Flate + PNG predictor)"""
+    colors = _PNG_COLORS[info.color_type]
+    if info.color_type == 3:
+        color_space = b'[/Indexed /DeviceRGB %d <%s>]' % (len(info.palette) // 3 - 1, info.palette.hex().encode())
+    elif info.color_type == 0:
+        color_space = b'/DeviceGray'
+    else:
+        color_space = b'/DeviceRGB'
+    return (b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent %d '
+            b'/Filter /FlateDecode /DecodeParms << /Predictor 15 /Colors %d /BitsPerComponent %d /Columns %d >>'
+            % (info.width, info.height, color_space, info.bit_depth, colors, info.bit_depth, info.width))
+
+
+def _read_chunks(path: str, chunks: list[tuple[int, int]], block_size: int = 1 << 20):
+    """파일의 (오프셋, 길이) 구간들을 block_size 단위로 읽어서 돌려준다."""
+    with open(path, 'rb') as f:
+        for offset, length in chunks:
+            f.seek(offset)
+            while length > 0:
+                data = f.read(min(block_size, length))
+                if not data:
+                    raise ValueError(f"PNG 데이터가 잘려 있습니다: {path}")
+                length -= len(data)
+                yield data
+
+
+class StreamingPdfWriter(PdfObjectWriter):
+    """이미지를 한 페이지씩 기록하는 PDF 작성기
+
+    Args:
+        path: 생성할 PDF 파일 경로
+        checkpoint_every: N페이지마다 체크포인트(증분 xref)를 기록한다. 0이면 마지막에 한번만 기록
+        dpi: 이미지 해상도. 페이지 크기(pt) = 픽셀 / dpi * 72 (Pillow 기본값과 같은 72)
+    """
+
+    def __init__(self, path: str, checkpoint_every: int = 0, dpi: float = 72.0):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.dpi = dpi
+        super().__init__(open(path, 'wb'))
+        self._fh.write(_PDF_HEADER)
+        self._catalog_num = self.new_obj()
+        self._pages_num = self.new_obj()
+        self._page_nums: list[int] = []
+        self._last_xref: int | None = None
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_nums)
+
+    def add_page(self, image_ref: ImageRef) -> None:
+        """이미지 하나로 가득 찬 페이지를 추가한다."""
+        page_num = self.new_obj()
+        self.write_image_page(page_num, self._pages_num, image_ref, self.dpi)
+        self._page_nums.append(page_num)
+
+        if self.checkpoint_every and self.page_count % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def add_image_page(self, image: Image.Image, encoding: str = 'flate', jpeg_quality: int = 85) -> None:
+        """이미지를 기록하고 페이지로 추가한다."""
+        self.add_page(self.add_image(image, encoding, jpeg_quality))
+
+    def add_png_page(self, path: str, passthrough: bool = True) -> None:
+        """PNG 파일을 기록하고 페이지로 추가한다."""
+        self.add_page(self.add_png(path, passthrough))
+
+    def _write_page_tree(self) -> None:
+        kids = b' '.join(b'%d 0 R' % num for num in self._page_nums)
+        self.write_obj(self._pages_num, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, self.page_count))
+        self.write_obj(self._catalog_num, b'<< /Type /Catalog /Pages %d 0 R >>' % self._pages_num)
+
+    def checkpoint(self) -> None:
+        """지금까지의 페이지로 온전한 PDF 가 되도록 페이지 트리와 xref 를 기록하고 디스크에 동기화한다."""
+        self._write_page_tree()
+        self._last_xref = self.write_xref(b'/Root %d 0 R' % self._catalog_num, prev=self._last_xref)
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        """페이지 트리와 xref 를 기록하고 파일을 닫는다."""
+        if self._fh.closed:
+            return
+        try:
+            self._write_page_tree()
+            self.write_xref(b'/Root %d 0 R' % self._catalog_num, prev=self._last_xref)
+        finally:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # 오류가 난 경우 마지막 체크포인트까지만 남긴다.
+            self._fh.close()
+            recover_partial_pdf(self.path)
+
+
+_STARTXREF_RE = re.compile(rb'startxref\s+(\d+)')
+_REF_RE = re.compile(rb'(\d+)\s+\d+\s+R')
+
+
+def _last_startxref(fh: BinaryIO) -> int:
+    """파일 끝의 startxref 값 (마지막 xref 섹션 오프셋)"""
+    fh.seek(0, os.SEEK_END)
+    fh.seek(max(0, fh.tell() - 1024))
+    found = _STARTXREF_RE.findall(fh.read())
+    if not found:
+        raise ValueError("PDF 의 startxref 를 찾을 수 없습니다.")
+    return int(found[-1])
+
+
+def _read_xref_chain(fh: BinaryIO, offset: int) -> tuple[dict[int, int], bytes]:
+    """마지막 xref 섹션부터 /Prev 를 따라가며 객체 번호 -> 오프셋 표를 만든다. (나중 섹션이 우선)
+
+    Returns:
+        (객체 번호 -> 파일 오프셋, 마지막 trailer 딕셔너리)
+    """
+    offsets: dict[int, int] = {}
+    last_trailer = None
+    visited = set()
+    while offset not in visited:
+        visited.add(offset)
+        fh.seek(offset)
+        if fh.readline().strip() != b'xref':
+            raise ValueError("xref 테이블 형식의 PDF 만 지원합니다. (xref stream 은 지원하지 않음)")
+        section: dict[int, int] = {}
+        while True:
+            line = fh.readline()
+            if not line:
+                raise ValueError("PDF 의 xref 섹션이 잘려 있습니다.")
+            if line.lstrip().startswith(b'trailer'):
+                break
+            if not line.strip():
+                continue
+            start, count = map(int, line.split())
+            for num in range(start, start + count):
+                entry = fh.readline().split()
+                if entry[2] == b'n':
+                    section[num] = int(entry[0])
+        rest = line.lstrip()[len(b'trailer'):] + fh.read(4096)
+        trailer = rest[:rest.find(b'startxref')]
+        for num, obj_offset in section.items():
+            offsets.setdefault(num, obj_offset)
+        if last_trailer is None:
+            last_trailer = trailer
+        prev = re.search(rb'/Prev\s+(\d+)', trailer)
+        if prev is None:
+            break
+        offset = int(prev.group(1))
+    return offsets, last_trailer
+
+
+def _read_obj(fh: BinaryIO, offset: int) -> bytes:
+    """offset 위치의 (스트림이 아닌) 객체 본문을 읽는다."""
+    fh.seek(offset)
+    data = b''
+    while b'endobj' not in data:
+        chunk = fh.read(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data[data.find(b'obj') + 3:data.find(b'endobj')].strip()
+
+
+def _trailer_ref(trailer: bytes, key: bytes) -> int:
+    found = re.search(rb'/' + key + rb'\s+(\d+)\s+\d+\s+R', trailer)
+    if found is None:
+        raise ValueError(f"PDF trailer 에 /{key.decode()} 가 없습니다.")
+    return int(found.group(1))
+
+
+class PdfIncrementalWriter(PdfObjectWriter):
+    """이미 작성된 PDF 뒤에 증분 업데이트(incremental update)를 덧붙이는 작성기
+
+    기존 xref 를 읽어 카탈로그와 페이지 목록을 찾아 두고, 새로 기록한 객체들의 xref 섹션을 /Prev 로 이어서 덧붙인다.
+    기존 내용은 건드리지 않으므로 비용이 파일 크기가 아니라 바뀐 객체 크기에 비례한다.
+    xref 테이블 형식의 PDF 만 지원한다. (StreamingPdfWriter, PyPDF2 로 저장한 PDF. 지원하지 않으면 ValueError)
+
+    Args:
+        path: 수정할 PDF 파일 경로
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        fh = open(path, 'r+b')
+        try:
+            self._prev_xref = _last_startxref(fh)
+            self._offsets, trailer = _read_xref_chain(fh, self._prev_xref)
+            if b'/Encrypt' in trailer:
+                raise ValueError("암호화된 PDF 는 지원하지 않습니다.")
+            size = re.search(rb'/Size\s+(\d+)', trailer)
+            if size is None:
+                raise ValueError("PDF trailer 에 /Size 가 없습니다.")
+            # 새 trailer 에는 /Root 와 /Info, /ID 만 이어서 기록한다.
+            self._trailer = b' '.join(found.group(0) for found in (
+                re.search(rb'/Root\s+\d+\s+\d+\s+R', trailer), re.search(rb'/Info\s+\d+\s+\d+\s+R', trailer),
+                re.search(rb'/ID\s*\[[^\]]*\]', trailer)) if found)
+            self._fh = fh
+            self.root_num = _trailer_ref(trailer, b'Root')
+            self.catalog = self.read_obj(self.root_num)
+            pages_ref = re.search(rb'/Pages\s+(\d+)\s+\d+\s+R', self.catalog)
+            if pages_ref is None:
+                raise ValueError("PDF 카탈로그에 페이지 트리가 없습니다.")
+            self._pages: list[tuple[int, int]] = []  # (페이지 객체 번호, 부모 페이지 트리 번호)
+            self._collect_pages(int(pages_ref.group(1)))
+            fh.seek(0, os.SEEK_END)
+            self._original_size = fh.tell()
+        except Exception:
+            fh.close()
+            raise
+        super().__init__(fh, int(size.group(1)))
+
+    def read_obj(self, num: int) -> bytes:
+        """기존 PDF 의 (스트림이 아닌) 객체 본문을 읽는다."""
+        if num not in self._offsets:
+            # 객체 스트림(object stream) 안의 객체 등
+            raise ValueError(f"PDF 객체 {num} 의 위치를 xref 에서 찾을 수 없습니다.")
+        return _read_obj(self._fh, self._offsets[num])
+
+    def _collect_pages(self, tree_num: int) -> None:
+        kids = re.search(rb'/Kids\s*\[(.*?)\]', self.read_obj(tree_num), re.S)
+        for kid in _REF_RE.findall(kids.group(1) if kids else b''):
+            num = int(kid)
+            if re.search(rb'/Type\s*/Pages\b', self.read_obj(num)):
+                self._collect_pages(num)
+            else:
+                self._pages.append((num, tree_num))
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    @property
+    def page_nums(self) -> list[int]:
+        """페이지 순서대로 페이지 객체 번호"""
+        return [num for num, _ in self._pages]
+
+    def close(self) -> None:
+        """새로 기록한 객체들의 xref 섹션을 덧붙이고 파일을 닫는다."""
+        if self._fh.closed:
+            return
+        try:
+            if self._dirty:
+                self.write_xref(self._trailer, prev=self._prev_xref)
+        finally:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # 오류가 난 경우 덧붙인 내용을 잘라내 원래 PDF 로 되돌린다.
+            self._fh.truncate(self._original_size)
+            self._fh.close()
+
+
+class PdfPageSplicer(PdfIncrementalWriter):
+    """이미 작성된 PDF 의 일부 페이지를 증분 업데이트로 교체하는 작성기
+
+    바뀐 페이지의 이미지와 컨텐츠 스트림만 파일 끝에 새로 기록하고, 페이지 객체는 같은 번호로 다시 기록한다.
+    나머지 페이지, 페이지 트리, 개요(outline)는 그대로 남는다. (개요가 가리키는 페이지 객체 번호가 바뀌지 않는다)
+
+    Args:
+        path: 수정할 PDF 파일 경로
+        dpi: 교체할 이미지 해상도 (StreamingPdfWriter 와 같은 값)
+    """
+
+    def __init__(self, path: str, dpi: float = 72.0):
+        super().__init__(path)
+        self.dpi = dpi
+
+    def replace_page(self, page_index: int, image_ref: ImageRef) -> None:
+        """page_index(0부터) 번째 페이지를 image_ref 이미지 한 장으로 된 페이지로 교체한다."""
+        page_num, parent_num = self._pages[page_index]
+        self.write_image_page(page_num, parent_num, image_ref, self.dpi)
+
+
+def _pdf_text(text: str) -> bytes:
+    """PDF 텍스트 문자열 (UTF-16BE, BOM 포함 16진수 문자열)"""
+    return b'<FEFF%s>' % text.encode('utf-16-be').hex().upper().encode()
+
+
+def append_outline(path: str, items: Iterable[tuple[int, str, int]]) -> int:
+    """PDF 에 개요(북마크)를 증분 업데이트로 덧붙인다. 기존 개요는 새 개요로 바뀐다.
+
+    개요 항목과 카탈로그, xref 섹션만 파일 끝에 추가하므로 파일 크기와 무관하게 빠르다.
+
+    Args:
+        path: PDF 파일 경로
+        items: (깊이(0부터), 제목, 페이지 인덱스(0부터)) 목록. 깊이는 앞 항목보다 최대 1 깊어질 수 있다.
+
+    Returns:
+        기록한 개요 항목 수
+
+    Raises:
+        ValueError: 증분 업데이트를 지원하지 않는 PDF 이거나 개요 깊이가 잘못된 경우
+        IndexError: 페이지 인덱스가 PDF 페이지 수를 벗어난 경우
+    """
+    with PdfIncrementalWriter(path) as writer:
+        page_nums = writer.page_nums
+        root = {'num': writer.new_obj(), 'children': []}
+        parents = [root]  # 깊이별 마지막 항목 (parents[d] 는 깊이 d 항목의 부모)
+        count = 0
+        for depth, title, page_index in items:
+            if not 0 <= depth < len(parents):
+                raise ValueError(f"개요 깊이가 앞 항목보다 2단계 이상 깊습니다. 제목 : {title}")
+            if not 0 <= page_index < len(page_nums):
+                raise IndexError(f"페이지가 pdf 페이지 수({len(page_nums)})를 벗어납니다. 제목 : {title}, "
+                                 f"페이지 : {page_index + 1}")
+            node = {'num': writer.new_obj(), 'title': title, 'page': page_nums[page_index], 'children': []}
+            parents[depth]['children'].append(node)
+            del parents[depth + 1:]
+            parents.append(node)
+            count += 1
+
+        def descendants(node: dict) -> int:
+            return sum(1 + descendants(kid) for kid in node['children'])
+
+        def children_entries(node: dict) -> bytes:
+            kids = node['children']
+            if not kids:
+                return b''
+            # 모든 항목을 펼친 상태로 기록한다. (/Count 양수)
+            return b' /First %d 0 R /Last %d 0 R /Count %d' % (kids[0]['num'], kids[-1]['num'], descendants(node))
+
+        def write_children(node: dict) -> None:
+            kids = node['children']
+            for i, kid in enumerate(kids):
+                body = b'<< /Title %s /Parent %d 0 R /Dest [%d 0 R /Fit]' % (_pdf_text(kid['title']), node['num'],
+                                                                             kid['page'])
+                if i > 0:
+                    body += b' /Prev %d 0 R' % kids[i - 1]['num']
+                if i + 1 < len(kids):
+                    body += b' /Next %d 0 R' % kids[i + 1]['num']
+                writer.write_obj(kid['num'], body + children_entries(kid) + b' >>')
+                write_children(kid)
+
+        writer.write_obj(root['num'], b'<< /Type /Outlines%s >>' % (children_entries(root) or b' /Count 0'))
+        write_children(root)
+
+        catalog = re.sub(rb'\s*/Outlines\s+\d+\s+\d+\s+R', b'', writer.catalog)
+        if not catalog.endswith(b'>>'):
+            raise ValueError("PDF 카탈로그 형식을 읽을 수 없습니다.")
+        writer.write_obj(writer.root_num, catalog[:-2].rstrip() + b' /Outlines %d 0 R >>' % root['num'])
+    return count
+
+
+_EOF_STARTXREF_RE = re.compile(rb'startxref\s+(\d+)\s*$')
+
+
+def _is_xref_end(fh: BinaryIO, eof_pos: int) -> bool:
+    """eof_pos 의 %%EOF 가 xref 섹션의 끝인지 확인한다.
+
+    바로 앞이 startxref <오프셋> 이고 그 오프셋에 xref 키워드가 있어야 한다.
+    (이미지 스트림 데이터 안에 우연히 들어 있는 %%EOF 를 체크포인트로 착각하지 않도록)
+    """
+    start = max(0, eof_pos - 64)
+    fh.seek(start)
+    match = _EOF_STARTXREF_RE.search(fh.read(eof_pos - start))
+    if match is None or int(match.group(1)) >= eof_pos:
+        return False
+    fh.seek(int(match.group(1)))
+    return fh.read(4) == b'xref'
+
+
+def is_complete_pdf(path: str) -> bool:
+    """파일이 xref 섹션의 %%EOF 로 끝나는지 확인한다. (작성 도중 강제 종료된 PDF 는 쓰다 만 객체로 끝난다)"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        start = max(0, f.tell() - 1024)
+        f.seek(start)
+        tail = f.read().rstrip()
+        if not tail.endswith(_EOF_MARKER):
+            return False
+        return _is_xref_end(f, start + len(tail) - len(_EOF_MARKER))
+
+
+def recover_partial_pdf(path: str) -> bool:
+    """작성 도중 중단된 PDF를 마지막 체크포인트(xref 섹션 끝의 %%EOF) 위치까지 잘라낸다.
+
+    Returns:
+        복구 가능한 체크포인트가 있었는지 여부
+    """
+    chunk_size = 1 << 16
+    with open(path, 'r+b') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        pos = end
+        tail = b''
+        while pos > 0:
+            read_size = min(chunk_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            # 청크 경계에 걸친 %%EOF 도 찾도록 뒤 청크의 앞부분을 붙인다.
+            tail = f.read(read_size) + tail[:len(_EOF_MARKER) - 1]
+            found = tail.rfind(_EOF_MARKER)
+            while found >= 0:
+                if _is_xref_end(f, pos + found):
+                    f.truncate(min(end, pos + found + len(_EOF_MARKER) + 1))
+                    return True
+                found = tail.rfind(_EOF_MARKER, 0, found)
+    return False
+
+# end of file
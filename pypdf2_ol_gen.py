@@ -2,83 +2,104 @@
 # simple and easy way to generate a PDF outline
 # --------------------------------------------------------------------
 import os
-import PyPDF2
+from typing import Iterable
 
 # --------------------------------------------------------------------------------
 OUTLINE_FILE = '초보자도 프로처럼 만드는 플러터 앱 개발 (이정주) - 한빛미디어.txt'
 PDF_FILE     = '초보자도 프로처럼 만드는 플러터 앱 개발 (이정주) - 한빛미디어.pdf'
 # --------------------------------------------------------------------------------
 
-def pdf_outline_gen(pdf_file: str, ol_file: str, depth_sep: str, page_sep: str) -> tuple[bool, str]:
+def parse_outline(lines: Iterable[str], depth_sep: str, page_sep: str) -> list[tuple[int, str, int]]:
+    """개요 텍스트 줄들을 (깊이, 제목, 페이지 인덱스(0부터)) 목록으로 변환한다. 빈 줄은 건너뛴다.
+
+    Raises:
+        ValueError: 개요 형식 오류 (메시지를 그대로 사용자에게 보여준다)
+    """
+    items = []
+    bef_page = 0
+    for line in lines:
+        line = line.replace('\n', '')
+        if not line.strip():
+            continue
+        ol_attr = line.split(page_sep)
+        depth_level = ol_attr[0].count(depth_sep)
+
+        if not items and depth_level != 0:
+            raise ValueError("첫행의 깊이레벨은 0이어야 합니다.")
+
+        title = ol_attr[0].replace(depth_sep, '')
+
+        if len(ol_attr) != 2:
+            raise ValueError(f"페이지 누락 확인, 제목 : {title}")
+        # 페이지 번호가 비어있는지 확인
+        if not ol_attr[1].strip():
+            raise ValueError(f"페이지 번호가 비어 있습니다. 제목 : {title}")
+
+        try:
+            page = int(ol_attr[1]) - 1  # page index start from 0. so, -1
+        except ValueError:
+            raise ValueError(f"잘못된 페이지 번호입니다. 제목 : {title}, 페이지 : {ol_attr[1]}") from None
+
+        if bef_page > page:
+            raise ValueError(f"페이지가 앞장 보다 작을수 없습니다. 페이지 : {bef_page} > {page} ?")
+        bef_page = page
+
+        if items and depth_level > items[-1][0] + 1:
+            raise ValueError(f"깊이레벨이 앞 항목보다 2단계 이상 깊습니다. 제목 : {title}")
+
+        items.append((depth_level, title, page))
+    return items
+
+
+def pdf_outline_gen(pdf_file: str, ol_file: str | None = None, depth_sep: str = '    ', page_sep: str = '\t', *,
+                    outline_lines: Iterable[str] | None = None, incremental: bool = True,
+                    backend: str = '') -> tuple[bool, str]:
+    """PDF 에 개요(북마크)를 적용한다.
+
+    Args:
+        pdf_file: PDF 파일
+        ol_file: 개요 파일. outline_lines 를 주면 사용하지 않는다.
+        depth_sep: 깊이 구분자
+        page_sep: 제목/페이지 구분자
+        outline_lines: 개요 텍스트 줄 목록 (파일 대신 메모리의 개요를 적용)
+        incremental: True면 개요와 카탈로그, xref 만 PDF 끝에 덧붙인다. (증분 업데이트. 파일 크기와 무관하게 빠르고
+                     _BAK_ 사본을 만들지 않는다) 지원하지 않는 PDF 면 전체를 다시 쓰는 방식으로 적용한다.
+        backend: 개요를 적용할 pdf_backend 이름 ('stream', 'pypdf2', 'pikepdf'). 지정하면 incremental 은 무시한다.
+
+    Returns:
+        (성공여부, 메시지). 전체를 다시 쓰는 방식으로 바꿔 적용한 경우 메시지에 그 이유를 덧붙인다.
+    """
+    from pdf_backend import create_pdf_backend
+
     if depth_sep == page_sep:
         return False, "depth_sep and page_sep must be different."
 
-    # origin PDF file open
-    with open(pdf_file, 'rb') as f_pdf:
-        pdf_reader = PyPDF2.PdfReader(f_pdf)
-        pdf_writer = PyPDF2.PdfWriter()
-
-        # get original pages (copy for new file)
-        for i in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[i]
-            pdf_writer.add_page(page)
-
-        # get outline guide and apply to new file
+    if outline_lines is None:
+        if not ol_file:
+            return False, "개요 파일이 지정되지 않았습니다."
         with open(ol_file, 'r') as f_ol:
-            parent_dic = {}
-            bef_page = 0
-            for idx, line in enumerate(f_ol):
-                ol_attr = line.replace('\n', '').split(page_sep)
-                depth_level = ol_attr[0].count(depth_sep)
-
-                if idx == 0 and depth_level != 0:
-                    return False, "첫행의 깊이레벨은 0이어야 합니다."
-
-                title = ol_attr[0].replace(depth_sep, '')
-                print(f'title = {title}')
-
-                if len(ol_attr) != 2:
-                    return False, f"페이지 누락 확인, 제목 : {title}"
-                else:
-                    # 페이지 번호가 비어있는지 확인
-                    if not ol_attr[1].strip():
-                        return False, f"페이지 번호가 비어 있습니다. 제목 : {title}"
-
-                    try:
-                        page = int(ol_attr[1]) - 1
-                    except ValueError:
-                        return False, f"잘못된 페이지 번호입니다. 제목 : {title}, 페이지 : {ol_attr[1]}"
-                        
-                    if bef_page > page :
-                        return False, f"페이지가 앞장 보다 작을수 없습니다. 페이지 : {bef_page} > {page} ?"
-                    bef_page = page
-
-                print(f'page = {page}\n')
-
-                if depth_level > 0:
-                    parent = parent_dic[depth_level - 1]
-                else:
-                    parent = None
-
-                # print(f'line index = {idx}')
-                # print(f'depth_level = {depth_level}')
-                # print(f'title = {title}')
-                # print(f'page = {page}')
-                # print(f'parent = {parent}\n')
-
-                # page index start from 0. so, -1
-                parent_dic[depth_level] = pdf_writer.add_outline_item(title, page, parent=parent)
-
-        # 새로운 PDF 파일 작성
-        pdf_dir = os.path.dirname(pdf_file)
-        pdf_name = os.path.basename(pdf_file)
-        with open(os.path.join(pdf_dir, f'_{pdf_name}'), 'wb') as f_pdf_new:
-            pdf_writer.write(f_pdf_new)
-
-    # 기존 파일과 새로운 파일 네이밍
-    os.rename(pdf_file, os.path.join(pdf_dir, f'_BAK_{pdf_name}'))
-    os.rename(os.path.join(pdf_dir, f'_{pdf_name}'), pdf_file)
-
-    return True, "개요가 정상적으로 적용되었습니다."
+            outline_lines = f_ol.readlines()
+    try:
+        items = parse_outline(outline_lines, depth_sep, page_sep)
+    except ValueError as e:
+        return False, str(e)
+
+    name = backend or ('stream' if incremental else 'pypdf2')
+    notice = ''
+    try:
+        try:
+            create_pdf_backend(name).set_outline(pdf_file, items)
+        except ValueError as e:
+            if name != 'stream' or backend:
+                raise
+            notice = f" (증분 업데이트로 적용할 수 없어 pdf 를 다시 작성했습니다: {e})"
+            name = 'pypdf2'
+            create_pdf_backend(name).set_outline(pdf_file, items)
+    except ImportError as e:
+        return False, f"{name} 백엔드를 사용할 수 없습니다: {e}"
+    except (IndexError, ValueError) as e:
+        return False, str(e)
+
+    return True, "개요가 정상적으로 적용되었습니다." + notice
 
 # end of file
\ No newline at end of file
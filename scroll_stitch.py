@@ -0,0 +1,152 @@
+"""
+스크롤 캡쳐 이어붙이기(stitch) 모듈입니다.
+
+세로 스크롤만 되는 웹 뷰어는 페이지 넘김 대신 스크롤 후 같은 영역을 캡쳐한다.
+새 프레임이 이전 프레임과 얼마나 겹치는지를 행 프로파일(행마다 가로로 몇 구간 평균낸 밝기)의
+차이제곱합으로 찾고, 겹치지 않는 새 행만 긴 띠(strip)에 이어붙인다.
+띠는 고정 높이가 찰 때마다 페이지로 잘라서 내보내므로 메모리는 페이지 한 장 + 프레임 한 장 수준으로 유지된다.
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
+from PIL import Image
+
+
+@dataclass
+class StitchResult:
+    """프레임 이어붙이기 결과"""
+    shift: int       # 이전 프레임 대비 스크롤된 행 수 (0이면 스크롤되지 않음)
+    new_rows: int    # 띠에 추가된 행 수
+    matched: bool    # 이전 프레임과 겹치는 부분을 찾았는지 여부 (False면 프레임 전체를 추가)
+    error: float     # 겹치는 부분의 행 프로파일 오차 (find_shift 참고)
+
+
+def row_profile(image: Image.Image, bins: int = 32) -> np.ndarray:
+    """행마다 가로를 bins 구간으로 나눠 평균 밝기를 구한다. (높이 x bins)"""
+    gray = image.convert('L')
+    return np.asarray(gray.resize((bins, gray.height), Image.Resampling.BOX), dtype=np.float32)
+
+
+def find_shift(prev: np.ndarray, curr: np.ndarray, min_overlap: int = 32,
+               expected: int | None = None, tolerance: float = 0.1,
+               min_texture_rows: int = 8) -> tuple[int, float]:
+    """curr 가 prev 에서 몇 행 스크롤된 프레임인지 찾는다. (curr 의 r 행 == prev 의 r + shift 행)
+
+    모든 이동량의 차이제곱합을 FFT 상관과 누적합으로 한번에 계산한다.
+    차이는 겹치는 부분 중 글자 등이 있는 행 수(빈 행은 0.1행으로 셈)로 나눈다.
+    (빈 여백이 많은 겹침에서 글자 한 줄이 어긋난 것을 놓치지 않도록)
+    여러 이동량이 똑같이 잘 맞으면 글자가 있는 행이 min_texture_rows 이상 겹치는 이동량을 우선하고,
+    그 중 expected 에 가장 가까운 이동량을 고른다. (빈 여백끼리만 겹치면 틀리더라도 빈 여백의 길이만 달라진다)
+
+    Returns:
+        (이동량, 오차)
+    """
+    height = min(len(prev), len(curr))
+    # 차이제곱합은 두 프로파일에서 같은 값을 빼도 변하지 않으므로 128 을 빼서 FFT 오차를 줄인다.
+    prev = prev[:height].astype(np.float64) - 128
+    curr = curr[:height].astype(np.float64) - 128
+    max_shift = height - min(min_overlap, height)
+    bins = prev.shape[1]
+
+    n = 1 << (2 * height - 1).bit_length()
+    cross = np.fft.irfft(np.fft.rfft(prev, n, axis=0) * np.conj(np.fft.rfft(curr, n, axis=0)), n, axis=0)
+    cross = cross.sum(axis=1)[:max_shift + 1]
+
+    prev_sq = (prev ** 2).sum(axis=1)
+    curr_sq = (curr ** 2).sum(axis=1)
+    shifts = np.arange(max_shift + 1)
+    overlap = height - shifts
+    prev_tail = np.cumsum(prev_sq[::-1])[::-1][shifts]       # prev[shift:] 제곱합
+    curr_head = np.cumsum(curr_sq)[overlap - 1]               # curr[:overlap] 제곱합
+    texture_rows = np.cumsum(curr.max(axis=1) - curr.min(axis=1) > 4)[overlap - 1]
+    error = np.maximum(prev_tail + curr_head - 2 * cross, 0) / ((texture_rows + 0.1 * overlap + 1) * bins)
+
+    candidates = np.flatnonzero(error <= error.min() + tolerance)
+    textured = candidates[texture_rows[candidates] >= min_texture_rows]
+    if textured.size:
+        candidates = textured
+    if expected is not None:
+        shift = int(candidates[np.abs(candidates - expected).argmin()])
+    else:
+        shift = int(candidates[0])
+    return shift, float(error[shift])
+
+
+class ScrollStitcher:
+    """스크롤 프레임을 이어붙여 고정 높이 페이지로 잘라 내보낸다.
+
+    Args:
+        page_height: 페이지 높이(px). 띠가 이 높이만큼 차면 페이지로 잘라 on_page 로 넘긴다.
+        on_page: 잘라낸 페이지 이미지를 받을 함수
+        min_overlap: 겹침으로 인정할 최소 행 수
+        max_error: 이 값보다 차이가 크면 겹침을 못 찾은 것으로 보고 프레임 전체를 추가한다.
+        snap: 자르는 위치를 page_height 위쪽 snap 행 안의 빈 행(글자 줄 사이)으로 옮긴다. (0이면 정확히 page_height)
+    """
+
+    def __init__(self, page_height: int, on_page: Callable[[Image.Image], None], *,
+                 min_overlap: int = 32, max_error: float = 20.0, snap: int = 0):
+        self.page_height = page_height
+        self.on_page = on_page
+        self.min_overlap = min_overlap
+        self.max_error = max_error
+        self.snap = snap
+        self.pages = 0
+        self._rows: list[np.ndarray] = []  # 아직 페이지로 잘리지 않은 행들
+        self._pending = 0
+        self._prev_profile: np.ndarray | None = None
+        self._last_shift: int | None = None
+
+    def add_frame(self, image: Image.Image) -> StitchResult:
+        """프레임을 추가한다. 이전 프레임과 겹치지 않는 새 행만 띠에 붙인다."""
+        frame = np.asarray(image.convert('RGB'))
+        profile = row_profile(image)
+
+        if self._prev_profile is None or len(profile) != len(self._prev_profile):
+            result = StitchResult(len(frame), len(frame), False, 0.0)
+        else:
+            shift, error = find_shift(self._prev_profile, profile, self.min_overlap, self._last_shift)
+            if error > self.max_error:
+                result = StitchResult(len(frame), len(frame), False, error)
+            else:
+                result = StitchResult(shift, shift, True, error)
+                if shift > 0:
+                    self._last_shift = shift
+
+        if result.new_rows > 0:
+            self._rows.append(frame[len(frame) - result.new_rows:])
+            self._pending += result.new_rows
+            self._cut_pages()
+        self._prev_profile = profile
+        return result
+
+    def _cut_position(self, strip: np.ndarray) -> int:
+        if self.snap <= 0:
+            return self.page_height
+        # page_height 에서 위로 snap 행 안에서 가장 아래쪽의 빈 행(밝기 변화가 거의 없는 행)
+        window = strip[self.page_height - self.snap:self.page_height].astype(np.int16)
+        flat = np.flatnonzero((window.max(axis=(1, 2)) - window.min(axis=(1, 2))) < 16)
+        return self.page_height - self.snap + int(flat[-1]) + 1 if flat.size else self.page_height
+
+    def _cut_pages(self) -> None:
+        while self._pending >= self.page_height:
+            strip = np.concatenate(self._rows) if len(self._rows) > 1 else self._rows[0]
+            cut = self._cut_position(strip)
+            self._emit(strip[:cut])
+            self._rows = [strip[cut:]]
+            self._pending = len(self._rows[0])
+
+    def _emit(self, rows: np.ndarray) -> None:
+        self.pages += 1
+        self.on_page(Image.fromarray(np.ascontiguousarray(rows)))
+
+    def flush(self) -> None:
+        """남은 행을 마지막 페이지로 내보낸다. (빈 행만 남았으면 버린다)"""
+        if self._pending > 0:
+            strip = np.concatenate(self._rows) if len(self._rows) > 1 else self._rows[0]
+            if int(strip.max()) - int(strip.min()) >= 16:
+                self._emit(strip)
+        self._rows = []
+        self._pending = 0
+
+# end of file
@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, 
                            QLabel, QLineEdit, QGroupBox, QPushButton,
-                           QFileDialog)
+                           QFileDialog, QSpinBox, QDoubleSpinBox, QCheckBox,
+                           QMessageBox)
 import os
 from supa_common import log
 from supa_settings import SupaSettings
@@ -37,8 +38,80 @@ class SettingsDialog(QDialog):
         url_layout.addWidget(url_label)
         url_layout.addWidget(self.url_edit)
         
+        # 동시 요청 수 입력
+        concurrency_layout = QHBoxLayout()
+        concurrency_label = QLabel("동시 요청 수:")
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 16)
+        self.concurrency_spin.setToolTip("OCR 이미지를 동시에 몇 개까지 요청할지 (API 요청 한도를 넘으면 줄이세요)")
+        concurrency_layout.addWidget(concurrency_label)
+        concurrency_layout.addWidget(self.concurrency_spin)
+
+        # 초당 요청 수 제한 / 재시도 횟수 입력
+        rate_label = QLabel("초당 요청 수:")
+        self.rate_spin = QDoubleSpinBox()
+        self.rate_spin.setRange(0.0, 100.0)
+        self.rate_spin.setDecimals(1)
+        self.rate_spin.setSpecialValueText("제한 없음")  # 0
+        self.rate_spin.setToolTip("API 요청 한도(초당 요청 수)에 맞춰 설정하면 429 오류 없이 최대 속도로 요청합니다.")
+        retries_label = QLabel("재시도:")
+        self.retries_spin = QSpinBox()
+        self.retries_spin.setRange(0, 10)
+        self.retries_spin.setToolTip("429, 5xx, 시간초과 응답을 다시 요청할 횟수")
+        concurrency_layout.addWidget(rate_label)
+        concurrency_layout.addWidget(self.rate_spin)
+        concurrency_layout.addWidget(retries_label)
+        concurrency_layout.addWidget(self.retries_spin)
+        concurrency_layout.addStretch()
+
+        # 응답 캐시
+        cache_layout = QHBoxLayout()
+        self.cache_check = QCheckBox("응답 캐시 사용")
+        self.cache_check.setToolTip("같은 이미지를 다시 스캔하면 API 를 호출하지 않고 저장된 결과를 사용합니다.")
+        cache_size_label = QLabel("최대 크기(MB):")
+        self.cache_size_spin = QSpinBox()
+        self.cache_size_spin.setRange(10, 10000)
+        clear_cache_btn = QPushButton("캐시 비우기")
+        clear_cache_btn.clicked.connect(self.clear_ocr_cache)
+        cache_layout.addWidget(self.cache_check)
+        cache_layout.addWidget(cache_size_label)
+        cache_layout.addWidget(self.cache_size_spin)
+        cache_layout.addStretch()
+        cache_layout.addWidget(clear_cache_btn)
+
+        # 업로드 전처리
+        preprocess_layout = QHBoxLayout()
+        self.preprocess_check = QCheckBox("업로드 전처리")
+        self.preprocess_check.setToolTip("여백 제거, 흑백 변환, 축소 후 가장 작은 형식(JPEG/PNG)으로 보내 업로드 시간을 줄입니다.")
+        text_height_label = QLabel("글자 줄 높이(px):")
+        self.text_height_spin = QSpinBox()
+        self.text_height_spin.setRange(0, 200)
+        self.text_height_spin.setSpecialValueText("축소 안함")  # 0
+        self.text_height_spin.setToolTip("글자 줄 높이가 이 값보다 크면 이 높이가 되도록 이미지를 줄입니다.")
+        preprocess_layout.addWidget(self.preprocess_check)
+        preprocess_layout.addWidget(text_height_label)
+        preprocess_layout.addWidget(self.text_height_spin)
+        preprocess_layout.addStretch()
+
+        # 이어붙여 요청
+        stitch_layout = QHBoxLayout()
+        self.stitch_check = QCheckBox("이미지 이어붙여 요청")
+        self.stitch_check.setToolTip("연속된 목차 이미지를 세로로 이어붙여 한 번에 요청합니다. (요청 수와 대기 시간이 줄어듭니다)")
+        stitch_height_label = QLabel("최대 높이(px):")
+        self.stitch_height_spin = QSpinBox()
+        self.stitch_height_spin.setRange(1000, 20000)
+        self.stitch_height_spin.setSingleStep(500)
+        stitch_layout.addWidget(self.stitch_check)
+        stitch_layout.addWidget(stitch_height_label)
+        stitch_layout.addWidget(self.stitch_height_spin)
+        stitch_layout.addStretch()
+
         ocr_layout.addLayout(key_layout)
         ocr_layout.addLayout(url_layout)
+        ocr_layout.addLayout(concurrency_layout)
+        ocr_layout.addLayout(cache_layout)
+        ocr_layout.addLayout(preprocess_layout)
+        ocr_layout.addLayout(stitch_layout)
         ocr_group.setLayout(ocr_layout)
         layout.addWidget(ocr_group)
         
@@ -77,15 +150,41 @@ class SettingsDialog(QDialog):
         """저장된 설정 불러오기"""
         self.key_edit.setText(self.settings.value("ocr/secret_key", ""))
         self.url_edit.setText(self.settings.value("ocr/api_url", ""))
+        self.concurrency_spin.setValue(int(self.settings.value("ocr/concurrency", 4)))
+        self.rate_spin.setValue(float(self.settings.value("ocr/rate_limit", 0.0)))
+        self.retries_spin.setValue(int(self.settings.value("ocr/max_retries", 4)))
+        self.cache_check.setChecked(str(self.settings.value("ocr/use_cache", 'true')).lower() == 'true')
+        self.cache_size_spin.setValue(int(self.settings.value("ocr/cache_max_mb", 200)))
+        self.preprocess_check.setChecked(str(self.settings.value("ocr/preprocess", 'true')).lower() == 'true')
+        self.text_height_spin.setValue(int(self.settings.value("ocr/text_height", 32)))
+        self.stitch_check.setChecked(str(self.settings.value("ocr/stitch", 'false')).lower() == 'true')
+        self.stitch_height_spin.setValue(int(self.settings.value("ocr/stitch_max_height", 4000)))
         self.editor_path_edit.setText(self.settings.value("editor_path", ""))
         
     def save_and_close(self):
         """설정 저장 및 다이얼로그 닫기"""
         self.settings.setValue("ocr/secret_key", self.key_edit.text())
         self.settings.setValue("ocr/api_url", self.url_edit.text())
+        self.settings.setValue("ocr/concurrency", self.concurrency_spin.value())
+        self.settings.setValue("ocr/rate_limit", self.rate_spin.value())
+        self.settings.setValue("ocr/max_retries", self.retries_spin.value())
+        self.settings.setValue("ocr/use_cache", self.cache_check.isChecked())
+        self.settings.setValue("ocr/cache_max_mb", self.cache_size_spin.value())
+        self.settings.setValue("ocr/preprocess", self.preprocess_check.isChecked())
+        self.settings.setValue("ocr/text_height", self.text_height_spin.value())
+        self.settings.setValue("ocr/stitch", self.stitch_check.isChecked())
+        self.settings.setValue("ocr/stitch_max_height", self.stitch_height_spin.value())
         self.settings.setValue("editor_path", self.editor_path_edit.text())
         self.accept()
         
+    def clear_ocr_cache(self):
+        """저장된 OCR 응답을 모두 지운다."""
+        from ocr_cache import OcrCache
+        cache = OcrCache()
+        size_mb = cache.size / (1024 * 1024)
+        cache.clear()
+        QMessageBox.information(self, "OCR 캐시", f"OCR 캐시를 비웠습니다. ({size_mb:.1f}MB)")
+
     def select_editor(self):
         """외부 편집기 선택"""
         file_path, _ = QFileDialog.getOpenFileName(
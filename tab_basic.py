@@ -1,10 +1,11 @@
 from PyQt6.QtWidgets import (QWidget, QPushButton, QVBoxLayout, QSlider, 
                            QLabel, QHBoxLayout, QLineEdit, QGroupBox, QTextEdit,
-                           QCheckBox, QGridLayout, QSizePolicy)
+                           QCheckBox, QGridLayout, QSizePolicy, QComboBox)
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QThread
 from supa_settings import SupaSettings
 from cap_region_window import CapRegionWindow
 from worker_cap import WorkerCapture
+from page_profile import PROFILES
 
 class BasicTab(QWidget):
     # 파일명이 변경될 때 발생하는 시그널 추가
@@ -76,6 +77,34 @@ class BasicTab(QWidget):
             self.cap_region_window.can_draw = True
             self.cap_region_window.update()
 
+    def detect_auto_region(self):
+        """캡처 영역 창 아래의 화면에서 컨텐츠 영역을 감지하여 캡쳐영역과 여백을 설정"""
+        if not self.cap_region_window or not self.cap_region_window.isVisible():
+            self.log_text_edit.append("캡쳐영역 가이드 창을 먼저 띄워주세요.")
+            return
+        self.cap_region_window.start_auto_bounds(self.apply_auto_region)
+
+    def apply_auto_region(self, bounds):
+        """감지된 컨텐츠 영역과 여백을 적용"""
+        if bounds is None:
+            self.log_text_edit.append("페이지 컨텐츠 영역을 찾지 못했습니다.")
+            return
+        self.cap_region_window.apply_auto_bounds(bounds)
+        margins = bounds.margins
+        self.margin_top_edit.setText(str(margins['top']))
+        self.margin_right_edit.setText(str(margins['right']))
+        self.margin_bottom_edit.setText(str(margins['bottom']))
+        self.margin_left_edit.setText(str(margins['left']))
+        left, top, right, bottom = bounds.content
+        self.log_text_edit.append(f"캡쳐영역 자동 설정: x:{left} y:{top} w:{right - left} h:{bottom - top} "
+                                  f"여백 상:{margins['top']} 하:{margins['bottom']} "
+                                  f"좌:{margins['left']} 우:{margins['right']}")
+
+    def on_auto_preview_changed(self, state):
+        """자동 영역 미리보기 체크박스 상태 변경"""
+        if self.cap_region_window is not None:
+            self.cap_region_window.set_auto_preview(self.auto_preview_check.isChecked())
+
     def change_opacity(self, value: int) -> None:
         """캡처 영역 창의 투명도를 변경"""
         if self.cap_region_window is not None:
@@ -121,6 +150,17 @@ class BasicTab(QWidget):
             self.thread = None
             self.worker = None
 
+        # 다시 캡쳐할 페이지 범위 ('57-60' 또는 '57')
+        recapture = None
+        recapture_text = self.recapture_edit.text().strip()
+        if recapture_text:
+            first, _, last = recapture_text.partition('-')
+            try:
+                recapture = (int(first), int(last or first))
+            except ValueError:
+                self.log_text_edit.append("다시 캡쳐할 페이지 범위 형식이 잘못되었습니다. (예: 57-60)")
+                return
+
         # 캡쳐 영역이 설정되어 있으면 프로세스 시작
         self.log_text_edit.append("캡쳐 프로세스를 시작합니다...")
         
@@ -145,7 +185,20 @@ class BasicTab(QWidget):
             margin=margins,
             diff_width=int(self.diff_width_edit.text() or '0'),
             automation_delay=float(self.delay_edit.text() or '0'),
-            left_first=self.left_first_check.isChecked()
+            left_first=self.left_first_check.isChecked(),
+            spread=self.spread_check.isChecked(),
+            scroll=['', 'pagedown', 'wheel'][self.scroll_combo.currentIndex()],
+            backend=self.backend_combo.currentText(),
+            input_driver=self.input_combo.currentText(),
+            encode_workers=2,  # PNG 인코딩은 별도 프로세스에서 처리
+            settle_samples=3 if self.auto_delay_check.isChecked() else 0,
+            stuck_frames=3 if self.stuck_combo.currentIndex() > 0 else 0,
+            on_stuck='pause' if self.stuck_combo.currentIndex() == 2 else 'stop',
+            resume=self.resume_check.isChecked(),
+            recapture=recapture,
+            pdf_profile=self.profile_combo.currentText(),
+            align_pages=self.align_check.isChecked(),
+            page_filter=['keep', 'drop', 'share'][self.page_filter_combo.currentIndex()]
         )
         self.worker.moveToThread(self.thread)
         
@@ -231,6 +284,15 @@ class BasicTab(QWidget):
         self.file_name_edit.setText(self.settings.value('MainWindow/file_name', ''))
         self.page_loop_edit.setText(self.settings.value('MainWindow/page_loop', ''))
         self.delay_edit.setText(self.settings.value('MainWindow/capture_delay', '0'))
+        self.backend_combo.setCurrentText(self.settings.value('MainWindow/capture_backend', 'pyautogui'))
+        self.input_combo.setCurrentText(self.settings.value('MainWindow/input_driver', 'pyautogui'))
+        self.auto_delay_check.setChecked(str(self.settings.value('MainWindow/auto_delay', 'false')).lower() == 'true')
+        self.stuck_combo.setCurrentIndex(int(self.settings.value('MainWindow/stuck_mode', 0)))
+        self.profile_combo.setCurrentText(self.settings.value('MainWindow/pdf_profile', 'rgb'))
+        self.align_check.setChecked(str(self.settings.value('MainWindow/align_pages', 'false')).lower() == 'true')
+        self.spread_check.setChecked(str(self.settings.value('MainWindow/spread', 'false')).lower() == 'true')
+        self.scroll_combo.setCurrentIndex(int(self.settings.value('MainWindow/scroll_mode', 0)))
+        self.page_filter_combo.setCurrentIndex(int(self.settings.value('MainWindow/page_filter', 0)))
         
     def saveSettings(self):
         """현재 설정 저장"""
@@ -244,6 +306,15 @@ class BasicTab(QWidget):
         self.settings.setValue('MainWindow/file_name', self.file_name_edit.text())
         self.settings.setValue('MainWindow/page_loop', self.page_loop_edit.text())
         self.settings.setValue('MainWindow/capture_delay', self.delay_edit.text())
+        self.settings.setValue('MainWindow/capture_backend', self.backend_combo.currentText())
+        self.settings.setValue('MainWindow/input_driver', self.input_combo.currentText())
+        self.settings.setValue('MainWindow/auto_delay', str(self.auto_delay_check.isChecked()).lower())
+        self.settings.setValue('MainWindow/stuck_mode', self.stuck_combo.currentIndex())
+        self.settings.setValue('MainWindow/pdf_profile', self.profile_combo.currentText())
+        self.settings.setValue('MainWindow/align_pages', str(self.align_check.isChecked()).lower())
+        self.settings.setValue('MainWindow/spread', str(self.spread_check.isChecked()).lower())
+        self.settings.setValue('MainWindow/scroll_mode', self.scroll_combo.currentIndex())
+        self.settings.setValue('MainWindow/page_filter', self.page_filter_combo.currentIndex())
         
         # 캡처 영역 창 설정 저장
         if self.cap_region_window:
@@ -298,6 +369,20 @@ class BasicTab(QWidget):
         clear_button.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
         clear_button.clicked.connect(self.clear_rectangles)
         basic_layout.addWidget(clear_button)        
+
+        # 캡처 영역 자동 설정 버튼 / 미리보기 체크박스
+        auto_region_layout = QHBoxLayout()
+        self.auto_region_button = QPushButton('캡쳐영역 자동 설정', self)
+        self.auto_region_button.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
+        self.auto_region_button.setToolTip('캡쳐영역 가이드 창 아래의 화면에서 페이지와 컨텐츠 영역을 찾아\n'
+                                           '캡쳐영역과 여백을 자동으로 설정 (가이드 창을 페이지보다 크게 둘 것)')
+        self.auto_region_button.clicked.connect(self.detect_auto_region)
+        self.auto_preview_check = QCheckBox('미리보기', self)
+        self.auto_preview_check.setToolTip('체크하면 가이드 창을 옮길 때마다 감지된 영역을 하늘색 점선으로 표시')
+        self.auto_preview_check.stateChanged.connect(self.on_auto_preview_changed)
+        auto_region_layout.addWidget(self.auto_region_button)
+        auto_region_layout.addWidget(self.auto_preview_check)
+        basic_layout.addLayout(auto_region_layout)
         basic_layout.addSpacing(15)
 
         # 캡쳐영역 설정값 그룹
@@ -386,6 +471,13 @@ class BasicTab(QWidget):
         self.page_loop_edit.setPlaceholderText('0')
         loop_layout.addWidget(loop_label)
         loop_layout.addWidget(self.page_loop_edit)
+        recapture_label = QLabel('다시 캡쳐', self)
+        recapture_label.setToolTip('이미 캡쳐한 책에서 이 범위의 페이지만 다시 캡쳐하여 pdf 의 해당 페이지만 교체 (예: 57-60)\n'
+                                   '캡쳐 대상을 첫 페이지 바로 앞 페이지에 맞춰 두고 시작. 비워두면 전체 캡쳐')
+        self.recapture_edit = QLineEdit(self)
+        self.recapture_edit.setPlaceholderText('예: 57-60')
+        loop_layout.addWidget(recapture_label)
+        loop_layout.addWidget(self.recapture_edit)
         param_layout.addLayout(loop_layout)
 
         # delay LineEdit
@@ -396,14 +488,106 @@ class BasicTab(QWidget):
         self.delay_edit.setPlaceholderText('0')
         delay_layout.addWidget(delay_label)
         delay_layout.addWidget(self.delay_edit)
+        self.auto_delay_check = QCheckBox('자동 대기', self)
+        self.auto_delay_check.setToolTip('체크하면 페이지 렌더링이 끝나는 즉시 캡쳐\n(Delay는 최대 대기시간으로 사용)')
+        delay_layout.addWidget(self.auto_delay_check)
         param_layout.addLayout(delay_layout)
 
+        # 캡쳐 백엔드 ComboBox
+        backend_layout = QHBoxLayout()
+        backend_label = QLabel('Backend', self)
+        backend_label.setToolTip('화면 캡쳐 방식\npyautogui: 기존 방식\nmss: 지정 영역 직접 캡쳐 (리눅스 X11 공유메모리, 빠름)')
+        self.backend_combo = QComboBox(self)
+        self.backend_combo.addItems(['pyautogui', 'mss'])
+        backend_layout.addWidget(backend_label)
+        backend_layout.addWidget(self.backend_combo)
+        param_layout.addLayout(backend_layout)
+
+        # 입력 드라이버 ComboBox
+        input_layout = QHBoxLayout()
+        input_label = QLabel('Input', self)
+        input_label.setToolTip('페이지 넘김 키 입력 방식\npyautogui: 기존 방식\n'
+                               'xtest: X11 XTest 직접 입력 (python-xlib 필요, 빠름)\n'
+                               'uinput: 리눅스 가상 입력장치 (evdev 필요, /dev/uinput 쓰기 권한 필요, Wayland 가능)')
+        self.input_combo = QComboBox(self)
+        self.input_combo.addItems(['pyautogui', 'xtest', 'uinput'])
+        input_layout.addWidget(input_label)
+        input_layout.addWidget(self.input_combo)
+        param_layout.addLayout(input_layout)
+
+        # 중복 페이지 감지 ComboBox
+        stuck_layout = QHBoxLayout()
+        stuck_label = QLabel('중복 페이지', self)
+        stuck_label.setToolTip('같은 페이지가 3회 연속 캡쳐될 때의 처리\n'
+                               '캡쳐 종료: 마지막 페이지로 보고 바로 pdf 생성 (Page Loop를 넉넉히 잡아도 된다)\n'
+                               '일시 정지: 포커스 손실로 보고 5초뒤 해당 페이지부터 다시 캡쳐')
+        self.stuck_combo = QComboBox(self)
+        self.stuck_combo.addItems(['사용 안함', '캡쳐 종료', '일시 정지'])
+        stuck_layout.addWidget(stuck_label)
+        stuck_layout.addWidget(self.stuck_combo)
+        param_layout.addLayout(stuck_layout)
+
+        # 스크롤 캡쳐 ComboBox
+        scroll_layout = QHBoxLayout()
+        scroll_label = QLabel('스크롤 캡쳐', self)
+        scroll_label.setToolTip('세로 스크롤만 되는 뷰어에서 스크롤하며 캡쳐한 화면을 이어붙여 페이지로 자름\n'
+                                'PageDown: PageDown 키로 스크롤, 마우스 휠: 캡쳐영역 가운데에서 휠로 스크롤\n'
+                                '(Page Loop는 최대 페이지 수. 이어서 캡쳐/펼침면은 사용 불가)')
+        self.scroll_combo = QComboBox(self)
+        self.scroll_combo.addItems(['사용 안함', 'PageDown', '마우스 휠'])
+        scroll_layout.addWidget(scroll_label)
+        scroll_layout.addWidget(self.scroll_combo)
+        param_layout.addLayout(scroll_layout)
+
+        # PDF 압축 프로파일 ComboBox
+        profile_layout = QHBoxLayout()
+        profile_label = QLabel('PDF 압축', self)
+        profile_label.setToolTip('pdf 페이지 이미지 형식 (컬러 그림이 있는 페이지는 jpeg 외에는 항상 rgb 유지)\n'
+                                 'rgb: 원본 그대로, gray: 흑백, palette: 16색(4비트),\n'
+                                 'bilevel: 1비트 흑백(CCITT G4), jpeg: JPEG, auto: 페이지마다 bilevel/palette 자동 선택')
+        self.profile_combo = QComboBox(self)
+        self.profile_combo.addItems(list(PROFILES))
+        profile_layout.addWidget(profile_label)
+        profile_layout.addWidget(self.profile_combo)
+        param_layout.addLayout(profile_layout)
+
+        # 빈/중복 페이지 처리 ComboBox
+        page_filter_layout = QHBoxLayout()
+        page_filter_label = QLabel('빈/중복 페이지', self)
+        page_filter_label.setToolTip('pdf 생성시 빈 페이지와 중복 페이지(같은 화면을 두번 캡쳐한 페이지) 처리\n'
+                                     '빼기: pdf 에서 제외 (페이지 번호가 달라지므로 개요 적용시 주의),\n'
+                                     '이미지 공유: 페이지는 유지하고 이미지 데이터는 한 번만 기록')
+        self.page_filter_combo = QComboBox(self)
+        self.page_filter_combo.addItems(['유지', '빼기', '이미지 공유'])
+        page_filter_layout.addWidget(page_filter_label)
+        page_filter_layout.addWidget(self.page_filter_combo)
+        param_layout.addLayout(page_filter_layout)
+
         # 좌측부터 체크박스
         self.left_first_check = QCheckBox('좌측부터', self)
         self.left_first_check.setToolTip('체크하면 좌측 페이지부터 캡쳐')
         self.left_first_check.stateChanged.connect(self.on_left_first_changed)
         param_layout.addWidget(self.left_first_check)
 
+        # 펼침면 체크박스
+        self.spread_check = QCheckBox('펼침면', self)
+        self.spread_check.setToolTip('체크하면 두 페이지가 펼쳐진 화면을 캡쳐영역 하나로 잡고 한번에 캡쳐한 뒤 좌/우 페이지로 나눔\n'
+                                     '(캡쳐영역을 펼침면 전체로 지정. 좌측부터를 끄면 우측 페이지를 먼저 저장)')
+        self.spread_check.stateChanged.connect(self.on_margin_changed)
+        param_layout.addWidget(self.spread_check)
+
+        # 이어서 캡쳐 체크박스
+        self.resume_check = QCheckBox('이어서 캡쳐', self)
+        self.resume_check.setToolTip('체크하면 이전에 중단된 캡쳐를 마지막 저장 페이지 다음부터 이어서 진행\n'
+                                     '(이미 완료된 캡쳐는 pdf만 다시 생성)')
+        param_layout.addWidget(self.resume_check)
+
+        # 좌우 자동 정렬 체크박스
+        self.align_check = QCheckBox('좌우 자동 정렬', self)
+        self.align_check.setToolTip('체크하면 pdf 생성 전에 페이지마다 글자 위치를 비교하여 좌우 위치를 자동으로 맞춤\n'
+                                    '(Diff Width 대신 사용. 정렬된 이미지는 _aligned 폴더에 저장)')
+        param_layout.addWidget(self.align_check)
+
         param_group.setLayout(param_layout)
         basic_layout.addWidget(param_group)
         basic_layout.addSpacing(10)
@@ -301,17 +301,15 @@ class GenOutlineTab(QWidget):
         if not self.pdf_drop_area.file_path:
             self.status_label.setText("PDF 파일이 선택되지 않았습니다.")
             return
-        if not self.current_file_path:
-            self.status_label.setText("개요 파일이 생성되지 않았습니다.")
-            return
-        if not os.path.exists(self.current_file_path):
-            self.status_label.setText("개요 파일이 존재하지 않습니다.")
+        te_outlines = self.te_outlines.toPlainText()
+        if not te_outlines.strip():
+            self.status_label.setText("개요를 입력해주세요.")
             return
         
-        # 개요 pdf 파일적용 로직
+        # 개요 pdf 파일적용 로직 (편집창의 개요를 그대로 적용. pdf 끝에 개요만 덧붙인다)
         (success, result_msg) = pdf_outline_gen(
             pdf_file=self.pdf_drop_area.file_path,
-            ol_file=self.current_file_path,
+            outline_lines=te_outlines.split('\n'),
             depth_sep='    ',
             page_sep='\t'
         )
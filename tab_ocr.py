@@ -232,7 +232,17 @@ class OcrTab(QWidget):
         api_url = self.settings.value("ocr/api_url", "")
         if secret_key and api_url:
             # OCR 워커 쓰레드 생성 및 시작
-            self.ocr_worker = WorkerOcr(secret_key, api_url, file_paths)
+            concurrency = int(self.settings.value("ocr/concurrency", 4))
+            rate_limit = float(self.settings.value("ocr/rate_limit", 0.0))
+            max_retries = int(self.settings.value("ocr/max_retries", 4))
+            use_cache = str(self.settings.value("ocr/use_cache", 'true')).lower() == 'true'
+            cache_max_mb = int(self.settings.value("ocr/cache_max_mb", 200))
+            preprocess = str(self.settings.value("ocr/preprocess", 'true')).lower() == 'true'
+            text_height = int(self.settings.value("ocr/text_height", 32))
+            stitch = str(self.settings.value("ocr/stitch", 'false')).lower() == 'true'
+            stitch_max_height = int(self.settings.value("ocr/stitch_max_height", 4000))
+            self.ocr_worker = WorkerOcr(secret_key, api_url, file_paths, concurrency, rate_limit, max_retries,
+                                        use_cache, cache_max_mb, preprocess, text_height, stitch, stitch_max_height)
             self.ocr_worker.finished.connect(self.on_ocr_finished)
             self.ocr_worker.error.connect(self.on_ocr_error)
             self.ocr_worker.log.connect(self.show_log)
@@ -1,5 +1,4 @@
 from PyQt6.QtCore import QObject, pyqtSignal
-from auto_pdf_capture import auto_pdf_capture
 
 class WorkerCapture(QObject):
     finished = pyqtSignal()  # 작업 완료 시그널
@@ -8,7 +7,14 @@ class WorkerCapture(QObject):
     def __init__(self, main_window, file_name: str, page_loop: int,
                  x1: int, y1: int, x2: int, y2: int,
                  margin: dict[str, int], diff_width: int,
-                 automation_delay: float, left_first: bool = True):
+                 automation_delay: float, left_first: bool = True, spread: bool = False,
+                 scroll: str = '',
+                 backend: str = 'pyautogui', replay_dir: str = '',
+                 input_driver: str = 'pyautogui',
+                 encode_workers: int = 0, settle_samples: int = 0,
+                 stuck_frames: int = 0, on_stuck: str = 'stop',
+                 resume: bool = False, recapture: tuple[int, int] | None = None, pdf_profile: str = 'rgb',
+                 align_pages: bool = False, page_filter: str = 'keep'):
         super().__init__()
         self.main_window = main_window
         self.file_name = file_name
@@ -21,12 +27,28 @@ class WorkerCapture(QObject):
         self.diff_width = diff_width
         self.automation_delay = automation_delay
         self.left_first = left_first
+        self.spread = spread
+        self.scroll = scroll
+        self.backend = backend
+        self.replay_dir = replay_dir
+        self.input_driver = input_driver
+        self.encode_workers = encode_workers
+        self.settle_samples = settle_samples
+        self.stuck_frames = stuck_frames
+        self.on_stuck = on_stuck
+        self.resume = resume
+        self.recapture = recapture
+        self.pdf_profile = pdf_profile
+        self.align_pages = align_pages
+        self.page_filter = page_filter
         self._is_running = False
 
     def run(self):
         """캡쳐 작업을 실행합니다."""
         self._is_running = True
         try:
+            # numpy/Pillow 등 캡쳐 모듈은 프로그램 시작 시간을 줄이기 위해 캡쳐 시작시 import
+            from auto_pdf_capture import auto_pdf_capture
             auto_pdf_capture(
                 file_name=self.file_name,
                 page_loop=self.page_loop,
@@ -39,6 +61,21 @@ class WorkerCapture(QObject):
                 res=1,
                 automation_delay=self.automation_delay,
                 left_first=self.left_first,
+                spread=self.spread,
+                scroll=self.scroll,
+                backend=self.backend,
+                replay_dir=self.replay_dir,
+                input_driver=self.input_driver,
+                encode_workers=self.encode_workers,
+                settle_samples=self.settle_samples,
+                stuck_frames=self.stuck_frames,
+                on_stuck=self.on_stuck,
+                resume=self.resume,
+                recapture=self.recapture,
+                pdf_profile=self.pdf_profile,
+                align_pages=self.align_pages,
+                blank_pages=self.page_filter,
+                duplicate_pages=self.page_filter,
             log_message_signal=self.log_message_signal,   # type: ignore
             is_running=lambda: self._is_running  # 실행 상태를 확인하는 콜백 함수 전달
             )
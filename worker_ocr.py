@@ -1,5 +1,6 @@
 from PyQt6.QtCore import QThread, pyqtSignal
-from outline_ocr import run_ocr
+from outline_ocr import (OCR_CACHE_MAX_MB, OCR_CONCURRENCY, OCR_MAX_RETRIES, OCR_RATE_LIMIT, OCR_STITCH_MAX_HEIGHT,
+                         OCR_TEXT_HEIGHT, run_ocr)
 
 
 class WorkerOcr(QThread):
@@ -9,11 +10,23 @@ class WorkerOcr(QThread):
     error = pyqtSignal(str)      # 에러 발생시 에러 메시지를 전달하는 시그널
     log = pyqtSignal(str)        # 로그 메시지를 전달하는 시그널
     
-    def __init__(self, secret_key: str, api_url: str, image_files: list):
+    def __init__(self, secret_key: str, api_url: str, image_files: list, concurrency: int = OCR_CONCURRENCY,
+                 rate_limit: float = OCR_RATE_LIMIT, max_retries: int = OCR_MAX_RETRIES, use_cache: bool = True,
+                 cache_max_mb: int = OCR_CACHE_MAX_MB, preprocess: bool = True, text_height: int = OCR_TEXT_HEIGHT,
+                 stitch: bool = False, stitch_max_height: int = OCR_STITCH_MAX_HEIGHT):
         super().__init__()
         self.secret_key = secret_key
         self.api_url = api_url
         self.image_files = image_files
+        self.concurrency = concurrency  # 동시 OCR 요청 수
+        self.rate_limit = rate_limit    # 초당 최대 OCR 요청 수 (0 이면 제한 없음)
+        self.max_retries = max_retries  # 429/5xx/시간초과 재시도 횟수
+        self.use_cache = use_cache      # OCR 응답 캐시 사용 여부
+        self.cache_max_mb = cache_max_mb
+        self.preprocess = preprocess    # 업로드 전처리(여백 제거/흑백/축소/재인코딩) 여부
+        self.text_height = text_height
+        self.stitch = stitch            # 이미지를 이어붙여 한 번에 요청할지 여부
+        self.stitch_max_height = stitch_max_height
         
     def show_log(self, message: str):
         """로그 메시지를 emit"""
@@ -23,7 +36,12 @@ class WorkerOcr(QThread):
         """쓰레드 실행"""
         try:
             # OCR 실행
-            ocr_lines = run_ocr(self.secret_key, self.api_url, self.image_files, self.show_log)
+            ocr_lines = run_ocr(self.secret_key, self.api_url, self.image_files, self.show_log,
+                                concurrency=self.concurrency, rate_limit=self.rate_limit,
+                                max_retries=self.max_retries, use_cache=self.use_cache,
+                                cache_max_mb=self.cache_max_mb, preprocess=self.preprocess,
+                                text_height=self.text_height, stitch=self.stitch,
+                                stitch_max_height=self.stitch_max_height)
             self.finished.emit(ocr_lines)
         except Exception as e:
             self.error.emit(str(e))